@@ -0,0 +1,145 @@
+"""
+Micro-benchmark des publications MQTT (publish_sensor / publish_notification).
+
+Le client paho est remplacé par un client factice pour ne mesurer que le
+coût côté application (topics, sérialisation, horodatage). La variante
+"legacy" reproduit l'ancien chemin: résolution de la config, templating et
+horodatage à chaque appel.
+
+`--end-to-end` mesure le débit de bout en bout à travers le broker factice
+des tests (tests/fake_mqtt.py): fenêtre paho, acquittements et latence
+injectée, jusqu'à réception par le broker.
+
+Usage:
+    python -m benchmarks.bench_mqtt_publish [--iterations 200000]
+    python -m benchmarks.bench_mqtt_publish --end-to-end [--messages 20000] [--latency 0.0002] [--qos 1]
+"""
+
+import argparse
+import json
+import time
+from typing import Dict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src import mqtt_publisher
+from src.logger import setup_logger
+from src.mqtt_publisher import MQTTPublisher, _get
+from src.sensor_batcher import SensorBatcher
+from tests.fake_mqtt import FakeBroker
+
+CONFIG = {
+    "mqtt": {
+        "broker": "localhost",
+        "qos": 0,
+        "retain": False,
+        "topics": {
+            "sensor": "detect_yolo_cpu_v2/sensor/{camera}/{metric}",
+            "notify": "detect_yolo_cpu_v2/notify/{camera}/{zone}",
+        },
+    },
+}
+
+
+class NullClient:
+    """Client paho factice: publish() réussit immédiatement, le reste est sans effet."""
+
+    _result = SimpleNamespace(rc=0)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        return self._result
+
+    def _noop(self, *args, **kwargs):
+        return None
+
+    # Surface de configuration/connexion appelée par MQTTPublisher
+    username_pw_set = max_inflight_messages_set = max_queued_messages_set = _noop
+    reconnect_delay_set = connect_async = loop_start = loop_stop = disconnect = subscribe = _noop
+
+
+def legacy_publish_sensor(publisher, camera, metric, value):
+    """Chemin d'origine: tout est résolu à chaque publication."""
+    payload = {"value": value, "timestamp": datetime.now(timezone.utc).astimezone().isoformat(), "unit": "count"}
+    tpl = _get(publisher.cfg, "mqtt", "topics", "sensor")
+    topic = (tpl or "detect_yolo_cpu_v2/sensor/{camera}/{metric}").replace("{camera}", camera).replace("{metric}", metric)
+    topic = topic.replace("//", "/").rstrip("/")
+    qos = _get(publisher.cfg, "mqtt", "qos", default=0)
+    retain = _get(publisher.cfg, "mqtt", "retain", default=False)
+    return publisher.client.publish(topic, json.dumps(payload, ensure_ascii=False), qos=qos, retain=retain)
+
+
+def _rate(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return iterations / (time.perf_counter() - start)
+
+
+def end_to_end(messages: int, latency: float, qos: int, max_inflight: int) -> Dict[str, float]:
+    """Notifications et états groupés publiés par MQTTPublisher, jusqu'à réception par le broker factice."""
+    config = {**CONFIG, "mqtt": {**CONFIG["mqtt"], "qos": qos, "max_inflight": max_inflight}}
+    broker = FakeBroker(latency=latency)
+    with broker.patch():
+        publisher = MQTTPublisher(config)
+    publisher.connect()
+    deadline = time.monotonic() + 5.0
+    while not publisher.connected:
+        if time.monotonic() > deadline:
+            raise SystemExit("broker factice: connexion impossible")
+        time.sleep(0.005)
+    batcher = SensorBatcher(publisher, mode="state")
+
+    start = time.perf_counter()
+    for i in range(messages // 2):
+        publisher.publish_notification("reolink", None, f"message {i}")
+        batcher.publish("reolink", {"detections": i, "false_detections": 0})
+    published = time.perf_counter() - start
+    if not broker.wait_for(2 * (messages // 2), timeout=max(60.0, messages * latency * 2)):
+        raise SystemExit(f"broker factice: {len(broker.messages)} messages reçus sur {messages}")
+    delivered = time.perf_counter() - start
+    publisher.disconnect()
+    return {
+        "publication (appelant)": 2 * (messages // 2) / published,
+        "livraison au broker": 2 * (messages // 2) / delivered,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--end-to-end", action="store_true", help="Débit à travers le broker factice")
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.0002, help="Latence d'acquittement du broker (s)")
+    parser.add_argument("--qos", type=int, default=1)
+    parser.add_argument("--max-inflight", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.end_to_end:
+        setup_logger(level="warning", async_output=False)  # un log info par notification sinon
+        for name, rate in end_to_end(args.messages, args.latency, args.qos, args.max_inflight).items():
+            print(f"{name:<28} {rate:>12,.0f} messages/s")
+        return
+
+    with patch("paho.mqtt.client.Client", NullClient):
+        publisher = MQTTPublisher(CONFIG)
+    publisher.connected = True
+
+    results = {
+        "legacy publish_sensor": _rate(lambda i: legacy_publish_sensor(publisher, "reolink", "detections", i), args.iterations),
+        "publish_sensor": _rate(lambda i: publisher.publish_sensor("reolink", "detections", i), args.iterations),
+    }
+    if mqtt_publisher.orjson is not None:
+        orjson, mqtt_publisher.orjson = mqtt_publisher.orjson, None
+        results["publish_sensor (json)"] = _rate(lambda i: publisher.publish_sensor("reolink", "detections", i), args.iterations)
+        mqtt_publisher.orjson = orjson
+
+    for name, rate in results.items():
+        print(f"{name:<28} {rate:>12,.0f} publications/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Délais de nouvelle tentative exponentiels avec gigue.
+"""
+
+import random
+from typing import Callable
+
+
+class ExponentialBackoff:
+    """
+    Backoff exponentiel plafonné avec gigue "equal jitter": le délai de la
+    tentative n est tiré dans [d/2, d] avec d = min(cap, base * 2**n), ce qui
+    évite que plusieurs clients se reconnectent au même instant.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 120.0, rand: Callable[[], float] = random.random):
+        """
+        Args:
+            base: Délai (s) de la première tentative
+            cap: Délai maximal (s)
+            rand: Source aléatoire dans [0, 1) (injectable pour les tests)
+        """
+        if base <= 0 or cap < base:
+            raise ValueError(f"Backoff invalide: base={base}, cap={cap}")
+        self.base = base
+        self.cap = cap
+        self.rand = rand
+        self.attempts = 0
+
+    def next(self) -> float:
+        """Délai avant la prochaine tentative; incrémente le compteur."""
+        ceiling = min(self.cap, self.base * (2 ** min(self.attempts, 32)))
+        self.attempts += 1
+        return ceiling / 2 + self.rand() * ceiling / 2
+
+    def reset(self) -> None:
+        """Succès: la prochaine séquence repart du délai de base."""
+        self.attempts = 0
@@ -0,0 +1,169 @@
+"""
+Regroupement des rafales d'images par caméra.
+Les images d'une même caméra arrivant dans une fenêtre de N ms sont
+transmises ensemble, pour une détection batch et une seule notification.
+Les images déjà présentes au démarrage sont regroupées par date de prise
+de vue (`add_backlog`): leur ordre d'arrivée ne dit rien des rafales.
+"""
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+from src.utils import capture_time
+
+logger = get_logger(__name__)
+
+BURST_SIZE = REGISTRY.histogram(
+    "detect_burst_size", "Nombre d'images par rafale", buckets=(1, 2, 3, 4, 5, 8, 12, 20)
+)
+
+
+def select_best_frame(results: List[Tuple[List[Dict], Dict]]) -> int:
+    """
+    Choisit l'image la plus représentative d'une rafale.
+
+    Critères: nombre de détections valides, puis somme des confiances valides.
+
+    Args:
+        results: Liste de (detections, counters) dans l'ordre d'arrivée
+
+    Returns:
+        Index de la meilleure image (0 si aucune détection)
+    """
+    best_idx, best_key = 0, (-1, -1.0)
+    for idx, (detections, _counters) in enumerate(results):
+        valid = [d for d in detections if not d.get("is_false")]
+        key = (len(valid), sum(d.get("confidence", 0.0) for d in valid))
+        if key > best_key:
+            best_idx, best_key = idx, key
+    return best_idx
+
+
+class BurstCoalescer:
+    """Accumule les images par caméra et les émet en groupe à l'expiration de la fenêtre."""
+
+    def __init__(
+        self,
+        window_ms: Callable[[str], int],
+        flush: Callable[[str, List[Path]], None],
+        max_size: int = 10,
+    ):
+        """
+        Args:
+            window_ms: Fenêtre de regroupement (ms) pour une caméra; 0 = pas de regroupement
+            flush: Appelée avec (camera, images) quand une rafale est complète
+            max_size: Taille maximale d'une rafale avant émission anticipée
+        """
+        self.window_ms = window_ms
+        self.flush = flush
+        self.max_size = max(1, max_size)
+        self._pending: Dict[str, List[Path]] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._emitting = 0
+        self._closed = False
+
+    def add(self, camera: str, image_path: Path) -> None:
+        """Ajoute une image; émet immédiatement si la caméra n'a pas de fenêtre."""
+        window = self.window_ms(camera)
+        if window <= 0:
+            self._emit(camera, [image_path])
+            return
+
+        ready: Optional[List[Path]] = None
+        with self._lock:
+            burst = self._pending.setdefault(camera, [])
+            burst.append(image_path)
+            if len(burst) >= self.max_size:
+                ready = self._take(camera)
+            elif camera not in self._timers:
+                timer = threading.Timer(window / 1000.0, self._on_timer)
+                timer.args = (camera, timer)
+                timer.daemon = True
+                self._timers[camera] = timer
+                timer.start()
+
+        if ready:
+            self._emit(camera, ready)
+
+    def add_backlog(self, camera: str, image_paths: List[Path]) -> None:
+        """
+        Émet sans attendre des images déjà présentes: une rafale par groupe
+        d'images prises dans la fenêtre de la caméra (au plus max_size).
+        """
+        window = self.window_ms(camera) / 1000.0
+        timed = sorted((capture_time(path).timestamp(), str(path), path) for path in image_paths)
+        burst: List[Path] = []
+        start = 0.0
+        for taken, _name, path in timed:
+            if burst and (window <= 0 or taken - start > window or len(burst) >= self.max_size):
+                self._emit(camera, burst)
+                burst = []
+            if not burst:
+                start = taken
+            burst.append(path)
+        if burst:
+            self._emit(camera, burst)
+
+    def _take(self, camera: str) -> List[Path]:
+        timer = self._timers.pop(camera, None)
+        if timer is not None:
+            timer.cancel()
+        return self._pending.pop(camera, [])
+
+    def _on_timer(self, camera: str, timer: threading.Timer) -> None:
+        with self._lock:
+            # Rafale déjà émise (max_size) et une nouvelle a démarré: ce timer est périmé
+            if self._timers.get(camera) is not timer:
+                return
+            ready = self._take(camera)
+        if ready:
+            self._emit(camera, ready)
+
+    def _emit(self, camera: str, images: List[Path]) -> None:
+        with self._lock:
+            if self._closed:
+                # Fichiers laissés en entrée: traités au prochain démarrage
+                logger.warning("burst_dropped_after_close", camera=camera, images=len(images))
+                return
+            self._emitting += 1
+        try:
+            BURST_SIZE.observe(len(images), camera=camera)
+            if len(images) > 1:
+                logger.debug("burst_emitted", camera=camera, images=len(images))
+            self.flush(camera, images)
+        finally:
+            with self._idle:
+                self._emitting -= 1
+                self._idle.notify_all()
+
+    def flush_all(self) -> None:
+        """Émet immédiatement toutes les rafales en attente (arrêt de l'application)."""
+        with self._lock:
+            cameras = list(self._pending)
+            ready = [(camera, self._take(camera)) for camera in cameras]
+        for camera, images in ready:
+            if images:
+                self._emit(camera, images)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Émet les rafales en attente, puis refuse les suivantes et attend la fin
+        des émissions en cours: `flush` n'est plus appelée au retour (le
+        scheduler peut être fermé).
+        """
+        self.flush_all()
+        with self._idle:
+            self._closed = True
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            dropped = sum(len(images) for images in self._pending.values())
+            self._pending.clear()
+            if dropped:
+                logger.warning("burst_dropped_after_close", images=dropped)
+            self._idle.wait_for(lambda: self._emitting == 0, timeout)
@@ -0,0 +1,101 @@
+"""
+Plans d'exécution par caméra, compilés une fois au chargement de la config.
+
+Un plan regroupe ce que le pipeline recalculait à chaque image: classes
+détectées (ensemble), zones et règles de notification, empreinte du cache
+de résultats, répertoires de sortie et géométrie des zones (ZoneManager par
+résolution d'image). Les plans sont immuables; un rechargement de config
+produit de nouveaux plans.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple, Union
+
+from src.config_loader import CameraConfig, ZoneConfig
+from src.result_cache import camera_fingerprint
+from src.utils import ensure_dir, shard_dir
+from src.zone_manager import ZoneManager
+
+# Résolutions distinctes gardées en cache par caméra (une caméra en a rarement plus d'une)
+_MAX_ZONE_MANAGERS = 4
+
+
+@dataclass(frozen=True)
+class CameraPlan:
+    """Vue compilée et immuable de la configuration d'une caméra."""
+
+    config: CameraConfig
+    detect: FrozenSet[str]
+    zones: Tuple[ZoneConfig, ...]
+    notify_zones: FrozenSet[str]                 # zones autorisant message texte ou audio
+    fingerprint: Optional[str] = None            # clé du cache de résultats (None hors config complète)
+    output_dirs: Mapping[bool, str] = field(default_factory=dict)   # composites valides / faux, avant sharding
+    shard_by: Optional[str] = None
+    _zone_managers: Dict[Tuple[int, int], ZoneManager] = field(default_factory=dict, compare=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    def zone_manager(self, width: int, height: int) -> Optional[ZoneManager]:
+        """Géométrie des zones pour une résolution, construite une seule fois."""
+        if not self.zones:
+            return None
+        key = (width, height)
+        manager = self._zone_managers.get(key)
+        if manager is None:
+            manager = ZoneManager(list(self.zones), width, height)
+            with self._lock:
+                if len(self._zone_managers) >= _MAX_ZONE_MANAGERS:
+                    self._zone_managers.clear()
+                self._zone_managers[key] = manager
+        return manager
+
+    def output_path(self, filename: str, is_valid: bool, source_path: Optional[str] = None) -> Path:
+        """Chemin du composite (sous-dossier de date si shard_by); crée le répertoire."""
+        directory = shard_dir(self.output_dirs[is_valid], source_path or filename, self.shard_by)
+        ensure_dir(directory)
+        return Path(directory) / filename
+
+
+def compile_plan(camera: CameraConfig, config=None) -> CameraPlan:
+    """
+    Compile le plan d'une caméra. Sans `config`, seule la partie détection
+    est renseignée (empreinte et répertoires de sortie absents).
+    """
+    fingerprint, output_dirs, shard_by = None, {}, None
+    if config is not None:
+        fingerprint = camera_fingerprint(camera, config.detection.confidence_threshold)
+        structure = config.processing.output_structure
+        for is_valid in (True, False):
+            parts = [str(config.directories.output)]
+            if structure.organize_by_result:
+                parts.append("true" if is_valid else "false")
+            if structure.organize_by_camera:
+                parts.append(camera.name)
+            output_dirs[is_valid] = os.path.join(*parts)
+        shard_by = structure.shard_by
+    return CameraPlan(
+        config=camera,
+        detect=frozenset(camera.detect),
+        zones=tuple(camera.zones),
+        notify_zones=frozenset(z.name for z in camera.zones if z.text_msg or z.audio_msg),
+        fingerprint=fingerprint,
+        output_dirs=MappingProxyType(output_dirs),
+        shard_by=shard_by,
+    )
+
+
+def compile_plans(config) -> Mapping[str, CameraPlan]:
+    """Index nom -> plan pour toutes les caméras de la config."""
+    return MappingProxyType({camera.name: compile_plan(camera, config) for camera in config.cameras})
+
+
+def as_plan(camera: Union[CameraPlan, CameraConfig]) -> CameraPlan:
+    """Accepte un plan ou une CameraConfig brute (compilée à la volée)."""
+    return camera if isinstance(camera, CameraPlan) else compile_plan(camera)
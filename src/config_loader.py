@@ -4,12 +4,15 @@ Charge et valide le fichier config.yaml.
 """
 
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Mapping, Optional
 
 import yaml
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from pydantic_settings import BaseSettings
 
+if TYPE_CHECKING:
+    from src.camera_plan import CameraPlan
+
 
 class ZoneConfig(BaseModel):
     """Configuration d'une zone de détection."""
@@ -35,6 +38,13 @@ class ZoneConfig(BaseModel):
         return v
 
 
+class CameraImageConfig(BaseModel):
+    """Publication MQTT binaire de l'image annotée (entité camera HA)."""
+    enabled: bool = False
+    max_kb: int = Field(default=0, ge=0)             # image pleine taille non publiée au-delà (0 = illimité)
+    thumbnail_width: int = Field(default=0, ge=0)    # miniature publiée en plus (0 = aucune)
+
+
 class CameraConfig(BaseModel):
     """Configuration d'une caméra."""
     name: str
@@ -43,9 +53,23 @@ class CameraConfig(BaseModel):
     audio_msg: bool = False
     show_object: bool = True
     entity_ha: bool = True
+    priority: int = 0                    # plus grand = servi en premier par les workers
+    burst_window_ms: int = Field(default=0, ge=0)  # regroupement des rafales (0 = désactivé)
+    notify_cooldown_seconds: Optional[float] = Field(default=None, ge=0)  # surcharge du cooldown global
+    tracking: bool = False               # suivi d'objets entre snapshots
+    phash_threshold: Optional[int] = Field(default=None, ge=0, le=64)  # quasi-doublons (bits), None = désactivé
+    mqtt_image: CameraImageConfig = CameraImageConfig()
     zones: List[ZoneConfig] = Field(default_factory=list)
 
 
+class MQTTSpoolConfig(BaseModel):
+    """Spool disque des messages MQTT pendant une coupure du broker."""
+    enabled: bool = False
+    directory: Optional[Path] = None     # défaut: <output>/_spool
+    max_age_seconds: float = Field(default=3600.0, gt=0.0)  # messages plus vieux non rejoués
+    max_mb: float = Field(default=50.0, gt=0.0)
+
+
 class MQTTConfig(BaseModel):
     """Configuration MQTT."""
     broker: str
@@ -55,12 +79,85 @@ class MQTTConfig(BaseModel):
     username: str = ""
     password: str = ""
     topics: dict = Field(default_factory=dict)
+    sensor_mode: str = Field(default="per_metric", pattern="^(per_metric|state|changed)$")
+    sensor_min_interval: float = Field(default=0.0, ge=0.0)  # mode changed: secondes entre envois
+    spool: MQTTSpoolConfig = MQTTSpoolConfig()
+    max_inflight: int = Field(default=20, ge=1)                 # messages QoS>0 non acquittés simultanés
+    max_queued: int = Field(default=1000, ge=0)                 # file interne paho (0 = illimitée, sans back-pressure)
+    ack_timeout_seconds: float = Field(default=30.0, gt=0.0)    # message non acquitté abandonné au-delà
+    backpressure_timeout_seconds: float = Field(default=5.0, ge=0.0)  # attente max du pipeline si le broker est en retard
+    keepalive: int = Field(default=60, ge=5)
+    reconnect_min_delay: float = Field(default=1.0, gt=0.0)     # backoff exponentiel avec gigue
+    reconnect_max_delay: float = Field(default=120.0, gt=0.0)
 
 
 class HomeAssistantConfig(BaseModel):
     """Configuration Home Assistant."""
     autodiscovery: bool = True
     discovery_prefix: str = "homeassistant"
+    discovery_cache: Optional[Path] = None   # empreintes publiées (évite de republier au redémarrage)
+
+
+class NotificationConfig(BaseModel):
+    """Configuration de l'anti-rebond des notifications."""
+    cooldown_seconds: float = Field(default=0.0, ge=0.0)   # 0 = chaque image notifie
+    notify_on_count_change: bool = True                    # renvoyer si le nombre d'objets change
+    state_ttl_seconds: float = Field(default=3600.0, gt=0.0)
+
+
+class TrackingConfig(BaseModel):
+    """Configuration du suivi d'objets (caméras avec tracking: true)."""
+    iou_threshold: float = Field(default=0.3, gt=0.0, le=1.0)    # association piste/détection
+    stationary_iou: float = Field(default=0.7, gt=0.0, le=1.0)   # au-delà: objet immobile
+    max_missed: int = Field(default=3, ge=0)                     # snapshots absents avant départ
+    max_tracks: int = Field(default=64, ge=1)                    # borne mémoire par caméra
+
+
+class CacheConfig(BaseModel):
+    """Cache disque des résultats de détection (fichiers identiques)."""
+    enabled: bool = False
+    directory: Optional[Path] = None     # défaut: <output>/_cache
+    max_mb: float = Field(default=64.0, gt=0.0)
+
+
+class MetricsConfig(BaseModel):
+    """Endpoint HTTP Prometheus (/metrics) et état (/health)."""
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = Field(default=9108, ge=0, le=65535)
+
+
+class ProfilingConfig(BaseModel):
+    """Profilage à la demande (SIGUSR1 ou POST /profile) des N prochaines images."""
+    enabled: bool = False
+    images: int = Field(default=50, ge=1)
+    tracemalloc: bool = False  # instantanés mémoire en plus de cProfile
+    tracemalloc_frames: int = Field(default=10, ge=1)
+    # POST /profile sur un listener dédié, lié à 127.0.0.1 uniquement (jamais sur l'endpoint metrics)
+    http: bool = False
+    port: int = Field(default=9109, ge=0, le=65535)
+
+
+class HotReloadConfig(BaseModel):
+    """Rechargement à chaud de config.yaml (zones, classes, topics, modèle...)."""
+    enabled: bool = True
+    interval_seconds: float = Field(default=2.0, gt=0.0)   # période de vérification du fichier
+
+
+class RetentionPolicyConfig(BaseModel):
+    """Politique de rétention d'une catégorie de shared_out (true, false, original...)."""
+    category: str
+    camera: Optional[str] = None                          # None = toutes les caméras de la catégorie
+    max_age_days: Optional[float] = Field(default=None, gt=0.0)
+    max_gb: Optional[float] = Field(default=None, gt=0.0)
+
+
+class RetentionConfig(BaseModel):
+    """Nettoyage de shared_out en tâche de fond."""
+    enabled: bool = False
+    interval_seconds: float = Field(default=300.0, gt=0.0)
+    rescan_hours: float = Field(default=24.0, gt=0.0)     # réconciliation complète de l'index
+    policies: List[RetentionPolicyConfig] = Field(default_factory=list)
 
 
 class DetectionConfig(BaseModel):
@@ -87,11 +184,25 @@ class OutputStructureConfig(BaseModel):
     organize_by_camera: bool = True      # sous-dossiers par caméra
     save_original: bool = True           # copier image originale
     original_by_camera: bool = False     # sous-dossiers caméra dans original/
+    shard_by: Optional[str] = Field(default=None, pattern="^(day|hour)$")  # sous-dossiers de date
+    # Archivage des sources: essayées dans l'ordre, la copie n'est qu'un dernier recours
+    archive_strategies: List[str] = Field(default_factory=lambda: ["hardlink", "reflink", "rename", "copy"])
+
+    @field_validator("archive_strategies")
+    @classmethod
+    def validate_archive_strategies(cls, v: List[str]) -> List[str]:
+        unknown = [s for s in v if s not in ("hardlink", "reflink", "rename", "copy")]
+        if unknown or not v:
+            raise ValueError(f"archive_strategies invalides: {unknown or v}")
+        return v
 
 
 class ProcessingConfig(BaseModel):
     """Configuration du traitement des images."""
     input_action: str = Field(default="move", pattern="^(move|erase|none)$")
+    workers: int = Field(default=1, ge=1)  # threads de traitement
+    io_workers: int = Field(default=2, ge=0)  # threads move/erase/archivage (0 = dans le worker)
+    io_retries: int = Field(default=3, ge=1)  # tentatives par opération fichier
     output_structure: OutputStructureConfig = OutputStructureConfig()
 
 
@@ -99,6 +210,11 @@ class LoggingConfig(BaseModel):
     """Configuration des logs."""
     level: str = Field(default="info", pattern="^(debug|info|warning|error)$")
     format: str = "json"
+    # Écriture sur un thread dédié: les workers ne bloquent pas sur stdout
+    async_output: bool = True
+    queue_size: int = Field(default=10000, ge=1)
+    # Événements debug par image/zone/détection: 1 conservé sur N
+    debug_sample_every: int = Field(default=10, ge=1)
 
 
 class Config(BaseSettings):
@@ -109,24 +225,42 @@ class Config(BaseSettings):
     logging: LoggingConfig
     mqtt: MQTTConfig
     homeassistant: HomeAssistantConfig
+    notifications: NotificationConfig = NotificationConfig()
+    tracking: TrackingConfig = TrackingConfig()
+    cache: CacheConfig = CacheConfig()
+    retention: RetentionConfig = RetentionConfig()
+    hot_reload: HotReloadConfig = HotReloadConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
     detection: DetectionConfig
     cameras: List[CameraConfig]
 
+    _plans: Mapping[str, "CameraPlan"] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        # Import local: camera_plan dépend de ce module
+        from src.camera_plan import compile_plans
+        self._plans = compile_plans(self)
+
+    def get_plan(self, camera_name: str) -> Optional["CameraPlan"]:
+        """
+        Plan compilé d'une caméra (index par nom), 'generique' si le nom est
+        inconnu, None si aucune des deux n'existe.
+        """
+        plan = self._plans.get(camera_name)
+        if plan is None:
+            plan = self._plans.get("generique")
+        return plan
+
     def get_camera_config(self, camera_name: str) -> CameraConfig:
         """
         Récupère la configuration d'une caméra par son nom.
         Retourne la config 'generique' si le nom n'est pas trouvé.
         """
-        for camera in self.cameras:
-            if camera.name == camera_name:
-                return camera
-        
-        # Fallback vers caméra générique
-        for camera in self.cameras:
-            if camera.name == "generique":
-                return camera
-        
-        raise ValueError("No 'generique' camera configuration found as fallback")
+        plan = self.get_plan(camera_name)
+        if plan is None:
+            raise ValueError("No 'generique' camera configuration found as fallback")
+        return plan.config
 
 
 def load_config(config_path: str = "/app/config/config.yaml") -> Config:
@@ -0,0 +1,203 @@
+"""
+Rechargement à chaud de config.yaml.
+
+`ConfigWatcher` surveille le fichier (mtime, taille, inode: compatible avec
+les éditeurs qui remplacent le fichier par renommage), valide la nouvelle
+version avec `load_config` et ne la transmet que si elle est valide: une
+config invalide est journalisée et l'ancienne reste en service.
+
+`diff_configs` indique ce qui a changé pour que le pipeline n'invalide que
+le nécessaire (caméras modifiées, topics, modèle...). Les clés lues une
+seule fois au démarrage (répertoires, broker, workers...) conservent leur
+ancienne valeur jusqu'au redémarrage.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config_loader import Config, load_config
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+CONFIG_RELOADS = REGISTRY.counter("detect_config_reloads_total", "Rechargements de config (result=applied|invalid|failed|unchanged)")
+
+# Clés appliquées sans redémarrage (section entière ou "section.clé")
+LIVE_KEYS = {
+    "app",
+    "detection",
+    "notifications",
+    "homeassistant",
+    "processing.input_action",
+    "processing.output_structure",
+    "mqtt.qos",
+    "mqtt.retain",
+    "mqtt.topics",
+    "mqtt.backpressure_timeout_seconds",
+}
+
+
+@dataclass
+class ConfigChanges:
+    """Différences entre deux configurations validées."""
+
+    keys: Set[str] = field(default_factory=set)        # "section.clé" modifiées (hors caméras)
+    cameras: Set[str] = field(default_factory=set)     # caméras ajoutées, supprimées ou modifiées
+
+    @property
+    def model(self) -> bool:
+        """Le modèle YOLO doit être rechargé."""
+        return "detection.model" in self.keys
+
+    @property
+    def mqtt(self) -> bool:
+        return any(k.startswith("mqtt.") for k in self.keys)
+
+    @property
+    def discovery(self) -> bool:
+        """Discovery HA à republier pour toutes les caméras (topics, nom/version de l'app, préfixe)."""
+        return any(k == "mqtt.topics" or k.split(".", 1)[0] in ("app", "homeassistant") for k in self.keys)
+
+    @property
+    def restart_required(self) -> List[str]:
+        """Clés modifiées qui ne prendront effet qu'au prochain démarrage."""
+        return sorted(k for k in self.keys if k not in LIVE_KEYS and k.split(".", 1)[0] not in LIVE_KEYS)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys or self.cameras)
+
+
+def _leaves(config: Config) -> Dict[str, Any]:
+    flat = {}
+    for section, value in config.model_dump(exclude={"cameras"}).items():
+        if isinstance(value, dict):
+            for key, sub in value.items():
+                flat[f"{section}.{key}"] = sub
+        else:
+            flat[section] = value
+    return flat
+
+
+def diff_configs(old: Config, new: Config) -> ConfigChanges:
+    """Compare deux configurations (sections à un niveau, caméras par nom)."""
+    old_leaves, new_leaves = _leaves(old), _leaves(new)
+    keys = {k for k in old_leaves.keys() | new_leaves.keys() if old_leaves.get(k) != new_leaves.get(k)}
+    old_cams = {c.name: c.model_dump() for c in old.cameras}
+    new_cams = {c.name: c.model_dump() for c in new.cameras}
+    cameras = {name for name in old_cams.keys() | new_cams.keys() if old_cams.get(name) != new_cams.get(name)}
+    return ConfigChanges(keys=keys, cameras=cameras)
+
+
+def pin_restart_keys(old: Config, new: Config, keys: List[str]) -> Config:
+    """
+    Version de `new` où les clés non rechargeables reprennent leur valeur de
+    `old`. Reconstruite (et non copiée) pour recompiler les plans caméra.
+    """
+    data, previous = new.model_dump(), old.model_dump()
+    for key in keys:
+        section, _, sub = key.partition(".")
+        if sub:
+            data[section][sub] = previous[section][sub]
+        else:
+            data[section] = previous[section]
+    return type(new)(**data)
+
+
+class ConfigWatcher:
+    """Surveille config.yaml et publie chaque nouvelle version valide."""
+
+    def __init__(
+        self,
+        path,
+        current: Config,
+        on_change: Callable[[Config, Config, ConfigChanges], None],
+        interval: float = 2.0,
+        loader: Callable[[str], Config] = load_config,
+    ):
+        """
+        Args:
+            path: Fichier de configuration surveillé
+            current: Configuration en service
+            on_change: Appelé avec (ancienne, nouvelle, changements) depuis le thread de surveillance
+            interval: Période (s) de vérification du fichier
+            loader: Chargement + validation (injectable pour les tests)
+        """
+        self.path = Path(path)
+        self.current = current
+        self.on_change = on_change
+        self.interval = interval
+        self.loader = loader
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def check(self) -> Optional[ConfigChanges]:
+        """
+        Recharge si le fichier a changé.
+
+        Returns:
+            Les changements appliqués, None si rien n'a été appliqué
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        try:
+            new = self.loader(str(self.path))
+        except Exception as e:
+            CONFIG_RELOADS.inc(result="invalid")
+            logger.error("config_reload_invalid", path=str(self.path), error=str(e))
+            return None
+
+        changes = diff_configs(self.current, new)
+        if not changes:
+            CONFIG_RELOADS.inc(result="unchanged")
+            return None
+        pinned = changes.restart_required
+        if pinned:
+            logger.warning("config_reload_restart_required", keys=pinned)
+            new = pin_restart_keys(self.current, new, pinned)
+            changes.keys.difference_update(pinned)
+            if not changes:
+                CONFIG_RELOADS.inc(result="unchanged")
+                return None
+
+        try:
+            self.on_change(self.current, new, changes)
+        except Exception as e:
+            # Ex. nouveau modèle introuvable: l'ancienne config reste en service
+            CONFIG_RELOADS.inc(result="failed")
+            logger.error("config_reload_failed", path=str(self.path), error=str(e))
+            return None
+        self.current = new
+        CONFIG_RELOADS.inc(result="applied")
+        logger.info("config_reloaded", keys=sorted(changes.keys), cameras=sorted(changes.cameras))
+        return changes
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("config_reload_failed", error=str(e))
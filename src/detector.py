@@ -2,16 +2,21 @@
 Moteur de détection YOLO avec filtrage par zones.
 """
 import os
+import threading
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, FrozenSet, Tuple, Optional, Union
 import cv2
 from ultralytics import YOLO
+from src.camera_plan import CameraPlan, as_plan
 from src.config_loader import CameraConfig
-from src.zone_manager import ZoneManager
 from src.logger import get_logger
+from src.metrics import REGISTRY
+from src.timing import add_stage, stage
 
 logger = get_logger(__name__)
 
+INFERENCE_BACKEND = REGISTRY.gauge("detect_inference_backend_info", "Moteur d'inférence actif (backend, device, model)")
+
 
 class Detector:
     """Détecteur d'objets YOLO avec support des zones."""
@@ -23,13 +28,20 @@ class Detector:
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.model = YOLO(model_path)
+        # Le modèle ultralytics n'est pas thread-safe: inférence sérialisée entre workers
+        self._lock = threading.Lock()
+        # classes détectées (noms) -> identifiants du modèle
+        self._class_ids: Dict[FrozenSet[str], FrozenSet[int]] = {}
+        INFERENCE_BACKEND.clear()
+        INFERENCE_BACKEND.set(1, backend="ultralytics", device="cpu", model=model_path)
         logger.info("detector_initialized", model=model_path, threshold=confidence_threshold, device="cpu")
 
-    def detect(self, image_path: str, camera_config: CameraConfig) -> Tuple[List[Dict], Dict]:
+    def detect(self, image_path: str, camera_config: Union[CameraPlan, CameraConfig]) -> Tuple[List[Dict], Dict]:
         """
-        Détecte les objets dans une image.
+        Détecte les objets dans une image (plan compilé ou CameraConfig brute).
         """
-        image = cv2.imread(image_path)
+        with stage("decode"):
+            image = cv2.imread(image_path)
         if image is None:
             logger.error("image_load_failed", path=image_path)
             return [], self._empty_counters()
@@ -37,25 +49,82 @@ class Detector:
         height, width = image.shape[:2]
         logger.debug("image_loaded", path=image_path, width=width, height=height)
 
-        results = self.model(image, verbose=False, device="cpu")[0]
+        with self._lock:
+            results = self.model(image, verbose=False, device="cpu")[0]
+        self._record_speed(results)
+
+        return self._parse_results(results, image_path, width, height, as_plan(camera_config))
 
-        zone_manager = None
-        if camera_config.zones:
-            zone_manager = ZoneManager(camera_config.zones, width, height)
+    def detect_batch(
+        self, image_paths: List[str], camera_config: Union[CameraPlan, CameraConfig]
+    ) -> List[Tuple[List[Dict], Dict]]:
+        """
+        Détecte les objets sur plusieurs images d'une même caméra en un seul appel modèle.
+        Les images illisibles retournent des compteurs vides à leur position.
+        """
+        outputs: List[Tuple[List[Dict], Dict]] = [([], self._empty_counters()) for _ in image_paths]
+        images, positions = [], []
+        for idx, path in enumerate(image_paths):
+            with stage("decode"):
+                image = cv2.imread(path)
+            if image is None:
+                logger.error("image_load_failed", path=path)
+                continue
+            images.append(image)
+            positions.append(idx)
+
+        if not images:
+            return outputs
+
+        plan = as_plan(camera_config)
+
+        with self._lock:
+            batch_results = self.model(images, verbose=False, device="cpu")
+        for results in batch_results:
+            self._record_speed(results)
+
+        for idx, image, results in zip(positions, images, batch_results):
+            height, width = image.shape[:2]
+            outputs[idx] = self._parse_results(results, image_paths[idx], width, height, plan)
+
+        logger.debug("batch_detection_completed", camera=plan.name, images=len(image_paths))
+        return outputs
+
+    @staticmethod
+    def _record_speed(results) -> None:
+        """Étapes internes d'ultralytics (`speed`: millisecondes par image)."""
+        speed = getattr(results, "speed", None)
+        if isinstance(speed, dict):
+            for name in ("preprocess", "inference", "postprocess"):
+                if speed.get(name) is not None:
+                    add_stage(name, speed[name] / 1000)
+
+    def _class_ids_for(self, names: Dict[int, str], detect: FrozenSet[str]) -> FrozenSet[int]:
+        ids = self._class_ids.get(detect)
+        if ids is None:
+            ids = self._class_ids[detect] = frozenset(i for i, name in names.items() if name in detect)
+        return ids
+
+    def _parse_results(
+        self, results, image_path: str, width: int, height: int, camera_config: Union[CameraPlan, CameraConfig]
+    ) -> Tuple[List[Dict], Dict]:
+        """Convertit un résultat ultralytics en détections filtrées + compteurs."""
+        plan = as_plan(camera_config)
+        zone_manager = plan.zone_manager(width, height)
+        class_ids = self._class_ids_for(results.names, plan.detect)
 
         detections = []
         counters = self._empty_counters()
 
         for box in results.boxes:
+            # Filtrer par classe détectable avant toute conversion de la boîte
             class_id = int(box.cls[0])
+            if class_id not in class_ids:
+                continue
             class_name = results.names[class_id]
             confidence = float(box.conf[0])
             bbox = box.xyxy[0].cpu().numpy().tolist()  # [x1, y1, x2, y2]
 
-            # Filtrer par classe détectable
-            if class_name not in camera_config.detect:
-                continue
-
             # Marquer les fausses détections
             is_false = confidence < self.confidence_threshold
 
@@ -74,22 +143,25 @@ class Detector:
             else:
                 counters["by_class"][class_name] = counters["by_class"].get(class_name, 0) + 1
 
-            # Vérifier les zones
-            if zone_manager:
-                for zone_config in camera_config.zones:
-                    if zone_manager.bbox_center_in_zone(detection["bbox"], zone_config.name):
+            detections.append(detection)
+
+        # Vérifier les zones (passe séparée: étape mesurée à part)
+        if zone_manager:
+            with stage("zones"):
+                for detection in detections:
+                    for zone_config in plan.zones:
+                        if not zone_manager.bbox_center_in_zone(detection["bbox"], zone_config.name):
+                            continue
                         detection["zones"].append(zone_config.name)
 
-                        if not is_false:
+                        if not detection["is_false"]:
                             zone_key = f"zone_{zone_config.name}"
                             if zone_key not in counters["by_zone"]:
                                 counters["by_zone"][zone_key] = {"total": 0, "by_class": {}}
 
                             counters["by_zone"][zone_key]["total"] += 1
                             zc = counters["by_zone"][zone_key]["by_class"]
-                            zc[class_name] = zc.get(class_name, 0) + 1
-
-            detections.append(detection)
+                            zc[detection["class"]] = zc.get(detection["class"], 0) + 1
 
         # Calcul du nombre de détections valides
         valid = counters["total"] - counters["false"]
@@ -0,0 +1,147 @@
+"""
+Pool de threads dédié aux opérations fichiers (move/erase/archivage).
+
+Sur un partage réseau lent, le post-traitement des sources peut coûter plus
+cher que l'inférence: il est donc sorti des workers de détection. Les
+opérations portant sur un même fichier s'exécutent dans leur ordre de
+soumission. Seules les OSError transitoires (partage indisponible, délai
+réseau...) sont retentées avec backoff; un retour False ou une erreur
+définitive (fichier absent, argument invalide) termine l'opération.
+Une opération retentée doit donc être idempotente.
+"""
+
+import errno
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from src.backoff import ExponentialBackoff
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+FILE_OPS = REGISTRY.counter("detect_file_ops_total", "Opérations fichiers (op, result=ok|retried|failed)")
+FILE_OPS_PENDING = REGISTRY.gauge("detect_file_ops_pending", "Opérations fichiers en attente ou en cours")
+FILE_OP_SECONDS = REGISTRY.histogram("detect_file_op_seconds", "Durée des opérations fichiers (op)")
+
+# Erreurs qu'une nouvelle tentative ne corrigera pas
+_PERMANENT_ERRORS = (FileNotFoundError, IsADirectoryError, NotADirectoryError)
+_PERMANENT_ERRNOS = frozenset({errno.EINVAL, errno.ENAMETOOLONG})
+
+
+def is_transient(error: BaseException) -> bool:
+    """OSError susceptible de disparaître à la tentative suivante."""
+    return (
+        isinstance(error, OSError)
+        and not isinstance(error, _PERMANENT_ERRORS)
+        and error.errno not in _PERMANENT_ERRNOS
+    )
+
+
+@dataclass
+class _Task:
+    op: str
+    fn: Callable[..., Any]
+    args: Tuple = ()
+    kwargs: Dict = field(default_factory=dict)
+
+
+class FileOpsPool:
+    """Exécute les opérations fichiers en arrière-plan, ordonnées par clé."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_base: float = 0.5,
+        retry_cap: float = 10.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            workers: Nombre de threads d'I/O
+            max_attempts: Tentatives par opération avant abandon
+            retry_base: Premier délai (s) entre deux tentatives, doublé ensuite
+            retry_cap: Délai maximal (s) entre deux tentatives
+            sleep: Attente entre tentatives (injectable pour les tests)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-ops")
+        self._lock = threading.Condition()
+        self._chains: Dict[str, Deque[_Task]] = {}
+        self._pending = 0
+
+    def submit(self, key: str, op: str, fn: Callable[..., Any], *args, **kwargs) -> None:
+        """
+        Planifie `fn(*args, **kwargs)`; les tâches de même `key` (chemin source)
+        s'exécutent l'une après l'autre, dans l'ordre de soumission.
+        """
+        task = _Task(op, fn, args, kwargs)
+        with self._lock:
+            self._pending += 1
+            FILE_OPS_PENDING.set(self._pending)
+            chain = self._chains.get(key)
+            if chain is not None:
+                chain.append(task)
+                return
+            self._chains[key] = deque()
+        self._executor.submit(self._run_chain, key, task)
+
+    def _run_chain(self, key: str, task: Optional[_Task]) -> None:
+        while task is not None:
+            self._execute(task)
+            with self._lock:
+                self._pending -= 1
+                FILE_OPS_PENDING.set(self._pending)
+                chain = self._chains[key]
+                if chain:
+                    task = chain.popleft()
+                else:
+                    del self._chains[key]
+                    task = None
+                    self._lock.notify_all()
+
+    def _execute(self, task: _Task) -> None:
+        backoff = ExponentialBackoff(base=self.retry_base, cap=self.retry_cap)
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                ok = task.fn(*task.args, **task.kwargs) is not False
+                error, retry = None, False
+            except Exception as e:
+                ok, error, retry = False, str(e), is_transient(e)
+            FILE_OP_SECONDS.observe(time.perf_counter() - start, op=task.op)
+            if ok:
+                FILE_OPS.inc(op=task.op, result="ok")
+                return
+            if not retry or attempt >= self.max_attempts:
+                break
+            FILE_OPS.inc(op=task.op, result="retried")
+            self.sleep(backoff.next())
+        FILE_OPS.inc(op=task.op, result="failed")
+        logger.error("file_op_failed", op=task.op, attempts=attempt, error=error)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Attend la fin des opérations en cours (False si le délai expire)."""
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._chains, timeout)
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Termine les opérations en attente puis arrête les threads."""
+        if not self.drain(timeout):
+            logger.warning("file_ops_stop_timeout", pending=self.pending)
+        self._executor.shutdown(wait=False)
@@ -11,8 +11,13 @@ from typing import Callable, Optional
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
+from src.metrics import REGISTRY
+from src.timing import note_pending
+
 logger = logging.getLogger(__name__)
 
+IMAGES_DROPPED = REGISTRY.counter("detect_images_dropped_total", "Images non traitées (reason=unstable|no_camera|error)")
+
 
 class ImageFileHandler(FileSystemEventHandler):
     """Handler pour les événements de fichiers images."""
@@ -55,7 +60,13 @@ class ImageFileHandler(FileSystemEventHandler):
         try:
             # Attendre que le fichier soit complètement écrit
             # (utile si le fichier est copié depuis un autre processus)
-            self._wait_for_file_complete(file_path)
+            start = time.perf_counter()
+            try:
+                self._wait_for_file_complete(file_path)
+            except TimeoutError:
+                IMAGES_DROPPED.inc(reason="unstable")
+                raise
+            note_pending(str(file_path), "ready_wait", time.perf_counter() - start)
 
             logger.info(
                 "Nouveau fichier détecté",
@@ -187,11 +198,16 @@ class FileWatcher:
         """
         return self._is_running
 
-    def process_existing_files(self) -> None:
+    def process_existing_files(self, callback: Optional[Callable[[Path], None]] = None) -> None:
         """
         Traite les fichiers déjà présents dans le répertoire.
         Utile au démarrage de l'application.
+
+        Args:
+            callback: Remplace le callback du watcher pour ces fichiers
+                (ex. regroupement par date de prise de vue)
         """
+        callback = callback or self.callback
         logger.info(
             "Traitement des fichiers existants",
             extra={"directory": str(self.watch_directory)},
@@ -205,7 +221,7 @@ class FileWatcher:
                         "Traitement fichier existant",
                         extra={"file": str(file_path)},
                     )
-                    self.callback(file_path)
+                    callback(file_path)
                     files_processed += 1
                 except Exception as e:
                     logger.error(
@@ -0,0 +1,106 @@
+"""
+Génération des payloads d'autodiscovery MQTT Home Assistant.
+Une entité sensor par capteur publié (caméra et zones), rattachée à un
+device par caméra.
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict
+
+from src.config_loader import CameraConfig
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_-]+", "_", value).strip("_").lower() or "x"
+
+
+def _template(tpl: str, **values: str) -> str:
+    for k, v in values.items():
+        tpl = tpl.replace("{" + k + "}", v)
+    return tpl.replace("//", "/").rstrip("/")
+
+
+def payload_hash(payload: Dict) -> str:
+    """Empreinte stable d'un payload de discovery."""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def build_discovery_configs(
+    camera: CameraConfig,
+    *,
+    app_name: str = "detect_yolo_cpu_v2",
+    app_version: str = "",
+    discovery_prefix: str = "homeassistant",
+    sensor_topic: str = "detect_yolo_cpu_v2/sensor/{camera}/{metric}",
+    state_topic: str = "detect_yolo_cpu_v2/state/{camera}",
+    sensor_mode: str = "per_metric",
+    image_topic: str = "detect_yolo_cpu_v2/image/{camera}/{variant}",
+) -> Dict[str, Dict]:
+    """
+    Construit les configs de discovery d'une caméra.
+
+    Returns:
+        {topic de config: payload} pour chaque entité
+    """
+    if not camera.entity_ha:
+        return {}
+
+    node_id = _slug(app_name)
+    cam_slug = _slug(camera.name)
+    device = {
+        "identifiers": [f"{node_id}_{cam_slug}"],
+        "name": f"{app_name} {camera.name}",
+        "manufacturer": app_name,
+        "model": "YOLO CPU",
+    }
+    if app_version:
+        device["sw_version"] = app_version
+
+    metrics = [("detections", "Détections", None), ("false_detections", "Fausses détections", None)]
+    for zone in camera.zones:
+        if not zone.entity_ha:
+            continue
+        metrics.append((f"zone_zone_{zone.name}_total", f"Zone {zone.name}", f"zone_zone_{zone.name}_by_class"))
+    if camera.tracking:
+        metrics.append(("tracked_objects", "Objets suivis", None))
+        metrics.append(("new_objects", "Nouveaux objets", None))
+
+    configs: Dict[str, Dict] = {}
+    for metric, label, attributes_metric in metrics:
+        object_id = f"{cam_slug}_{_slug(metric)}"
+        payload = {
+            "name": label,
+            "unique_id": f"{node_id}_{object_id}",
+            "object_id": f"{node_id}_{object_id}",
+            "state_class": "measurement",
+            "icon": "mdi:cctv",
+            "device": device,
+        }
+        if sensor_mode == "state":
+            payload["state_topic"] = _template(state_topic, camera=camera.name)
+            payload["value_template"] = "{{ value_json.%s | default(0) }}" % metric
+            if attributes_metric:
+                payload["json_attributes_topic"] = payload["state_topic"]
+                payload["json_attributes_template"] = "{{ value_json.%s | default({}) | tojson }}" % attributes_metric
+        else:
+            payload["state_topic"] = _template(sensor_topic, camera=camera.name, metric=metric)
+            payload["value_template"] = "{{ value_json.value }}"
+            if attributes_metric:
+                payload["json_attributes_topic"] = _template(sensor_topic, camera=camera.name, metric=attributes_metric)
+                payload["json_attributes_template"] = "{{ value_json.value | tojson }}"
+
+        topic = f"{discovery_prefix}/sensor/{node_id}/{object_id}/config"
+        configs[topic] = payload
+
+    if camera.mqtt_image.enabled:
+        object_id = f"{cam_slug}_image"
+        configs[f"{discovery_prefix}/camera/{node_id}/{object_id}/config"] = {
+            "name": "Image annotée",
+            "unique_id": f"{node_id}_{object_id}",
+            "object_id": f"{node_id}_{object_id}",
+            "topic": _template(image_topic, camera=camera.name, variant="jpeg"),
+            "device": device,
+        }
+    return configs
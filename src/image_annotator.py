@@ -9,10 +9,17 @@ import numpy as np
 from src.zone_manager import ZoneManager
 from src.config_loader import CameraConfig
 from src.logger import get_logger
+from src.timing import stage
+from src.utils import write_in_dir
 
 logger = get_logger(__name__)
 
 
+def _write_buffer(path: str, buffer: np.ndarray) -> None:
+    with open(path, "wb") as f:
+        f.write(memoryview(buffer))
+
+
 class ImageAnnotator:
     """Annotateur d'images pour visualiser zones et détections."""
     
@@ -60,34 +67,72 @@ class ImageAnnotator:
         Returns:
             True si succès
         """
+        return self.write_composite(image_path, output_path, detections, zone_manager) is not None
+
+    def write_composite(
+        self,
+        image_path: str,
+        output_path: str,
+        detections: List[Dict],
+        zone_manager: Optional[ZoneManager] = None,
+        thumbnail_width: int = 0,
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Comme annotate_composite, mais retourne les buffers JPEG encodés pour
+        réutilisation (publication MQTT) sans relire le fichier écrit.
+        
+        Args:
+            thumbnail_width: Largeur de la miniature à encoder en plus (0 = aucune)
+            
+        Returns:
+            {'jpeg': buffer, 'thumbnail': buffer optionnel} ou None en cas d'échec
+        """
         # Charger l'image
-        image = cv2.imread(image_path)
+        with stage("decode"):
+            image = cv2.imread(image_path)
         if image is None:
             logger.error("image_load_failed", path=image_path)
-            return False
-        
-        annotated = image.copy()
-        
-        # Dessiner les zones si activées
-        if zone_manager and self.camera_config.zones:
-            for idx, zone_config in enumerate(self.camera_config.zones):
-                if zone_config.show_zone:
-                    color = self.ZONE_COLORS[idx % len(self.ZONE_COLORS)]
-                    self._draw_zone(annotated, zone_manager, zone_config.name, color)
+            return None
         
-        # Dessiner les détections si activées
-        if self.camera_config.show_object:
-            for detection in detections:
-                self._draw_detection(annotated, detection)
+        with stage("annotate"):
+            annotated = image.copy()
+            
+            # Dessiner les zones si activées
+            if zone_manager and self.camera_config.zones:
+                for idx, zone_config in enumerate(self.camera_config.zones):
+                    if zone_config.show_zone:
+                        color = self.ZONE_COLORS[idx % len(self.ZONE_COLORS)]
+                        self._draw_zone(annotated, zone_manager, zone_config.name, color)
+            
+            # Dessiner les détections si activées
+            if self.camera_config.show_object:
+                for detection in detections:
+                    self._draw_detection(annotated, detection)
         
-        # Sauvegarder
-        success = cv2.imwrite(output_path, annotated)
-        if success:
-            logger.info("composite_created", output=output_path)
-        else:
+        # Encoder une seule fois, puis écrire le buffer tel quel
+        ext = Path(output_path).suffix or ".jpg"
+        with stage("encode"):
+            ok, encoded = cv2.imencode(ext, annotated)
+        if ok:
+            try:
+                with stage("write"):
+                    write_in_dir(Path(output_path).parent, lambda: _write_buffer(output_path, encoded))
+            except OSError:
+                ok = False
+        if not ok:
             logger.error("composite_save_failed", output=output_path)
+            return None
+        logger.info("composite_created", output=output_path)
         
-        return success
+        buffers = {"jpeg": encoded}
+        if thumbnail_width and annotated.shape[1] > thumbnail_width:
+            with stage("encode"):
+                height = max(1, round(annotated.shape[0] * thumbnail_width / annotated.shape[1]))
+                small = cv2.resize(annotated, (thumbnail_width, height), interpolation=cv2.INTER_AREA)
+                ok, thumb = cv2.imencode(".jpg", small)
+            if ok:
+                buffers["thumbnail"] = thumb
+        return buffers
     
     def annotate_zone(
         self,
@@ -1,25 +1,140 @@
 """
 Configuration du système de logging avec structlog.
 Fournit des logs structurés au format JSON.
+
+Les workers ne font qu'empiler les lignes rendues dans une file bornée:
+l'écriture sur stdout a lieu dans un thread dédié (`AsyncLogWriter`).
+Les niveaux désactivés sont filtrés avant tout rendu, et les événements
+debug du chemin chaud (`SAMPLED_DEBUG_EVENTS`) sont échantillonnés.
 """
 
+import atexit
+import itertools
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, FrozenSet, Iterable, Optional, TextIO
 
 import structlog
 
+from src.metrics import REGISTRY
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "detect_log_records_dropped_total", "Lignes de log écartées (reason=queue_full|sampled)"
+)
+
+# Événements debug émis par image, zone ou détection: 1 sur N conservé
+SAMPLED_DEBUG_EVENTS: FrozenSet[str] = frozenset({
+    "image_loaded",
+    "zone_created",
+    "detections_filtered",
+    "phash_result_reused",
+    "notification_suppressed",
+    "camera_message_built",
+    "zone_message_built",
+})
+
+_writer: Optional["AsyncLogWriter"] = None
+# Niveau fixé par setup_logger (tout est actif avant configuration, comme structlog)
+_level = logging.NOTSET
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui écarte (et compte) les lignes quand la file est pleine."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(reason="queue_full")
+
+
+class AsyncLogWriter:
+    """Écriture des logs sur un thread dédié, alimenté par une file bornée."""
+
+    def __init__(self, stream: TextIO = sys.stdout, queue_size: int = 10000):
+        """
+        Args:
+            stream: Flux de sortie (stdout par défaut)
+            queue_size: Lignes en attente au-delà desquelles les nouvelles sont écartées
+        """
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        self.handler = _DroppingQueueHandler(self.queue)
+        target = logging.StreamHandler(stream)
+        target.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = QueueListener(self.queue, target)
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._running:
+                self._listener.start()
+                self._running = True
+
+    def stop(self) -> None:
+        """Écrit les lignes encore en file puis arrête le thread."""
+        with self._lock:
+            if self._running:
+                self._listener.stop()
+                self._running = False
+
+
+class DebugSampler:
+    """
+    Processeur structlog: ne conserve qu'un événement debug sur `every` pour
+    les noms de `events` (le premier est toujours gardé). Les lignes gardées
+    portent `sampled=every`.
+    """
 
-def setup_logger(level: str = "info", format: str = "json") -> structlog.BoundLogger:
+    def __init__(self, every: int, events: Iterable[str] = SAMPLED_DEBUG_EVENTS):
+        self.every = every
+        self.events = frozenset(events)
+        self._counters: Dict[str, "itertools.count[int]"] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, logger, method_name: str, event_dict: Dict) -> Dict:
+        if self.every <= 1 or method_name != "debug":
+            return event_dict
+        event = event_dict.get("event")
+        if event not in self.events:
+            return event_dict
+        with self._lock:
+            counter = self._counters.get(event)
+            if counter is None:
+                counter = self._counters[event] = itertools.count()
+            n = next(counter)
+        if n % self.every:
+            LOG_RECORDS_DROPPED.inc(reason="sampled")
+            raise structlog.DropEvent
+        event_dict["sampled"] = self.every
+        return event_dict
+
+
+def setup_logger(
+    level: str = "info",
+    format: str = "json",
+    async_output: bool = True,
+    queue_size: int = 10000,
+    debug_sample_every: int = 1,
+) -> structlog.BoundLogger:
     """
     Configure le système de logging avec structlog.
 
     Args:
         level: Niveau de log (debug, info, warning, error)
         format: Format des logs (json ou console)
+        async_output: Écriture sur un thread dédié (sinon synchrone sur stdout)
+        queue_size: Taille de la file d'écriture asynchrone
+        debug_sample_every: 1 événement debug du chemin chaud conservé sur N
 
     Returns:
         Logger structlog configuré
     """
+    global _writer, _level
+
     # Mapper les niveaux de log
     log_levels = {
         "debug": logging.DEBUG,
@@ -29,16 +144,20 @@ def setup_logger(level: str = "info", format: str = "json") -> structlog.BoundLo
     }
 
     log_level = log_levels.get(level.lower(), logging.INFO)
+    _level = log_level
+
+    # Configuration du logging standard Python (remplace une configuration précédente)
+    stop_logging()
+    if async_output:
+        _writer = AsyncLogWriter(sys.stdout, queue_size)
+        _writer.start()
+        logging.basicConfig(format="%(message)s", handlers=[_writer.handler], level=log_level, force=True)
+    else:
+        logging.basicConfig(format="%(message)s", stream=sys.stdout, level=log_level, force=True)
 
-    # Configuration du logging standard Python
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=log_level,
-    )
-
-    # Processeurs communs
+    # Processeurs communs (l'échantillonnage passe avant tout enrichissement)
     shared_processors = [
+        DebugSampler(debug_sample_every),
         structlog.contextvars.merge_contextvars,
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
@@ -62,10 +181,11 @@ def setup_logger(level: str = "info", format: str = "json") -> structlog.BoundLo
             structlog.dev.ConsoleRenderer(),
         ]
 
-    # Configuration structlog
+    # Configuration structlog: les méthodes des niveaux désactivés sont des no-op,
+    # aucun processeur ne s'exécute pour elles
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
@@ -79,12 +199,29 @@ def setup_logger(level: str = "info", format: str = "json") -> structlog.BoundLo
         extra={
             "level": level,
             "format": format,
+            "async_output": async_output,
         },
     )
 
     return logger
 
 
+def is_enabled_for(level: int) -> bool:
+    """Le niveau est-il actif ? À tester avant de construire des arguments coûteux."""
+    return level >= _level
+
+
+def stop_logging() -> None:
+    """Vide la file d'écriture asynchrone et arrête son thread (sans effet en synchrone)."""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name: str = None) -> structlog.BoundLogger:
     """
     Récupère un logger structlog.
@@ -97,4 +234,4 @@ def get_logger(name: str = None) -> structlog.BoundLogger:
     """
     if name:
         return structlog.get_logger(name)
-    return structlog.get_logger()
\ No newline at end of file
+    return structlog.get_logger()
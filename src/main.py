@@ -3,6 +3,7 @@ Point d'entrée principal de l'application detect_yolo_cpu_v2.
 Orchestre configuration, détection, annotation, MQTT.
 """
 
+import copy
 import os
 os.environ["CUDA_VISIBLE_DEVICES"] = ""
 os.environ["ULTRALYTICS_FORCE_CPU"] = "1"
@@ -10,34 +11,87 @@ os.environ["ULTRALYTICS_FORCE_CPU"] = "1"
 import signal
 import sys
 import time
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
+from src.burst import BurstCoalescer, select_best_frame
+from src.camera_plan import CameraPlan
 from src.config_loader import load_config
+from src.config_reload import ConfigChanges, ConfigWatcher
 from src.detector import Detector
-from src.file_watcher import FileWatcher
+from src.file_ops import FileOpsPool
+from src.file_watcher import IMAGES_DROPPED, FileWatcher
 from src.image_annotator import ImageAnnotator
-from src.logger import setup_logger
+from src.logger import setup_logger, stop_logging
 from src.message_builder import MessageBuilder
+from src.metrics import REGISTRY
+from src.metrics_server import MetricsServer, collect_process
 from src.mqtt_publisher import MQTTPublisher
+from src.notification_suppressor import NotificationSuppressor
+from src.perceptual_hash import NearDuplicateFilter, dhash
+from src.profiling import LOCAL_HOST, PROFILES_DIR, Profiler
+from src.result_cache import ResultCache, model_fingerprint
+from src.retention import Policy, RetentionManager
+from src.sensor_batcher import SensorBatcher
+from src.scheduler import CameraScheduler, WorkerPool
+from src.timing import STAGE_STATS, StageTimer, stage
+from src.tracker import ObjectTracker
 from src.utils import handle_processed_image
-from src.zone_manager import ZoneManager
 
 logger = None
+STAGE_SUMMARY_EVERY = 100  # images entre deux résumés de percentiles
+IMAGES_PROCESSED = REGISTRY.counter("detect_images_processed_total", "Images traitées (camera, result=ok|error)")
 watcher: Optional[FileWatcher] = None
 mqtt_client: Optional[MQTTPublisher] = None
+worker_pool: Optional[WorkerPool] = None
+coalescer: Optional[BurstCoalescer] = None
+suppressor: Optional[NotificationSuppressor] = None
+tracker: Optional[ObjectTracker] = None
+result_cache: Optional[ResultCache] = None
+near_duplicates: Optional[NearDuplicateFilter] = None
+sensor_batcher: Optional[SensorBatcher] = None
+retention: Optional[RetentionManager] = None
+file_ops: Optional[FileOpsPool] = None
+# (config, détecteur) actifs, remplacés d'un seul bloc au rechargement
+active: Optional[Tuple[object, Detector]] = None
+config_watcher: Optional[ConfigWatcher] = None
+metrics_server: Optional[MetricsServer] = None
+profiler: Optional[Profiler] = None
+profile_server: Optional[MetricsServer] = None
 
 
 def signal_handler(signum, frame):
-    global watcher, mqtt_client
+    global watcher, mqtt_client, worker_pool, coalescer, sensor_batcher, retention, file_ops, config_watcher, metrics_server
+    global profile_server
     logger.info("Signal de terminaison reçu, arrêt de l'application", extra={"signal": signum})
+    if config_watcher:
+        config_watcher.stop()
     if watcher and watcher.is_running():
         logger.info("Arrêt du FileWatcher...")
         watcher.stop()
+    if coalescer:
+        # Avant la fermeture du scheduler: plus aucun timer de rafale ne lui soumet d'images
+        coalescer.close()
+    if sensor_batcher:
+        sensor_batcher.flush_all()
+    if worker_pool:
+        logger.info("Arrêt des workers...")
+        worker_pool.stop()
+    if file_ops:
+        logger.info("Fin des opérations fichiers en attente...", extra={"pending": file_ops.pending})
+        file_ops.stop()
+    if retention:
+        retention.stop()
     if mqtt_client:
         logger.info("Déconnexion MQTT...")
         mqtt_client.disconnect()
+    if metrics_server:
+        metrics_server.stop()
+    if profile_server:
+        profile_server.stop()
     logger.info("Application arrêtée proprement")
+    stop_logging()
     sys.exit(0)
 
 
@@ -46,6 +100,298 @@ def extract_camera_name(filename: str) -> str:
     return parts[0] if len(parts) >= 2 else "generique"
 
 
+def resolve_camera(camera_name: str, config):
+    """Retourne (nom, plan compilé) avec fallback 'generique'; plan None si introuvable."""
+    plan = config.get_plan(camera_name)
+    if plan is None:
+        logger.error("Aucune caméra 'generique' dans la config, abandon")
+        return camera_name, None
+    if plan.name != camera_name:
+        logger.warning("Caméra non trouvée, utilisation de 'generique'", extra={"camera_requested": camera_name})
+    return plan.name, plan
+
+
+def _should_notify(camera_name: str, zone_name: Optional[str], msg: dict) -> bool:
+    """Consulte l'anti-rebond global s'il est configuré."""
+    if suppressor is None:
+        return True
+    return suppressor.should_notify(camera_name, zone_name, msg.get("by_class", {}))
+
+
+def cooldown_lookup(config):
+    """Cooldown par caméra: valeur propre à la caméra, sinon cooldown global."""
+    cooldowns = {
+        c.name: c.notify_cooldown_seconds
+        for c in config.cameras
+        if c.notify_cooldown_seconds is not None
+    }
+    default = config.notifications.cooldown_seconds
+    return lambda camera: cooldowns.get(camera, default)
+
+
+def build_suppressor(config) -> NotificationSuppressor:
+    """Anti-rebond avec cooldown global, surchargé par caméra si défini."""
+    return NotificationSuppressor(
+        cooldown_lookup(config),
+        notify_on_count_change=config.notifications.notify_on_count_change,
+        state_ttl=config.notifications.state_ttl_seconds,
+    )
+
+
+def build_tracker(config) -> ObjectTracker:
+    return ObjectTracker(
+        iou_threshold=config.tracking.iou_threshold,
+        stationary_iou=config.tracking.stationary_iou,
+        max_missed=config.tracking.max_missed,
+        max_tracks=config.tracking.max_tracks,
+    )
+
+
+def run_detection(image_paths: List[Path], plan: CameraPlan, detector: Detector):
+    """
+    Détection avec consultation du cache de résultats puis des quasi-doublons.
+    Les images restantes passent par le modèle (en batch si plusieurs).
+
+    Returns:
+        Liste de (detections, counters) dans l'ordre de image_paths
+    """
+    results = [None] * len(image_paths)
+    keys = [None] * len(image_paths)
+    if result_cache is not None:
+        camera_hash = plan.fingerprint
+        for i, path in enumerate(image_paths):
+            keys[i] = result_cache.key_for(str(path), camera_hash)
+            results[i] = result_cache.get(keys[i])
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    to_store = list(pending)
+
+    # Quasi-doublons: réutilise le résultat d'une image récente visuellement identique
+    hashes = {}
+    phash_threshold = plan.config.phash_threshold
+    if near_duplicates is not None and phash_threshold is not None:
+        for i in pending:
+            hashes[i] = dhash(str(image_paths[i]))
+            if hashes[i] is not None:
+                results[i] = near_duplicates.lookup(plan.name, hashes[i], phash_threshold)
+        pending = [i for i in pending if results[i] is None]
+
+    if len(pending) == 1:
+        fresh = [detector.detect(str(image_paths[pending[0]]), plan)]
+    elif pending:
+        fresh = detector.detect_batch([str(image_paths[i]) for i in pending], plan)
+    else:
+        fresh = []
+
+    for i, (detections, counters) in zip(pending, fresh):
+        results[i] = (detections, counters)
+        if hashes.get(i) is not None:
+            near_duplicates.remember(plan.name, hashes[i], detections, counters)
+
+    if result_cache is not None:
+        for i in to_store:
+            result_cache.put(keys[i], *results[i])
+    return results
+
+
+def build_result_cache(config) -> Optional[ResultCache]:
+    """Cache de résultats si activé; répertoire par défaut <output>/_cache."""
+    if not config.cache.enabled:
+        return None
+    directory = config.cache.directory or Path(config.directories.output) / "_cache"
+    return ResultCache(
+        directory,
+        model_fingerprint(config.detection.model),
+        max_bytes=int(config.cache.max_mb * 1024 * 1024),
+    )
+
+
+def publish_composite(camera_name: str, image_cfg, buffers: dict, mqtt_client: MQTTPublisher) -> None:
+    """Publie le composite (et sa miniature) en respectant la taille maximale de la caméra."""
+    jpeg = buffers["jpeg"]
+    if image_cfg.max_kb and jpeg.nbytes > image_cfg.max_kb * 1024:
+        logger.warning(
+            "Image composite trop volumineuse pour MQTT",
+            extra={"camera": camera_name, "size_kb": jpeg.nbytes // 1024, "max_kb": image_cfg.max_kb},
+        )
+    else:
+        mqtt_client.publish_image_bytes(camera_name, jpeg)
+    if "thumbnail" in buffers:
+        mqtt_client.publish_image_bytes(camera_name, buffers["thumbnail"], variant="thumbnail")
+
+
+def publish_results(
+    image_path: Path,
+    camera_name: str,
+    plan: CameraPlan,
+    detections,
+    counters,
+    mqtt_client: MQTTPublisher,
+    message_builder: MessageBuilder,
+) -> int:
+    """
+    Annotation, notifications et capteurs pour une image détectée.
+
+    Returns:
+        Nombre de détections valides retenues pour les capteurs
+    """
+    # 2) Annotation – composite unique avec zones
+    camera_config = plan.config
+    annotator = ImageAnnotator(camera_config)
+    from cv2 import imread
+    with stage("decode"):
+        img = imread(str(image_path))
+    if img is None:
+        raise RuntimeError(f"Impossible de lire l'image: {image_path}")
+    image_h, image_w = img.shape[:2]
+    zone_manager = plan.zone_manager(image_w, image_h)
+
+    # Répertoire de sortie (nom original conservé, sous-dossiers de date si shard_by)
+    is_valid = (counters["total"] - counters["false"]) > 0
+    composite_path = plan.output_path(image_path.name, is_valid, str(image_path))
+    image_cfg = camera_config.mqtt_image
+    buffers = annotator.write_composite(
+        str(image_path), str(composite_path), detections, zone_manager,
+        thumbnail_width=image_cfg.thumbnail_width if image_cfg.enabled else 0,
+    )
+    logger.info("Image composite créée", extra={"path": str(composite_path)})
+    if buffers and retention is not None:
+        retention.record(composite_path)
+
+    # 2ter) Image annotée en binaire sur MQTT (buffer déjà encodé, pas de relecture)
+    if buffers and image_cfg.enabled and is_valid:
+        with stage("mqtt"):
+            publish_composite(camera_name, image_cfg, buffers, mqtt_client)
+
+    # 2bis) Suivi: avec tracking, les notifications ne portent que sur les nouveaux objets
+    notify_detections, notify_counters = detections, counters
+    track_events = None
+    if tracker is not None and camera_config.tracking:
+        track_events = tracker.update(camera_name, detections)
+        notify_detections = track_events.new
+        notify_counters = dict(counters, by_class=dict(Counter(d["class"] for d in track_events.new)))
+
+    # 3) NOTIFICATIONS
+    # Map: zone_name -> liste de détections VALIDE (is_false=False) appartenant à la zone
+    zone_detections_map = {}
+    for d in notify_detections:
+        if d.get("is_false"):
+            continue
+        for zname in d.get("zones", []):
+            zone_detections_map.setdefault(zname, []).append(d)
+
+    # Zones qui ont au moins une détection valide
+    zones_with_dets = [z for z in plan.zones if zone_detections_map.get(z.name)]
+    # Au moins une zone autorise une notif ?
+    has_zone_notify = any(z.name in plan.notify_zones for z in zones_with_dets)
+
+    # 3.1 Notifications ZONE (uniquement celles autorisées)
+    for z in zones_with_dets:
+        if z.name in plan.notify_zones:
+            z_dets = zone_detections_map.get(z.name, [])
+            zone_msg = message_builder.build_zone_message(z, notify_counters, z_dets)
+            if zone_msg and z.text_msg and _should_notify(camera_name, z.name, zone_msg):
+                with stage("mqtt"):
+                    mqtt_client.publish_notification(
+                        camera_name, z.name, zone_msg["message"], zone_msg.get("audio", False)
+                    )
+
+    # 3.2 Notification CAMÉRA
+    # Règle: aucune notif caméra si des zones ont des détections mais qu'aucune n'autorise message/audio
+    send_camera_msg = False
+    if not plan.zones:
+        send_camera_msg = True
+    elif zones_with_dets and has_zone_notify:
+        send_camera_msg = False
+    elif zones_with_dets and not has_zone_notify:
+        send_camera_msg = False
+    else:
+        send_camera_msg = False
+
+    if send_camera_msg and camera_config.text_msg:
+        camera_msg = message_builder.build_camera_message(camera_config, notify_counters)
+        if camera_msg and _should_notify(camera_name, None, camera_msg):
+            with stage("mqtt"):
+                mqtt_client.publish_notification(
+                    camera_name, None, camera_msg["message"], camera_msg.get("audio", False)
+                )
+
+    # 4) Capteurs MQTT
+    if plan.zones:
+        det_sum = sum(v.get("total", 0) for v in counters.get("by_zone", {}).values())
+    else:
+        det_sum = counters["total"] - counters["false"]
+
+    if camera_config.entity_ha:
+        sensors = {"detections": det_sum, "false_detections": counters["false"]}
+
+        # Compteurs par zone
+        for zone_key, zc in counters.get("by_zone", {}).items():
+            zname = zone_key.split("zone_", 1)[1] if zone_key.startswith("zone_") else zone_key
+            sensors[f"zone_zone_{zname}_total"] = zc.get("total", 0)
+            sensors[f"zone_zone_{zname}_by_class"] = zc.get("by_class", {})
+
+        if track_events is not None:
+            sensors["tracked_objects"] = track_events.active
+            sensors["new_objects"] = len(track_events.new)
+            for z in plan.zones:
+                sensors[f"zone_zone_{z.name}_new"] = len(zone_detections_map.get(z.name, []))
+
+        with stage("mqtt"):
+            if sensor_batcher is not None:
+                sensor_batcher.publish(camera_name, sensors)
+            else:
+                for metric, value in sensors.items():
+                    mqtt_client.publish_sensor(camera_name, metric, value)
+
+    return det_sum
+
+
+def log_stage_percentiles() -> None:
+    """Résumé périodique des percentiles glissants par étape."""
+    if STAGE_STATS.observations % STAGE_SUMMARY_EVERY == 0:
+        logger.info("Percentiles des étapes (ms)", extra={"stages": STAGE_STATS.percentiles()})
+
+
+def finalize_source(image_path: Path, camera_name: str, config) -> None:
+    """
+    5) Post-traitement de la source (move/erase/none + archivage original).
+
+    Avec un pool d'I/O, l'opération est planifiée en arrière-plan (ordre
+    garanti par fichier, nouvelles tentatives sur erreur transitoire) et le
+    worker est libéré. `state` est partagé par les tentatives d'une même
+    opération pour qu'une reprise n'archive pas la source deux fois.
+
+    Étape mesurée: `file_ops_enqueue` (mise en file seule, l'exécution est
+    dans detect_file_op_seconds) avec le pool, `file_ops` sans.
+    """
+    if file_ops is not None:
+        with stage("file_ops_enqueue"):
+            file_ops.submit(
+                str(image_path), config.processing.input_action, _finalize_source, image_path, camera_name, config,
+                state={},
+            )
+    else:
+        with stage("file_ops"):
+            _finalize_source(image_path, camera_name, config)
+
+
+def _finalize_source(image_path: Path, camera_name: str, config, state: Optional[dict] = None) -> bool:
+    return handle_processed_image(
+        str(image_path),
+        config.processing.input_action,
+        str(config.directories.output),
+        save_original=bool(config.processing.output_structure.save_original),
+        original_by_camera=bool(config.processing.output_structure.original_by_camera),
+        camera=camera_name,
+        strategies=config.processing.output_structure.archive_strategies,
+        shard_by=config.processing.output_structure.shard_by,
+        on_archived=retention.record if retention is not None else None,
+        state=state,
+        raise_errors=state is not None,
+    )
+
+
 def process_image(
     image_path: Path,
     config,
@@ -53,142 +399,227 @@ def process_image(
     mqtt_client: MQTTPublisher,
     message_builder: MessageBuilder,
 ) -> None:
+    camera_name = extract_camera_name(image_path.name)
     try:
-        camera_name = extract_camera_name(image_path.name)
-
         logger.info("Traitement image démarré", extra={"file": str(image_path), "camera": camera_name})
 
         # Config caméra ou fallback "generique"
-        camera_config = next((c for c in config.cameras if c.name == camera_name), None)
-        if camera_config is None:
-            logger.warning("Caméra non trouvée, utilisation de 'generique'", extra={"camera_requested": camera_name})
-            camera_config = next((c for c in config.cameras if c.name == "generique"), None)
-            camera_name = "generique" if camera_config else camera_name
-        if camera_config is None:
-            logger.error("Aucune caméra 'generique' dans la config, abandon")
+        camera_name, plan = resolve_camera(camera_name, config)
+        if plan is None:
+            IMAGES_DROPPED.inc(reason="no_camera")
             return
 
-        # 1) Détection
-        detections, counters = detector.detect(str(image_path), camera_config)
-        logger.info(
-            "Détection terminée",
-            extra={"camera": camera_name, "total": counters["total"], "false": counters["false"], "by_class": counters["by_class"]},
-        )
+        with StageTimer() as timer:
+            timer.adopt(str(image_path))
+
+            # 1) Détection
+            detections, counters = run_detection([image_path], plan, detector)[0]
+            logger.info(
+                "Détection terminée",
+                extra={"camera": camera_name, "total": counters["total"], "false": counters["false"], "by_class": counters["by_class"]},
+            )
+
+            det_sum = publish_results(
+                image_path, camera_name, plan, detections, counters, mqtt_client, message_builder
+            )
+
+            finalize_source(image_path, camera_name, config)
+
+            logger.info(
+                "Traitement image terminé avec succès",
+                extra={
+                    "file": str(image_path),
+                    "camera": camera_name,
+                    "detections": det_sum,
+                    "timings_ms": timer.as_ms(),
+                },
+            )
+        IMAGES_PROCESSED.inc(camera=camera_name, result="ok")
+        log_stage_percentiles()
 
-        # 2) Annotation – composite unique avec zones
-        annotator = ImageAnnotator(camera_config)
-        from cv2 import imread
-        img = imread(str(image_path))
-        if img is None:
-            raise RuntimeError(f"Impossible de lire l'image: {image_path}")
-        image_h, image_w = img.shape[:2]
-        zone_manager = ZoneManager(camera_config.zones, image_w, image_h) if camera_config.zones else None
-
-        # Répertoire de sortie
-        output_dir = Path(config.directories.output)
-        original_filename = image_path.name  # Conserve le nom original complet
-        is_valid = (counters["total"] - counters["false"]) > 0
-        result_dir = "true" if is_valid else "false"
-        if config.processing.output_structure.organize_by_result:
-            dest_dir = (output_dir / result_dir / camera_name) if config.processing.output_structure.organize_by_camera else (output_dir / result_dir)
-        else:
-            dest_dir = (output_dir / camera_name) if config.processing.output_structure.organize_by_camera else output_dir
-        dest_dir.mkdir(parents=True, exist_ok=True)
-
-        composite_path = dest_dir / original_filename  # Utilise le nom original
-        annotator.annotate_composite(str(image_path), str(composite_path), detections, zone_manager)
-        logger.info("Image composite créée", extra={"path": str(composite_path)})
-
-        # 3) NOTIFICATIONS
-        # Map: zone_name -> liste de détections VALIDE (is_false=False) appartenant à la zone
-        zone_detections_map = {}
-        for d in detections:
-            if d.get("is_false"):
-                continue
-            for zname in d.get("zones", []):
-                zone_detections_map.setdefault(zname, []).append(d)
-
-        # Zones qui ont au moins une détection valide
-        zones_with_dets = [z for z in camera_config.zones if zone_detections_map.get(z.name)]
-        # Au moins une zone autorise une notif ?
-        has_zone_notify = any((z.text_msg or z.audio_msg) for z in zones_with_dets)
-
-        # 3.1 Notifications ZONE (uniquement celles autorisées)
-        for z in zones_with_dets:
-            if z.text_msg or z.audio_msg:
-                z_dets = zone_detections_map.get(z.name, [])
-                zone_msg = message_builder.build_zone_message(z, counters, z_dets)
-                if zone_msg and z.text_msg:
-                    mqtt_client.publish_notification(
-                        camera_name, z.name, zone_msg["message"], zone_msg.get("audio", False)
-                    )
+    except Exception as e:
+        IMAGES_PROCESSED.inc(camera=camera_name, result="error")
+        logger.error("Erreur lors du traitement de l'image", extra={"file": str(image_path), "error": str(e)}, exc_info=True)
 
-        # 3.2 Notification CAMÉRA
-        # Règle: aucune notif caméra si des zones ont des détections mais qu'aucune n'autorise message/audio
-        send_camera_msg = False
-        if not camera_config.zones:
-            send_camera_msg = True
-        elif zones_with_dets and has_zone_notify:
-            send_camera_msg = False
-        elif zones_with_dets and not has_zone_notify:
-            send_camera_msg = False
-        else:
-            send_camera_msg = False
 
-        if send_camera_msg and camera_config.text_msg:
-            camera_msg = message_builder.build_camera_message(camera_config, counters)
-            if camera_msg:
-                mqtt_client.publish_notification(
-                    camera_name, None, camera_msg["message"], camera_msg.get("audio", False)
-                )
+def process_burst(
+    image_paths: List[Path],
+    config,
+    detector: Detector,
+    mqtt_client: MQTTPublisher,
+    message_builder: MessageBuilder,
+) -> None:
+    """
+    Traite une rafale d'une même caméra: détection batch, un seul composite et
+    une seule notification pour la meilleure image, archivage de tous les originaux.
+    """
+    if len(image_paths) == 1:
+        process_image(image_paths[0], config, detector, mqtt_client, message_builder)
+        return
+
+    camera_name = extract_camera_name(image_paths[0].name)
+    try:
+        logger.info("Traitement rafale démarré", extra={"camera": camera_name, "images": len(image_paths)})
 
-        # 4) Capteurs MQTT
-        if camera_config.entity_ha:
-            if camera_config.zones:
-                det_sum = sum(v.get("total", 0) for v in counters.get("by_zone", {}).values())
-            else:
-                det_sum = counters["total"] - counters["false"]
-            mqtt_client.publish_sensor(camera_name, "detections", det_sum)
-            mqtt_client.publish_sensor(camera_name, "false_detections", counters["false"])
-
-            # Publie les compteurs par zone
-            for zone_key, zc in counters.get("by_zone", {}).items():
-                zname = zone_key.split("zone_", 1)[1] if zone_key.startswith("zone_") else zone_key
-                mqtt_client.publish_sensor(camera_name, f"zone_zone_{zname}_total", zc.get("total", 0))
-                mqtt_client.publish_sensor(camera_name, f"zone_zone_{zname}_by_class", zc.get("by_class", {}))
-
-        # 5) Post-traitement de la source
-        handle_processed_image(
-            str(image_path),
-            config.processing.input_action,
-            str(config.directories.output),
-            save_original=bool(config.processing.output_structure.save_original),
-            original_by_camera=bool(config.processing.output_structure.original_by_camera),
-            camera=camera_name,
-        )
+        camera_name, plan = resolve_camera(camera_name, config)
+        if plan is None:
+            IMAGES_DROPPED.inc(len(image_paths), reason="no_camera")
+            return
 
-        logger.info(
-            "Traitement image terminé avec succès",
-            extra={
-                "file": str(image_path),
-                "camera": camera_name,
-                "detections": det_sum if camera_config.zones else (counters["total"] - counters["false"]),
-            },
-        )
+        with StageTimer() as timer:
+            for path in image_paths:
+                timer.adopt(str(path))
+
+            results = run_detection(image_paths, plan, detector)
+            best = select_best_frame(results)
+            best_path = image_paths[best]
+            detections, counters = results[best]
+
+            det_sum = publish_results(
+                best_path, camera_name, plan, detections, counters, mqtt_client, message_builder
+            )
+
+            for path in image_paths:
+                finalize_source(path, camera_name, config)
+
+            logger.info(
+                "Traitement rafale terminé avec succès",
+                extra={
+                    "camera": camera_name,
+                    "images": len(image_paths),
+                    "best": str(best_path),
+                    "detections": det_sum,
+                    "timings_ms": timer.as_ms(),
+                },
+            )
+        IMAGES_PROCESSED.inc(len(image_paths), camera=camera_name, result="ok")
+        log_stage_percentiles()
 
     except Exception as e:
-        logger.error("Erreur lors du traitement de l'image", extra={"file": str(image_path), "error": str(e)}, exc_info=True)
+        IMAGES_PROCESSED.inc(len(image_paths), camera=camera_name, result="error")
+        logger.error(
+            "Erreur lors du traitement de la rafale",
+            extra={"camera": camera_name, "files": [str(p) for p in image_paths], "error": str(e)},
+            exc_info=True,
+        )
+
+
+def build_retention(config, mqtt_client: MQTTPublisher) -> Optional[RetentionManager]:
+    """Gestionnaire de rétention de shared_out; évictions publiées comme capteurs 'retention'."""
+    if not config.retention.enabled or not config.retention.policies:
+        return None
+
+    def publish_stats(stats):
+        values = {f"{policy}_{key}": value for policy, s in stats.items() for key, value in s.items()}
+        if sensor_batcher is not None:
+            sensor_batcher.publish("retention", values)
+        else:
+            for metric, value in values.items():
+                mqtt_client.publish_sensor("retention", metric, value)
+
+    policies = [
+        Policy(
+            category=p.category,
+            camera=p.camera,
+            max_age=p.max_age_days * 86400 if p.max_age_days else None,
+            max_bytes=int(p.max_gb * 1024 ** 3) if p.max_gb else None,
+        )
+        for p in config.retention.policies
+    ]
+    return RetentionManager(
+        Path(config.directories.output),
+        policies,
+        interval=config.retention.interval_seconds,
+        rescan_interval=config.retention.rescan_hours * 3600,
+        on_sweep=publish_stats,
+    )
+
+
+def build_scheduler(config) -> CameraScheduler:
+    """Scheduler par caméra; les caméras inconnues héritent de la priorité de 'generique'."""
+    priorities = {c.name: c.priority for c in config.cameras}
+    return CameraScheduler(priorities, default_priority=priorities.get("generique", 0))
+
+
+def burst_window_lookup(config):
+    """Fenêtre de rafale par caméra; les caméras inconnues héritent de 'generique'."""
+    windows = {c.name: c.burst_window_ms for c in config.cameras}
+    return lambda camera: windows.get(camera, windows.get("generique", 0))
+
+
+def apply_config(old, new, changes: ConfigChanges, scheduler: CameraScheduler) -> None:
+    """
+    Rechargement à chaud: prépare d'abord ce qui peut échouer (nouveau modèle),
+    puis bascule la config active et n'invalide que ce qui dépend des changements.
+    Chaque rafale lit `active` une seule fois: elle est traitée entièrement
+    avec l'ancien ou le nouveau couple (config, détecteur).
+    """
+    global active, result_cache, suppressor, tracker, near_duplicates
+
+    new_detector = active[1]
+    if changes.model:
+        logger.info("Rechargement du modèle YOLO", extra={"model": new.detection.model})
+        new_detector = Detector(new.detection.model, confidence_threshold=new.detection.confidence_threshold)
+        if result_cache is not None:
+            result_cache = build_result_cache(new)
+    elif new.detection.confidence_threshold != old.detection.confidence_threshold:
+        # Copie (modèle et verrou partagés): les rafales en cours gardent l'ancien seuil
+        new_detector = copy.copy(new_detector)
+        new_detector.confidence_threshold = new.detection.confidence_threshold
+
+    # Caméras modifiées: résultats de quasi-doublons obsolètes (les clés du
+    # cache de résultats incluent déjà l'empreinte de la caméra)
+    if near_duplicates is not None:
+        for name in changes.cameras:
+            near_duplicates.forget(name)
+    elif any(c.phash_threshold is not None for c in new.cameras):
+        near_duplicates = NearDuplicateFilter()
+    if tracker is None and any(c.tracking for c in new.cameras):
+        tracker = build_tracker(new)
+
+    if changes.cameras or "notifications" in {k.split(".", 1)[0] for k in changes.keys}:
+        # Réglages remplacés, états d'anti-rebond conservés
+        suppressor.cooldown_for = cooldown_lookup(new)
+        suppressor.notify_on_count_change = new.notifications.notify_on_count_change
+        suppressor.state_ttl = new.notifications.state_ttl_seconds
+    if changes.cameras:
+        priorities = {c.name: c.priority for c in new.cameras}
+        scheduler.set_priorities(priorities, default_priority=priorities.get("generique", 0))
+        coalescer.window_ms = burst_window_lookup(new)
+
+    # Topics: cache vidé seulement si les templates changent; autodiscovery
+    # republiée pour les caméras modifiées, ou toutes si les topics ou l'app
+    # changent (empreintes: rien n'est renvoyé à l'identique). Les caméras
+    # retirées voient leurs entités effacées.
+    mqtt_client.refresh_settings(new)
+    for camera in new.cameras:
+        if changes.discovery or camera.name in changes.cameras:
+            mqtt_client.precompile_topics(camera)
+            mqtt_client.send_autodiscovery(camera)
+    for name in {c.name for c in old.cameras} - {c.name for c in new.cameras}:
+        mqtt_client.remove_autodiscovery(name)
+
+    active = (new, new_detector)
 
 
 def main():
-    global logger, watcher, mqtt_client
+    global logger, watcher, mqtt_client, worker_pool, coalescer
+    global suppressor, tracker, result_cache, near_duplicates, sensor_batcher, retention, file_ops
+    global active, config_watcher, metrics_server, profiler, profile_server
+    config_path = "config/config.yaml"
     try:
-        config = load_config("config/config.yaml")
+        config = load_config(config_path)
     except Exception as e:
         print(f"❌ Erreur chargement configuration : {e}")
         sys.exit(1)
 
-    logger = setup_logger(config.logging.level, config.logging.format)
+    logger = setup_logger(
+        config.logging.level,
+        config.logging.format,
+        async_output=config.logging.async_output,
+        queue_size=config.logging.queue_size,
+        debug_sample_every=config.logging.debug_sample_every,
+    )
     logger.info("Application démarrée", extra={"app": config.app.name, "version": config.app.version})
 
     input_dir = Path(config.directories.input)
@@ -199,10 +630,14 @@ def main():
 
     try:
         mqtt_client = MQTTPublisher(config)
+        # Ne bloque pas si le broker est injoignable: reconnexion en arrière-plan
         mqtt_client.connect()
-        logger.info("Connexion MQTT établie")
+        logger.info("Client MQTT démarré")
+        for camera in config.cameras:
+            mqtt_client.precompile_topics(camera)
+            mqtt_client.send_autodiscovery(camera)
     except Exception as e:
-        logger.error(f"Erreur connexion MQTT : {e}", exc_info=True)
+        logger.error(f"Erreur initialisation MQTT : {e}", exc_info=True)
         sys.exit(1)
 
     try:
@@ -214,19 +649,103 @@ def main():
         sys.exit(1)
 
     message_builder = MessageBuilder()
+    sensor_batcher = SensorBatcher(
+        mqtt_client, mode=config.mqtt.sensor_mode, min_interval=config.mqtt.sensor_min_interval
+    )
+    result_cache = build_result_cache(config)
+    retention = build_retention(config, mqtt_client)
+    if retention is not None:
+        retention.start()
+    if config.processing.io_workers > 0:
+        file_ops = FileOpsPool(workers=config.processing.io_workers, max_attempts=config.processing.io_retries)
+    if any(c.phash_threshold is not None for c in config.cameras):
+        near_duplicates = NearDuplicateFilter()
+    suppressor = build_suppressor(config)
+    if any(c.tracking for c in config.cameras):
+        tracker = build_tracker(config)
 
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
+    if config.profiling.enabled:
+        profiler = Profiler(
+            output_dir / PROFILES_DIR,
+            images=config.profiling.images,
+            tracemalloc_enabled=config.profiling.tracemalloc,
+            tracemalloc_frames=config.profiling.tracemalloc_frames,
+        )
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.arm())
+        if config.profiling.http:
+            try:
+                profile_server = MetricsServer(
+                    LOCAL_HOST, config.profiling.port, collectors=(), actions={"/profile": profiler.arm_from_query}
+                )
+                profile_server.start()
+            except OSError as e:
+                logger.error(f"Endpoint de profilage indisponible : {e}")
+
+    scheduler = build_scheduler(config)
+
+    if config.metrics.enabled:
+        def health():
+            return {
+                "mqtt": mqtt_client.health(),
+                "queue_depth": scheduler.depth(),
+                "file_ops_pending": file_ops.pending if file_ops is not None else 0,
+            }
+
+        try:
+            metrics_server = MetricsServer(
+                config.metrics.host,
+                config.metrics.port,
+                collectors=(collect_process,),
+                health=health,
+            )
+            metrics_server.start()
+        except OSError as e:
+            logger.error(f"Endpoint de métriques indisponible : {e}")
+
+    active = (config, detector)
+
+    def on_scheduled(camera: str, file_paths: List[Path]):
+        # Instantané: un rechargement en cours n'affecte pas cette rafale
+        cfg, det = active
+        # Back-pressure: ralentir le pipeline plutôt que saturer la file paho
+        if not mqtt_client.wait_for_capacity(cfg.mqtt.backpressure_timeout_seconds):
+            logger.warning("Broker MQTT en retard, traitement poursuivi", extra={"camera": camera, "pending": mqtt_client.inflight.pending})
+        if profiler is None:
+            process_burst(file_paths, cfg, det, mqtt_client, message_builder)
+            return
+        with profiler.capture(len(file_paths)):
+            process_burst(file_paths, cfg, det, mqtt_client, message_builder)
+
+    worker_pool = WorkerPool(scheduler, on_scheduled, workers=config.processing.workers)
+    worker_pool.start()
+
+    coalescer = BurstCoalescer(burst_window_lookup(config), scheduler.submit)
 
     def on_new_file(file_path: Path):
-        process_image(file_path, config, detector, mqtt_client, message_builder)
+        coalescer.add(extract_camera_name(file_path.name), file_path)
 
     watcher = FileWatcher(input_dir, callback=on_new_file, extensions=(".jpg", ".jpeg"))
 
+    # Fichiers en attente: rafales reconstituées par date de prise de vue,
+    # l'ordre de lecture du répertoire ne reflète pas les événements
     logger.info("Traitement des fichiers existants dans shared_in...")
-    watcher.process_existing_files()
+    backlog = defaultdict(list)
+    watcher.process_existing_files(lambda file_path: backlog[extract_camera_name(file_path.name)].append(file_path))
+    for camera, file_paths in backlog.items():
+        coalescer.add_backlog(camera, file_paths)
 
     watcher.start()
+    if config.hot_reload.enabled:
+        config_watcher = ConfigWatcher(
+            config_path,
+            config,
+            lambda old, new, changes: apply_config(old, new, changes, scheduler),
+            interval=config.hot_reload.interval_seconds,
+        )
+        config_watcher.start()
     logger.info("Surveillance active, en attente de nouveaux fichiers...", extra={"directory": str(input_dir)})
 
     try:
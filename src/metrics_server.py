@@ -0,0 +1,178 @@
+"""
+Exposition HTTP des métriques au format texte Prometheus (stdlib uniquement).
+
+Le rendu n'a lieu qu'à la lecture (scrape): le pipeline ne paie que ses
+incréments de compteurs. Les `collectors` sont appelés juste avant chaque
+rendu pour les valeurs lues à la demande (mémoire RSS...).
+
+Routes:
+  /metrics  exposition Prometheus (text/plain; version=0.0.4)
+  /health   état JSON (ex. connexion MQTT), 503 si `healthy` est faux
+  POST      `actions` optionnelles (ex. /profile), paramètres en query string;
+            réponse JSON, 409 si `ok` est faux, 400 si paramètres invalides
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+from urllib.parse import parse_qsl
+
+from src.logger import get_logger
+from src.metrics import REGISTRY, Counter, Histogram, MetricsRegistry
+
+logger = get_logger(__name__)
+
+PROCESS_RSS = REGISTRY.gauge("detect_process_resident_memory_bytes", "Mémoire résidente du processus")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable) -> str:
+    rendered = ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render(registry: MetricsRegistry = REGISTRY) -> str:
+    """Rend toutes les métriques du registre au format texte Prometheus."""
+    lines: List[str] = []
+    for metric in sorted(registry.collect(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            for key, snap in metric.samples():
+                for bound, cumulative in snap["buckets"].items():
+                    lines.append(f"{metric.name}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{metric.name}_bucket{_labels(key + (('le', '+Inf'),))} {snap['count']}")
+                lines.append(f"{metric.name}_sum{_labels(key)} {_number(snap['sum'])}")
+                lines.append(f"{metric.name}_count{_labels(key)} {snap['count']}")
+        elif isinstance(metric, Counter):
+            for key, value in metric.samples():
+                lines.append(f"{metric.name}{_labels(key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def rss_bytes() -> Optional[int]:
+    """Mémoire résidente courante (Linux: /proc/self/statm), None si indisponible."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def collect_process() -> None:
+    rss = rss_bytes()
+    if rss is not None:
+        PROCESS_RSS.set(rss)
+
+
+class MetricsServer:
+    """Serveur HTTP de métriques dans un thread dédié."""
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 9108,
+        registry: MetricsRegistry = REGISTRY,
+        collectors: Iterable[Callable[[], None]] = (collect_process,),
+        health: Optional[Callable[[], Dict]] = None,
+        actions: Optional[Mapping[str, Callable[[Dict[str, str]], Dict]]] = None,
+    ):
+        """
+        Args:
+            host: Adresse d'écoute
+            port: Port d'écoute (0 = choisi par le système, voir `port`)
+            registry: Registre exposé
+            collectors: Fonctions appelées avant chaque rendu
+            health: Fournit l'état JSON de /health (clé `healthy` optionnelle)
+            actions: Routes POST -> fonction(query) retournant un état JSON (clé `ok` optionnelle)
+        """
+        self.registry = registry
+        self.collectors = list(collectors)
+        self.health = health
+        self.actions = dict(actions or {})
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def do_POST(self):
+                server._handle_action(self)
+
+            def log_message(self, format, *args):
+                pass  # un scrape toutes les 15 s n'a pas sa place dans les logs
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        path = request.path.split("?", 1)[0]
+        if path == "/metrics":
+            for collect in self.collectors:
+                try:
+                    collect()
+                except Exception as e:
+                    logger.warning("metrics_collector_failed", error=str(e))
+            self._reply(request, 200, CONTENT_TYPE, render(self.registry))
+        elif path == "/health" and self.health is not None:
+            state = self.health()
+            status = 200 if state.get("healthy", True) else 503
+            self._reply(request, status, "application/json", json.dumps(state, default=str))
+        else:
+            self._reply(request, 404, "text/plain; charset=utf-8", "not found\n")
+
+    def _handle_action(self, request: BaseHTTPRequestHandler) -> None:
+        path, _, query = request.path.partition("?")
+        action = self.actions.get(path)
+        if action is None:
+            self._reply(request, 404, "text/plain; charset=utf-8", "not found\n")
+            return
+        try:
+            state = action(dict(parse_qsl(query)))
+        except (KeyError, ValueError) as e:
+            self._reply(request, 400, "application/json", json.dumps({"ok": False, "error": str(e)}))
+            return
+        status = 200 if state.get("ok", True) else 409
+        self._reply(request, status, "application/json", json.dumps(state, default=str))
+
+    @staticmethod
+    def _reply(request: BaseHTTPRequestHandler, status: int, content_type: str, body: str) -> None:
+        data = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        logger.info("metrics_server_started", port=self.port)
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
@@ -0,0 +1,149 @@
+"""
+Suivi des publications MQTT en attente d'acquittement.
+
+Chaque publication acceptée par paho est enregistrée par son `mid` jusqu'au
+callback `on_publish` (PUBACK en QoS 1, écriture socket en QoS 0), ce qui
+donne la latence de publication et le nombre de messages en vol. Au-delà
+d'un seuil, le pipeline peut attendre (back-pressure) au lieu de remplir la
+file interne de paho jusqu'au rejet.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+PUBLISH_LATENCY = REGISTRY.histogram("detect_mqtt_publish_latency_seconds", "Latence publication -> acquittement MQTT")
+PUBLISH_RESULTS = REGISTRY.counter("detect_mqtt_publish_total", "Publications MQTT (result=acked|failed|timeout)")
+INFLIGHT = REGISTRY.gauge("detect_mqtt_inflight_messages", "Publications MQTT en attente d'acquittement")
+BACKPRESSURE = REGISTRY.counter("detect_mqtt_backpressure_total", "Attentes de capacité MQTT (outcome=waited|timeout)")
+
+# Acquittements reçus avant l'enregistrement du mid (course avec le thread réseau)
+_MAX_EARLY_ACKS = 1024
+
+
+class InflightTracker:
+    """Publications en vol indexées par mid, avec attente de capacité."""
+
+    def __init__(
+        self,
+        high_water: int = 0,
+        ack_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            high_water: Nombre de messages en vol à partir duquel le broker est
+                considéré en retard (0 = pas de back-pressure)
+            ack_timeout: Délai (s) au-delà duquel un message non acquitté est abandonné
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        self.high_water = high_water
+        self.ack_timeout = ack_timeout
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._pending: Dict[int, Tuple[str, float, Optional[Callable[[], None]]]] = {}
+        self._early: Dict[int, float] = {}
+        self._next_expiry = 0.0
+
+    def track(self, mid: int, topic: str, on_ack: Optional[Callable[[], None]] = None) -> None:
+        """
+        Enregistre une publication acceptée par le client.
+
+        Args:
+            on_ack: Appelé (hors verrou) à l'acquittement, jamais en cas d'expiration
+        """
+        now = self.clock()
+        with self._cond:
+            acked_early = self._early.pop(mid, None) is not None
+            if acked_early:
+                self._observe(0.0)
+            else:
+                self._pending[mid] = (topic, now, on_ack)
+                self._expire(now)
+                INFLIGHT.set(len(self._pending))
+        if acked_early and on_ack is not None:
+            on_ack()
+
+    def ack(self, mid: int) -> Optional[float]:
+        """
+        Marque une publication comme acquittée.
+
+        Returns:
+            Latence (s), ou None si le mid n'est pas (encore) connu
+        """
+        now = self.clock()
+        with self._cond:
+            entry = self._pending.pop(mid, None)
+            if entry is None:
+                if len(self._early) >= _MAX_EARLY_ACKS:
+                    self._early.clear()
+                self._early[mid] = now
+                return None
+            latency = now - entry[1]
+            self._observe(latency)
+            INFLIGHT.set(len(self._pending))
+            self._cond.notify_all()
+        if entry[2] is not None:
+            entry[2]()
+        return latency
+
+    def failed(self, topic: str, rc) -> None:
+        """Publication refusée par le client (file pleine, pas de connexion...)."""
+        PUBLISH_RESULTS.inc(result="failed")
+        logger.debug("mqtt_publish_failed", topic=topic, rc=str(rc))
+
+    def _observe(self, latency: float) -> None:
+        PUBLISH_LATENCY.observe(latency)
+        PUBLISH_RESULTS.inc(result="acked")
+
+    def _expire(self, now: float) -> None:
+        # Balayage amorti: au plus une fois par seconde
+        if now < self._next_expiry:
+            return
+        self._next_expiry = now + 1.0
+        stale = [mid for mid, (_, sent_at, _) in self._pending.items() if now - sent_at > self.ack_timeout]
+        for mid in stale:
+            topic = self._pending.pop(mid)[0]
+            logger.warning("mqtt_publish_ack_timeout", topic=topic, mid=mid)
+        if stale:
+            PUBLISH_RESULTS.inc(len(stale), result="timeout")
+            self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    @property
+    def congested(self) -> bool:
+        with self._cond:
+            return bool(self.high_water) and len(self._pending) >= self.high_water
+
+    def wait_for_capacity(self, timeout: float) -> bool:
+        """
+        Bloque tant que le nombre de messages en vol atteint le seuil.
+
+        Returns:
+            True si de la capacité est disponible, False si le délai a expiré
+        """
+        if not self.high_water:
+            return True
+        deadline = self.clock() + timeout
+        with self._cond:
+            if len(self._pending) < self.high_water:
+                return True
+            while len(self._pending) >= self.high_water:
+                now = self.clock()
+                self._expire(now)
+                remaining = deadline - now
+                if remaining <= 0:
+                    BACKPRESSURE.inc(outcome="timeout")
+                    return False
+                self._cond.wait(min(remaining, 1.0))
+            BACKPRESSURE.inc(outcome="waited")
+            return True
@@ -1,10 +1,38 @@
 import json
+import threading
+import time
 from datetime import datetime, timezone
+from pathlib import Path
 import paho.mqtt.client as mqtt
+from src.backoff import ExponentialBackoff
+from src.ha_discovery import build_discovery_configs, payload_hash
 from src.logger import get_logger
+from src.metrics import REGISTRY
+from src.mqtt_inflight import InflightTracker
+from src.mqtt_spool import MessageSpool
+
+try:  # sérialisation rapide optionnelle
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = get_logger(__name__)
 
+MQTT_CONNECTED = REGISTRY.gauge("detect_mqtt_connected", "Connexion au broker MQTT établie (0/1)")
+MQTT_CONNECTION_EVENTS = REGISTRY.counter("detect_mqtt_connection_events_total", "Événements de connexion MQTT (event)")
+MQTT_RECONNECT_DELAY = REGISTRY.gauge("detect_mqtt_reconnect_delay_seconds", "Délai avant la prochaine tentative de connexion")
+MQTT_OUTAGE = REGISTRY.histogram(
+    "detect_mqtt_outage_seconds", "Durée des coupures broker", buckets=(1, 5, 15, 60, 300, 900, 3600)
+)
+
+DEFAULT_TOPICS = {
+    "sensor": "detect_yolo_cpu_v2/sensor/{camera}/{metric}",
+    "state": "detect_yolo_cpu_v2/state/{camera}",
+    "image": "detect_yolo_cpu_v2/image/{camera}",
+    "image_bytes": "detect_yolo_cpu_v2/image/{camera}/{variant}",
+    "notify": "detect_yolo_cpu_v2/notify/{camera}/{zone}",
+}
+
 # --- helpers ------------------------------------------------------------
 
 def _ok(rc) -> bool:
@@ -16,8 +44,37 @@ def _ok(rc) -> bool:
         except Exception:
             return False
 
+def _queue_full(rc) -> bool:
+    """File interne paho pleine: la fenêtre se libérera avec les acquittements."""
+    try:
+        return int(getattr(rc, "value", rc)) == mqtt.MQTT_ERR_QUEUE_SIZE
+    except Exception:
+        return False
+
+_iso_cache = (-1, "")
+
 def _iso_now():
-    return datetime.now(timezone.utc).astimezone().isoformat()
+    """Horodatage ISO local à la seconde, formaté une seule fois par seconde."""
+    global _iso_cache
+    now = int(time.time())
+    second, text = _iso_cache
+    if second != now:
+        text = datetime.fromtimestamp(now, timezone.utc).astimezone().isoformat()
+        _iso_cache = (now, text)
+    return text
+
+def _dumps(payload) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload).decode("utf-8")
+        except TypeError:
+            pass  # type non supporté par orjson: repli sur json
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+def _render(tpl: str, **values: str) -> str:
+    for k, v in values.items():
+        tpl = tpl.replace("{" + k + "}", v)
+    return tpl.replace("//", "/").rstrip("/")
 
 def _get(obj, *keys, default=None):
     """Accès tolérant: supporte objets (attributs) et dicts imbriqués."""
@@ -46,85 +103,501 @@ class MQTTPublisher:
 
         self.client.on_connect = self._on_connect
         self.client.on_disconnect = self._on_disconnect
+        self.client.on_publish = self._on_publish
+        self.client.on_connect_fail = self._on_connect_fail
+
+        # Reconnexion: backoff exponentiel avec gigue appliqué à la boucle paho
+        self._backoff = ExponentialBackoff(
+            base=_get(self.cfg, "mqtt", "reconnect_min_delay", default=1.0),
+            cap=_get(self.cfg, "mqtt", "reconnect_max_delay", default=120.0),
+        )
+        self._state = "disconnected"
+        self._state_since = time.time()
+        self._last_error = None
+        self._stopping = False
+
+        # Fenêtre d'envoi paho et suivi des acquittements (latence, back-pressure)
+        max_inflight = _get(self.cfg, "mqtt", "max_inflight", default=20)
+        max_queued = _get(self.cfg, "mqtt", "max_queued", default=0)
+        self.client.max_inflight_messages_set(max_inflight)
+        self.client.max_queued_messages_set(max_queued)
+        # Seuil de retard: fenêtre pleine et moitié de la file paho consommée
+        self.inflight = InflightTracker(
+            high_water=max_inflight + max_queued // 2 if max_queued else 0,
+            ack_timeout=_get(self.cfg, "mqtt", "ack_timeout_seconds", default=30.0),
+        )
+
+        # QoS/retain et templates résolus une fois (voir refresh_settings)
+        self.refresh_settings()
+
+        self.connected = False
+        # Spool disque: messages conservés tant que le broker est indisponible
+        self.spool = self._build_spool()
+        self._spool_lock = threading.Lock()
+        self._replaying = False
+
+        # Autodiscovery HA: empreinte par caméra et topic de config, persistée pour
+        # éviter de republier toutes les entités à chaque redémarrage. Une empreinte
+        # n'est confirmée (et persistée) qu'à l'acquittement du broker; en attente,
+        # elle reste dans _discovery_pending (None = effacement en cours). Une caméra
+        # retirée de la config reste dans _discovery_cameras (None) jusqu'à l'effacement
+        self.discovery_sent = set()
+        self._discovery_cameras = {}
+        self._discovery_lock = threading.Lock()
+        self._discovery_cache = _get(self.cfg, "homeassistant", "discovery_cache")
+        self._discovery_hashes = self._load_discovery_hashes()
+        self._discovery_pending = {}
+        self.client.on_message = self._on_message
 
         broker = _get(self.cfg, "mqtt", "broker")
         port = _get(self.cfg, "mqtt", "port", default=1883)
         logger.info("mqtt_client_initialized", extra={"broker": broker, "port": port})
 
+    def refresh_settings(self, config=None):
+        """
+        Résout QoS, retain et templates de topics depuis la config. Le cache
+        des topics n'est vidé que si les templates ont changé. À rappeler après
+        un rechargement de configuration.
+        """
+        if config is not None:
+            self.cfg = config
+        self._qos = _get(self.cfg, "mqtt", "qos", default=0)
+        self._retain = bool(_get(self.cfg, "mqtt", "retain", default=False))
+        templates = {name: _get(self.cfg, "mqtt", "topics", name) or default for name, default in DEFAULT_TOPICS.items()}
+        if templates != getattr(self, "_templates", None):
+            self._templates = templates
+            self._topics = {}
+
+    def precompile_topics(self, camera_config) -> None:
+        """Pré-calcule les topics d'une caméra (capteurs, zones, état, image)."""
+        camera = camera_config.name
+        for metric in ("detections", "false_detections"):
+            self._sensor_topic(camera, metric)
+        for zone in camera_config.zones:
+            self._sensor_topic(camera, f"zone_zone_{zone.name}_total")
+            self._sensor_topic(camera, f"zone_zone_{zone.name}_by_class")
+            self._notify_topic(camera, zone.name, False)
+        self._notify_topic(camera, None, False)
+        self._state_topic(camera)
+        self._image_topic(camera)
+
+    def _build_spool(self):
+        if not _get(self.cfg, "mqtt", "spool", "enabled", default=False):
+            return None
+        directory = _get(self.cfg, "mqtt", "spool", "directory")
+        if directory is None:
+            directory = Path(_get(self.cfg, "directories", "output", default=".")) / "_spool"
+        return MessageSpool(
+            Path(directory),
+            max_age=_get(self.cfg, "mqtt", "spool", "max_age_seconds", default=3600.0),
+            max_bytes=int(_get(self.cfg, "mqtt", "spool", "max_mb", default=50.0) * 1024 * 1024),
+        )
+
     # v1: on_connect(client, userdata, flags, rc)
     # v2: on_connect(client, userdata, flags, reasonCode, properties)
     def _on_connect(self, client, userdata, flags, rc_or_reason, properties=None):
         if _ok(rc_or_reason):
             logger.info("mqtt_connection_established", extra={"result_code": "Success"})
-            logger.info("mqtt_connected", extra={"broker": _get(self.cfg, "mqtt", "broker")})
+            logger.info("mqtt_connected", extra={"broker": _get(self.cfg, "mqtt", "broker"), "attempts": self._backoff.attempts})
+            if self._state != "connecting" or self._last_error is not None:
+                MQTT_OUTAGE.observe(time.time() - self._state_since)
+            # Connexion et rejeu annoncés ensemble: aucune publication ne peut
+            # passer directement devant les messages spoolés
+            replay = self._connect_and_claim_replay()
+            self._set_state("connected")
+            self._backoff.reset()
+            self._schedule_reconnect()  # délai prêt pour la prochaine coupure
+            if _get(self.cfg, "homeassistant", "autodiscovery", default=False):
+                # Birth message HA: republier les configs quand HA redémarre
+                client.subscribe(self._ha_status_topic())
+                self._resend_discovery(confirmed=False)
+            if replay:
+                self._start_replay()
         else:
             try:
                 rc_val = int(rc_or_reason)
             except Exception:
                 rc_val = str(rc_or_reason)
             logger.error("mqtt_connection_failed", extra={"result_code": rc_val})
+            self._connection_failed(f"result_code={rc_val}")
+
+    # paho >= 1.6: échec TCP/TLS avant CONNACK
+    def _on_connect_fail(self, client, userdata):
+        self._connection_failed("unreachable")
 
     # v1: on_disconnect(client, userdata, rc)
     # v2: on_disconnect(client, userdata, reasonCode, properties)
     def _on_disconnect(self, client, userdata, rc_or_reason, properties=None):
-        if _ok(rc_or_reason):
+        self.connected = False
+        if _ok(rc_or_reason) or self._stopping:
             logger.info("mqtt_disconnected", extra={"result_code": "Success"})
+            self._set_state("disconnected")
         else:
             try:
                 rc_val = int(rc_or_reason)
             except Exception:
                 rc_val = str(rc_or_reason)
             logger.warning("mqtt_disconnected", extra={"result_code": rc_val})
+            # Coupure inattendue: la boucle paho retente après le délai courant
+            self._last_error = f"result_code={rc_val}"
+            self._set_state("reconnecting")
+
+    def _connection_failed(self, error: str) -> None:
+        self.connected = False
+        self._last_error = error
+        if self._state == "connected":
+            self._set_state("reconnecting")
+        self._schedule_reconnect()
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            self._state_since = time.time()
+            MQTT_CONNECTION_EVENTS.inc(event=state)
+        if state == "connected":
+            self._last_error = None
+        MQTT_CONNECTED.set(1 if state == "connected" else 0)
+
+    def _schedule_reconnect(self) -> None:
+        """Fixe le délai (gigué) de la prochaine tentative de la boucle paho."""
+        delay = self._backoff.next()
+        # min == max: paho applique exactement ce délai au lieu de son doublement sans gigue
+        self.client.reconnect_delay_set(min_delay=delay, max_delay=delay)
+        MQTT_RECONNECT_DELAY.set(delay)
+        if self._state != "connected":
+            logger.info("mqtt_reconnect_scheduled", extra={"delay": round(delay, 2), "attempt": self._backoff.attempts})
+
+    def health(self) -> dict:
+        """État de la connexion pour la supervision."""
+        return {
+            "state": self._state,
+            "connected": self.connected,
+            "since": datetime.fromtimestamp(self._state_since, timezone.utc).isoformat(),
+            "reconnect_attempts": self._backoff.attempts if self._state != "connected" else 0,
+            "last_error": self._last_error,
+            "inflight": self.inflight.pending,
+            "spooled": len(self.spool) if self.spool is not None else 0,
+        }
+
+    # v1: on_publish(client, userdata, mid)
+    # v2: on_publish(client, userdata, mid, reasonCode, properties)
+    def _on_publish(self, client, userdata, mid, reason_code=None, properties=None):
+        self.inflight.ack(mid)
+
+    def wait_for_capacity(self, timeout: float) -> bool:
+        """Attend que le broker rattrape son retard (False si le délai expire)."""
+        if not self.connected:
+            # Broker absent: les messages partent au spool, inutile de bloquer le pipeline
+            return True
+        return self.inflight.wait_for_capacity(timeout)
 
     def connect(self):
+        """
+        Connexion non bloquante: la boucle réseau paho établit la connexion et
+        se reconnecte selon le backoff; les messages sont spoolés entre-temps.
+        """
         broker = _get(self.cfg, "mqtt", "broker")
         port = _get(self.cfg, "mqtt", "port", default=1883)
-        self.client.connect(broker, port, keepalive=60)
+        keepalive = _get(self.cfg, "mqtt", "keepalive", default=60)
+        self._stopping = False
+        self._set_state("connecting")
+        self._schedule_reconnect()
+        self.client.connect_async(broker, port, keepalive=keepalive)
         self.client.loop_start()
 
     def disconnect(self):
+        self._stopping = True
         try:
             self.client.loop_stop()
         finally:
             self.client.disconnect()
+            if self.spool is not None:
+                self.spool.close()
+
+    # --- Autodiscovery Home Assistant -----------------------------------
+
+    def _ha_status_topic(self) -> str:
+        prefix = _get(self.cfg, "homeassistant", "discovery_prefix", default="homeassistant")
+        return f"{prefix}/status"
+
+    def _on_message(self, client, userdata, msg):
+        if msg.topic == self._ha_status_topic() and msg.payload == b"online":
+            logger.info("ha_birth_received", extra={"topic": msg.topic})
+            self._resend_discovery(confirmed=True)
+
+    def _resend_discovery(self, confirmed: bool) -> None:
+        """
+        Republie les configs des caméras connues. Les envois non acquittés sont
+        oubliés (connexion perdue); `confirmed` oublie aussi les empreintes
+        acquittées (HA redémarré, configs retenues perdues).
+        """
+        with self._discovery_lock:
+            self._discovery_pending.clear()
+            if confirmed:
+                self._discovery_hashes.clear()
+            cameras = list(self._discovery_cameras.items())
+        for camera, camera_config in cameras:
+            if camera_config is None:
+                self.remove_autodiscovery(camera)
+            else:
+                self.send_autodiscovery(camera_config)
+
+    def _load_discovery_hashes(self) -> dict:
+        if not self._discovery_cache:
+            return {}
+        try:
+            with open(self._discovery_cache, "r", encoding="utf-8") as f:
+                return {camera: dict(hashes) for camera, hashes in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_discovery_hashes(self) -> None:
+        if not self._discovery_cache:
+            return
+        path = Path(self._discovery_cache)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._discovery_hashes, sort_keys=True), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning("ha_discovery_cache_write_failed", extra={"path": str(path), "error": str(e)})
+
+    def send_autodiscovery(self, camera_config) -> bool:
+        """
+        Publie (retained) les configs de discovery d'une caméra.
+        Seules les configs dont le contenu a changé sont republiées; les entités
+        disparues (zone supprimée) sont effacées par un payload vide.
+        Hors connexion, rien n'est publié ni spoolé: l'envoi a lieu à la connexion.
+        """
+        if not _get(self.cfg, "homeassistant", "autodiscovery", default=False):
+            return True
+
+        configs = build_discovery_configs(
+            camera_config,
+            app_name=_get(self.cfg, "app", "name", default="detect_yolo_cpu_v2"),
+            app_version=_get(self.cfg, "app", "version", default=""),
+            discovery_prefix=_get(self.cfg, "homeassistant", "discovery_prefix", default="homeassistant"),
+            sensor_topic=self._templates["sensor"],
+            state_topic=self._templates["state"],
+            sensor_mode=_get(self.cfg, "mqtt", "sensor_mode", default="per_metric"),
+            image_topic=self._templates["image_bytes"],
+        )
+        camera = camera_config.name
+        self.discovery_sent.add(camera)
+        with self._discovery_lock:
+            self._discovery_cameras[camera] = camera_config
+        return self._publish_discovery(camera, configs)
+
+    def remove_autodiscovery(self, camera: str) -> bool:
+        """
+        Efface (payloads vides retenus) les entités d'une caméra retirée de la
+        config; ses empreintes sont oubliées à l'acquittement.
+        """
+        if not _get(self.cfg, "homeassistant", "autodiscovery", default=False):
+            return True
+        self.discovery_sent.discard(camera)
+        with self._discovery_lock:
+            self._discovery_cameras[camera] = None
+        return self._publish_discovery(camera, {})
+
+    def _publish_discovery(self, camera: str, configs: dict) -> bool:
+        """Publie les configs modifiées de `configs` et efface les entités absentes."""
+        qos = self._qos
+        with self._discovery_lock:
+            if not self.connected:
+                return True
+            pending = self._discovery_pending.setdefault(camera, {})
+            merged = {**self._discovery_hashes.get(camera, {}), **pending}
+            known = {topic: digest for topic, digest in merged.items() if digest is not None}
+            hashes = {topic: payload_hash(payload) for topic, payload in configs.items()}
+            to_send = [topic for topic, digest in hashes.items() if known.get(topic) != digest]
+            removed = [topic for topic in known if topic not in hashes]
+            for topic in to_send:
+                pending[topic] = hashes[topic]
+            for topic in removed:
+                pending[topic] = None
+            self._forget_removed_camera(camera)
+
+        sends = [(topic, _dumps(configs[topic]), hashes[topic]) for topic in to_send]
+        sends += [(topic, "", None) for topic in removed]
+        for topic, payload, digest in sends:
+            on_ack = lambda topic=topic, digest=digest: self._discovery_acked(camera, topic, digest)
+            if not self._send(topic, payload, qos, True, on_ack=on_ack):
+                with self._discovery_lock:
+                    if pending.get(topic, "") == digest:
+                        del pending[topic]  # réessayé au prochain appel ou à la reconnexion
+
+        if to_send or removed:
+            logger.info(
+                "ha_discovery_published",
+                extra={"camera": camera, "published": len(to_send), "removed": len(removed), "unchanged": len(configs) - len(to_send)},
+            )
+        return True
+
+    def _discovery_acked(self, camera: str, topic: str, digest) -> None:
+        """Config de discovery acquittée par le broker: empreinte confirmée et persistée."""
+        with self._discovery_lock:
+            pending = self._discovery_pending.get(camera, {})
+            if topic in pending and pending[topic] == digest:
+                del pending[topic]
+            confirmed = self._discovery_hashes.setdefault(camera, {})
+            if digest is None:
+                confirmed.pop(topic, None)
+            else:
+                confirmed[topic] = digest
+            self._forget_removed_camera(camera)
+            self._save_discovery_hashes()
+
+    def _forget_removed_camera(self, camera: str) -> None:
+        """Caméra retirée dont toutes les entités sont effacées: plus rien à suivre (sous verrou)."""
+        if camera not in self._discovery_cameras or self._discovery_cameras[camera] is not None:
+            return
+        if self._discovery_hashes.get(camera) or self._discovery_pending.get(camera):
+            return
+        del self._discovery_cameras[camera]
+        self._discovery_hashes.pop(camera, None)
+        self._discovery_pending.pop(camera, None)
+
+    # --- Spool ----------------------------------------------------------
+
+    def _connect_and_claim_replay(self) -> bool:
+        """Marque la connexion établie et, si le spool n'est pas vide, le rejeu en cours (True: rejeu à lancer)."""
+        if self.spool is None:
+            self.connected = True
+            return False
+        with self._spool_lock:
+            self.connected = True
+            if self._replaying or len(self.spool) == 0:
+                return False
+            self._replaying = True
+            return True
+
+    def _start_replay(self):
+        """Lance le rejeu du spool hors du thread réseau paho (rejeu déjà marqué en cours)."""
+        threading.Thread(target=self._replay_spool, name="mqtt-spool-replay", daemon=True).start()
+
+    def _replay_spool(self):
+        retry = ExponentialBackoff(base=0.05, cap=1.0)
+
+        def send(topic, payload, qos, retain):
+            while self.connected:
+                info = self.client.publish(topic, payload, qos=qos, retain=retain)
+                if not _queue_full(info.rc):
+                    retry.reset()
+                    return self._track(topic, info)
+                # Fenêtre paho pleine: attendre les acquittements plutôt que d'échouer
+                # (un échec arrêterait le rejeu et réécrirait le segment)
+                if not self.inflight.congested:
+                    time.sleep(retry.next())  # acquittements expirés: rien à attendre
+                self.inflight.wait_for_capacity(1.0)
+            return False
+
+        self.spool.compact()
+        while True:
+            sent = self.spool.replay(send)
+            with self._spool_lock:
+                # Les messages arrivés pendant le rejeu sont repris avant de rendre la main
+                if len(self.spool) == 0 or not self.connected:
+                    self._replaying = False
+                    return
+            if not sent:
+                # Message refusé alors que la connexion est établie: pas de boucle à vide
+                time.sleep(retry.next())
+
+    def _publish(self, topic: str, payload, qos: int, retain: bool, spool_key: str | None = None, spoolable: bool = True) -> bool:
+        """Publie, ou spoole si le broker est indisponible ou si un rejeu est en cours (ordre préservé)."""
+        if self.spool is not None:
+            with self._spool_lock:
+                if not self.connected or self._replaying:
+                    # Les payloads binaires (images) ne sont pas spoolés: obsolètes au rejeu
+                    if spoolable:
+                        self.spool.append(topic, payload, qos, retain, key=spool_key)
+                    return False
+        return self._send(topic, payload, qos, retain)
+
+    def _send(self, topic: str, payload, qos: int, retain: bool, on_ack=None) -> bool:
+        """Transmet au client paho et suit l'acquittement de la publication."""
+        return self._track(topic, self.client.publish(topic, payload, qos=qos, retain=retain), on_ack)
+
+    def _track(self, topic: str, info, on_ack=None) -> bool:
+        if not _ok(info.rc):
+            self.inflight.failed(topic, info.rc)
+            return False
+        mid = getattr(info, "mid", None)
+        if isinstance(mid, int):
+            self.inflight.track(mid, topic, on_ack)
+        return True
 
     # --- Topics helpers -------------------------------------------------
 
+    def _topic(self, kind: str, camera: str, **values: str) -> str:
+        """Topic rendu depuis son template, mis en cache par (kind, camera, valeurs)."""
+        key = (kind, camera, *values.values())
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = _render(self._templates[kind], camera=camera, **values)
+        return topic
+
     def _sensor_topic(self, camera: str, metric: str) -> str:
-        tpl = _get(self.cfg, "mqtt", "topics", "sensor")  # e.g. detect_yolo_cpu_v2/sensor/{camera}/{metric}
-        topic = (tpl or "detect_yolo_cpu_v2/sensor/{camera}/{metric}").replace("{camera}", camera).replace("{metric}", metric)
-        return topic.replace("//", "/").rstrip("/")
+        return self._topic("sensor", camera, metric=metric)
+
+    def _state_topic(self, camera: str) -> str:
+        return self._topic("state", camera)
+
+    def _image_bytes_topic(self, camera: str, variant: str) -> str:
+        return self._topic("image_bytes", camera, variant=variant)
 
     def _image_topic(self, camera: str) -> str:
-        tpl = _get(self.cfg, "mqtt", "topics", "image")
-        topic = (tpl or "detect_yolo_cpu_v2/image/{camera}").replace("{camera}", camera)
-        return topic.replace("//", "/").rstrip("/")
+        return self._topic("image", camera)
 
     def _notify_topic(self, camera: str | None, zone: str | None, audio: bool) -> str:
-        tpl = _get(self.cfg, "mqtt", "topics", "notify")  # e.g. detect_yolo_cpu_v2/notify/{camera}/{zone}
-        tpl = tpl or "detect_yolo_cpu_v2/notify/{camera}/{zone}"
         if audio:
             # audio -> topic racine
-            root = tpl.split("{", 1)[0].rstrip("/")
-            return root or "detect_yolo_cpu_v2/notify"
-        topic = tpl.replace("{camera}", camera or "").replace("{zone}", zone or "")
-        return topic.replace("//", "/").rstrip("/")
+            key = ("notify_audio",)
+            topic = self._topics.get(key)
+            if topic is None:
+                root = self._templates["notify"].split("{", 1)[0].rstrip("/")
+                topic = self._topics[key] = root or "detect_yolo_cpu_v2/notify"
+            return topic
+        return self._topic("notify", camera or "", zone=zone or "")
 
     # --- Publish --------------------------------------------------------
 
     def publish_sensor(self, camera: str, metric: str, value):
         payload = {"value": value, "timestamp": _iso_now(), "unit": "count"}
         topic = self._sensor_topic(camera, metric)
-        qos = _get(self.cfg, "mqtt", "qos", default=0)
-        retain = _get(self.cfg, "mqtt", "retain", default=False)
-        self.client.publish(topic, json.dumps(payload, ensure_ascii=False), qos=qos, retain=retain)
+        qos, retain = self._qos, self._retain
+        return self._publish(topic, _dumps(payload), qos, retain, spool_key=topic)
+
+    def publish_state(self, camera: str, values: dict):
+        """Publie toutes les métriques d'une caméra dans un seul message JSON (value_json.<metric>)."""
+        payload = dict(values)
+        payload["timestamp"] = _iso_now()
+        topic = self._state_topic(camera)
+        qos, retain = self._qos, self._retain
+        return self._publish(topic, _dumps(payload), qos, retain, spool_key=topic)
 
     def publish_image(self, camera: str, image_path: str):
         topic = self._image_topic(camera)
         payload = {"path": image_path, "timestamp": _iso_now()}
-        qos = _get(self.cfg, "mqtt", "qos", default=0)
-        retain = _get(self.cfg, "mqtt", "retain", default=False)
-        self.client.publish(topic, json.dumps(payload, ensure_ascii=False), qos=qos, retain=retain)
+        qos, retain = self._qos, self._retain
+        return self._publish(topic, _dumps(payload), qos, retain, spool_key=topic)
+
+    def publish_image_bytes(self, camera: str, jpeg, variant: str = "jpeg") -> bool:
+        """
+        Publie l'image JPEG encodée en payload binaire (compatible entité MQTT camera HA).
+
+        Args:
+            jpeg: Buffer encodé (bytes ou ndarray issu de cv2.imencode)
+            variant: 'jpeg' (pleine taille) ou 'thumbnail'
+        """
+        # paho n'accepte que bytes/bytearray: une seule copie depuis le buffer d'encodage
+        payload = jpeg if isinstance(jpeg, (bytes, bytearray)) else memoryview(jpeg).tobytes()
+        topic = self._image_bytes_topic(camera, variant)
+        qos = self._qos
+        # Retenu: HA affiche la dernière image même après redémarrage
+        return self._publish(topic, payload, qos, True, spoolable=False)
 
     def publish_notification(self, camera: str, zone: str | None, message: str, audio: bool = False, extra: dict | None = None):
         topic = self._notify_topic(camera, zone, audio)
@@ -142,7 +615,7 @@ class MQTTPublisher:
             for k, v in extra.items():
                 if k not in payload:
                     payload[k] = v
-        qos = _get(self.cfg, "mqtt", "qos", default=0)
-        retain = _get(self.cfg, "mqtt", "retain", default=False)
-        self.client.publish(topic, json.dumps(payload, ensure_ascii=False), qos=qos, retain=retain)
-        logger.info("notification_published", extra={"topic": topic, "camera": camera, "zone": zone, "audio": bool(audio)})
+        qos, retain = self._qos, self._retain
+        sent = self._publish(topic, _dumps(payload), qos, retain)
+        logger.info("notification_published", extra={"topic": topic, "camera": camera, "zone": zone, "audio": bool(audio), "sent": sent})
+        return sent
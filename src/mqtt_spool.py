@@ -0,0 +1,223 @@
+"""
+Spool disque des messages MQTT pendant une indisponibilité du broker.
+
+Les messages sont ajoutés à des segments append-only (une ligne JSON par
+message) puis rejoués dans l'ordre à la reconnexion. Les messages plus
+vieux que `max_age` sont abandonnés; la compaction ne garde que la
+dernière valeur des messages portant une même clé (capteurs).
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+SPOOL_BYTES = REGISTRY.gauge("detect_mqtt_spool_bytes", "Taille disque du spool MQTT")
+SPOOL_MESSAGES = REGISTRY.gauge("detect_mqtt_spool_messages", "Messages en attente dans le spool MQTT")
+SPOOL_DROPPED = REGISTRY.counter("detect_mqtt_spool_dropped_total", "Messages du spool abandonnés (reason)")
+SPOOL_REPLAYED = REGISTRY.counter("detect_mqtt_spool_replayed_total", "Messages rejoués depuis le spool")
+
+PublishFn = Callable[[str, str, int, bool], bool]
+
+
+class MessageSpool:
+    """File persistante de messages MQTT en segments append-only."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_age: float = 3600.0,
+        max_bytes: int = 50 * 1024 * 1024,
+        segment_bytes: int = 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            directory: Répertoire des segments (créé si besoin)
+            max_age: Âge maximal (s) d'un message rejoué
+            max_bytes: Taille totale au-delà de laquelle les plus vieux segments sont supprimés
+            segment_bytes: Taille d'un segment avant rotation
+            clock: Horloge murale (injectable pour les tests)
+        """
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.clock = clock
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._segments: List[Path] = sorted(self.directory.glob("spool-*.log"))
+        self._next_seq = self._seq(self._segments[-1]) + 1 if self._segments else 0
+        self._writer = None
+        self._bytes = sum(p.stat().st_size for p in self._segments)
+        self._count = sum(self._line_count(p) for p in self._segments)
+        self._update_gauges()
+        if self._count:
+            logger.info("mqtt_spool_loaded", directory=str(self.directory), messages=self._count, bytes=self._bytes)
+
+    @staticmethod
+    def _seq(path: Path) -> int:
+        return int(path.stem.split("-", 1)[1])
+
+    @staticmethod
+    def _line_count(path: Path) -> int:
+        with open(path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def _update_gauges(self) -> None:
+        SPOOL_BYTES.set(self._bytes)
+        SPOOL_MESSAGES.set(self._count)
+
+    # --- écriture -------------------------------------------------------
+
+    def _open_segment(self) -> None:
+        path = self.directory / f"spool-{self._next_seq:010d}.log"
+        self._next_seq += 1
+        self._segments.append(path)
+        self._writer = open(path, "a", encoding="utf-8")
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def append(self, topic: str, payload: str, qos: int = 0, retain: bool = False, key: Optional[str] = None) -> None:
+        """
+        Ajoute un message au spool.
+
+        Args:
+            key: Clé de compaction (seul le dernier message d'une clé est conservé)
+        """
+        record = {"t": self.clock(), "topic": topic, "payload": payload, "qos": qos, "retain": retain}
+        if key:
+            record["k"] = key
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._writer is None or self._writer.tell() >= self.segment_bytes:
+                self._close_writer()
+                self._open_segment()
+            self._writer.write(line)
+            self._writer.flush()
+            self._bytes += len(line.encode("utf-8"))
+            self._count += 1
+            self._enforce_budget()
+            self._update_gauges()
+
+    def _enforce_budget(self) -> None:
+        while self._bytes > self.max_bytes and len(self._segments) > 1:
+            oldest = self._segments.pop(0)
+            dropped = self._line_count(oldest)
+            self._bytes -= oldest.stat().st_size
+            self._count -= dropped
+            oldest.unlink()
+            SPOOL_DROPPED.inc(dropped, reason="budget")
+            logger.warning("mqtt_spool_segment_dropped", segment=oldest.name, messages=dropped)
+
+    # --- lecture / rejeu ------------------------------------------------
+
+    def _read(self, path: Path) -> List[Dict]:
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Ligne tronquée (arrêt brutal pendant l'écriture)
+                    SPOOL_DROPPED.inc(reason="corrupt")
+        return records
+
+    def _rewrite(self, path: Path, records: List[Dict]) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        os.replace(tmp, path)
+
+    def replay(self, publish: PublishFn) -> int:
+        """
+        Rejoue les messages dans l'ordre d'arrivée.
+
+        S'arrête au premier échec de `publish` en conservant les messages restants.
+
+        Returns:
+            Nombre de messages publiés
+        """
+        sent = 0
+        with self._lock:
+            # Les nouveaux messages iront dans un nouveau segment, après ceux rejoués
+            self._close_writer()
+            segments = list(self._segments)
+
+        now = self.clock()
+        for path in segments:
+            if not path.exists():  # supprimé par la borne de taille entre-temps
+                continue
+            records = self._read(path)
+            for idx, r in enumerate(records):
+                if now - r["t"] > self.max_age:
+                    SPOOL_DROPPED.inc(reason="expired")
+                    continue
+                if not publish(r["topic"], r["payload"], r.get("qos", 0), r.get("retain", False)):
+                    with self._lock:
+                        self._rewrite(path, records[idx:])
+                        self._recount()
+                    SPOOL_REPLAYED.inc(sent)
+                    return sent
+                sent += 1
+            with self._lock:
+                path.unlink(missing_ok=True)
+                self._recount()
+
+        SPOOL_REPLAYED.inc(sent)
+        if sent:
+            logger.info("mqtt_spool_replayed", messages=sent)
+        return sent
+
+    def compact(self) -> None:
+        """Fusionne les segments fermés en supprimant les messages expirés ou remplacés."""
+        with self._lock:
+            self._close_writer()
+            if not self._segments:
+                return
+            now = self.clock()
+            records = []
+            for path in self._segments:
+                records.extend(r for r in self._read(path) if now - r["t"] <= self.max_age)
+            last_for_key = {r["k"]: i for i, r in enumerate(records) if "k" in r}
+            kept = [r for i, r in enumerate(records) if "k" not in r or last_for_key[r["k"]] == i]
+
+            target = self._segments[0]
+            self._rewrite(target, kept)
+            for path in self._segments[1:]:
+                path.unlink(missing_ok=True)
+            self._segments = [target]
+            self._recount()
+            logger.info("mqtt_spool_compacted", before=len(records), after=len(kept))
+
+    def _recount(self) -> None:
+        self._segments = [p for p in self._segments if p.exists()]
+        self._bytes = sum(p.stat().st_size for p in self._segments)
+        self._count = sum(self._line_count(p) for p in self._segments)
+        self._update_gauges()
+
+    # --- état -----------------------------------------------------------
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_writer()
@@ -0,0 +1,109 @@
+"""
+Anti-rebond des notifications par (caméra, zone, ensemble de classes).
+Une notification identique n'est renvoyée qu'après le cooldown, sauf si
+le nombre d'objets a changé.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+NOTIFICATIONS_SENT = REGISTRY.counter("detect_notifications_sent_total", "Notifications émises")
+NOTIFICATIONS_SUPPRESSED = REGISTRY.counter(
+    "detect_notifications_suppressed_total", "Notifications supprimées par le cooldown"
+)
+
+SuppressorKey = Tuple[str, Optional[str], FrozenSet[str]]
+
+
+@dataclass
+class _State:
+    counts: Dict[str, int]
+    last_sent: float
+    last_seen: float
+
+
+class NotificationSuppressor:
+    """Décide si une notification apporte une information nouvelle."""
+
+    def __init__(
+        self,
+        cooldown_for: Callable[[str], float],
+        notify_on_count_change: bool = True,
+        state_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            cooldown_for: Cooldown (secondes) pour une caméra; 0 = pas de suppression
+            notify_on_count_change: Renvoyer dès que le nombre d'objets change
+            state_ttl: Durée après laquelle un état non revu est oublié
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        self.cooldown_for = cooldown_for
+        self.notify_on_count_change = notify_on_count_change
+        self.state_ttl = state_ttl
+        self.clock = clock
+        self._states: Dict[SuppressorKey, _State] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+
+    def should_notify(self, camera: str, zone: Optional[str], by_class: Dict[str, int]) -> bool:
+        """
+        Enregistre l'observation et indique s'il faut publier la notification.
+
+        Args:
+            camera: Nom de la caméra
+            zone: Nom de la zone (None pour une notification caméra)
+            by_class: Comptage des objets valides par classe
+        """
+        cooldown = self.cooldown_for(camera)
+        if cooldown <= 0:
+            NOTIFICATIONS_SENT.inc(camera=camera)
+            return True
+
+        now = self.clock()
+        key: SuppressorKey = (camera, zone, frozenset(by_class))
+        with self._lock:
+            self._evict_expired(now)
+            state = self._states.get(key)
+            if state is None:
+                send = True
+            elif self.notify_on_count_change and state.counts != by_class:
+                send = True
+            else:
+                send = now - state.last_sent >= cooldown
+
+            if state is None:
+                state = _State(counts=dict(by_class), last_sent=now, last_seen=now)
+                self._states[key] = state
+            state.last_seen = now
+            if send:
+                state.counts = dict(by_class)
+                state.last_sent = now
+
+        if send:
+            NOTIFICATIONS_SENT.inc(camera=camera)
+        else:
+            NOTIFICATIONS_SUPPRESSED.inc(camera=camera)
+            logger.debug("notification_suppressed", camera=camera, zone=zone, by_class=by_class)
+        return send
+
+    def _evict_expired(self, now: float) -> None:
+        # Balayage amorti: au plus une fois par dixième de TTL
+        if now - self._last_sweep < self.state_ttl / 10:
+            return
+        self._last_sweep = now
+        expired = [k for k, s in self._states.items() if now - s.last_seen > self.state_ttl]
+        for k in expired:
+            del self._states[k]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
@@ -0,0 +1,89 @@
+"""
+Détection des quasi-doublons par hash perceptuel (dHash).
+Une scène statique dont seul l'horodatage incrusté change produit le même
+hash à quelques bits près: le résultat de détection précédent est réutilisé.
+"""
+
+import copy
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import cv2
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+PHASH_REUSED = REGISTRY.counter(
+    "detect_phash_reused_total", "Détections réutilisées pour des images quasi identiques"
+)
+
+
+def dhash(image_path: str, hash_size: int = 8) -> Optional[int]:
+    """
+    Difference hash sur une version réduite en niveaux de gris.
+
+    Le décodage JPEG réduit (1/8) évite de décompresser l'image pleine résolution.
+
+    Returns:
+        Hash de hash_size² bits, ou None si l'image est illisible
+    """
+    gray = cv2.imread(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """Distance de Hamming entre deux hashes."""
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateFilter:
+    """Anneau des derniers hashes et résultats par caméra."""
+
+    def __init__(self, history: int = 4):
+        """
+        Args:
+            history: Nombre de hashes récents conservés par caméra
+        """
+        self.history = history
+        self._recent: Dict[str, Deque[Tuple[int, List[Dict], Dict]]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, camera: str, image_hash: int, threshold: int) -> Optional[Tuple[List[Dict], Dict]]:
+        """
+        Retourne une copie du résultat le plus proche si sa distance <= threshold.
+        """
+        with self._lock:
+            best = None
+            for h, detections, counters in self._recent.get(camera, ()):
+                dist = hamming(h, image_hash)
+                if dist <= threshold and (best is None or dist < best[0]):
+                    best = (dist, detections, counters)
+        if best is None:
+            return None
+        PHASH_REUSED.inc(camera=camera)
+        logger.debug("phash_result_reused", camera=camera, distance=best[0])
+        return copy.deepcopy(best[1]), copy.deepcopy(best[2])
+
+    def remember(self, camera: str, image_hash: int, detections: List[Dict], counters: Dict) -> None:
+        """Ajoute un résultat d'inférence à l'anneau de la caméra."""
+        entry = (image_hash, copy.deepcopy(detections), copy.deepcopy(counters))
+        with self._lock:
+            ring = self._recent.get(camera)
+            if ring is None:
+                ring = self._recent[camera] = deque(maxlen=self.history)
+            ring.append(entry)
+
+    def forget(self, camera: str) -> None:
+        """Oublie les résultats d'une caméra (zones ou classes modifiées)."""
+        with self._lock:
+            self._recent.pop(camera, None)
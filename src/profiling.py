@@ -0,0 +1,179 @@
+"""
+Profilage à la demande, activé à chaud (SIGUSR1 ou POST /profile).
+
+Une session armée profile avec cProfile les N prochaines images, puis écrit
+dans `shared_out/_profiles`:
+  <horodatage>_<n>img.pstats      statistiques brutes (pstats, snakeviz...)
+  <horodatage>_<n>img.txt         top des fonctions (cumulé et propre)
+  <horodatage>_<n>img.tracemalloc instantané mémoire (option tracemalloc)
+  <horodatage>_<n>img.memory.txt  allocations apparues pendant la session
+
+cProfile ne suit que le thread qui l'active: les images sont profilées une
+à la fois, les autres workers continuent sans profilage. Hors session,
+`capture()` se limite à une lecture d'attribut.
+"""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+PROFILES_DIR = "_profiles"
+# Le déclencheur HTTP écrit des fichiers et charge le processus: boucle locale uniquement
+LOCAL_HOST = "127.0.0.1"
+PROFILE_SESSIONS = REGISTRY.counter("detect_profile_sessions_total", "Sessions de profilage (result=written|failed)")
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+@dataclass
+class _Session:
+    target: int
+    tracemalloc: bool
+    started_at: float
+    images: int = 0
+    stats: Optional[pstats.Stats] = None
+    owns_tracemalloc: bool = False
+    baseline: Optional[tracemalloc.Snapshot] = field(default=None, repr=False)
+
+
+class Profiler:
+    """Sessions de profilage des N prochaines images, une à la fois."""
+
+    def __init__(
+        self,
+        output_dir,
+        images: int = 50,
+        tracemalloc_enabled: bool = False,
+        tracemalloc_frames: int = 10,
+        top: int = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            output_dir: Répertoire des rapports (shared_out/_profiles)
+            images: Images profilées par session si la demande n'en précise pas
+            tracemalloc_enabled: Instantanés mémoire par défaut
+            tracemalloc_frames: Profondeur des piles enregistrées par tracemalloc
+            top: Lignes des rapports texte
+            clock: Horloge des noms de fichiers (injectable pour les tests)
+        """
+        self.output_dir = Path(output_dir)
+        self.images = images
+        self.tracemalloc_enabled = tracemalloc_enabled
+        self.tracemalloc_frames = tracemalloc_frames
+        self.top = top
+        self.clock = clock
+        self._session: Optional[_Session] = None
+        self._lock = threading.Lock()
+        self._running = threading.Lock()  # une seule image profilée à la fois
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def status(self) -> Dict:
+        session = self._session
+        if session is None:
+            return {"active": False}
+        return {"active": True, "images": session.images, "target": session.target, "tracemalloc": session.tracemalloc}
+
+    def arm(self, images: Optional[int] = None, tracemalloc_enabled: Optional[bool] = None) -> Dict:
+        """Démarre une session; sans effet (ok=False) si une session est déjà en cours."""
+        target = self.images if images is None else images
+        if target < 1:
+            raise ValueError("images doit être >= 1")
+        with_memory = self.tracemalloc_enabled if tracemalloc_enabled is None else tracemalloc_enabled
+        with self._lock:
+            if self._session is not None:
+                return dict(self.status(), ok=False)
+            session = _Session(target=target, tracemalloc=with_memory, started_at=self.clock())
+            if with_memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(self.tracemalloc_frames)
+                    session.owns_tracemalloc = True
+                session.baseline = tracemalloc.take_snapshot()
+            self._session = session
+        logger.info("profiling_armed", images=target, tracemalloc=with_memory)
+        return dict(self.status(), ok=True)
+
+    def arm_from_query(self, query: Mapping[str, str]) -> Dict:
+        """Arme depuis les paramètres HTTP `images` et `tracemalloc` (ValueError si invalides)."""
+        images = int(query["images"]) if "images" in query else None
+        memory = query["tracemalloc"].lower() in _TRUE if "tracemalloc" in query else None
+        return self.arm(images, memory)
+
+    @contextmanager
+    def capture(self, images: int = 1) -> Iterator[None]:
+        """Profile le bloc (une image ou une rafale de `images`) si une session est armée."""
+        session = self._session
+        if session is None or not self._running.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+        finally:
+            self._running.release()
+        self._collect(session, profile, images)
+
+    def _collect(self, session: _Session, profile: cProfile.Profile, images: int) -> None:
+        with self._lock:
+            if session is not self._session:
+                return
+            if session.stats is None:
+                session.stats = pstats.Stats(profile)
+            else:
+                session.stats.add(profile)
+            session.images += images
+            if session.images < session.target:
+                return
+            self._session = None
+        try:
+            paths = self._write(session)
+            PROFILE_SESSIONS.inc(result="written")
+            logger.info("profiling_report_written", images=session.images, files=[str(p) for p in paths])
+        except Exception as e:
+            PROFILE_SESSIONS.inc(result="failed")
+            logger.error("profiling_report_failed", error=str(e))
+        finally:
+            if session.owns_tracemalloc:
+                tracemalloc.stop()
+
+    def _write(self, session: _Session) -> List[Path]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime(session.started_at))
+        base = self.output_dir / f"{stamp}_{session.images}img"
+        paths = [base.with_suffix(".pstats"), base.with_suffix(".txt")]
+
+        session.stats.dump_stats(paths[0])
+        report = io.StringIO()
+        report.write(f"{session.images} images, {self.clock() - session.started_at:.1f} s\n\n")
+        session.stats.stream = report
+        for key in ("cumulative", "tottime"):
+            session.stats.sort_stats(key).print_stats(self.top)
+        paths[1].write_text(report.getvalue(), encoding="utf-8")
+
+        if session.tracemalloc and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            paths.append(base.with_suffix(".tracemalloc"))
+            snapshot.dump(str(paths[-1]))
+            lines = [str(diff) for diff in snapshot.compare_to(session.baseline, "lineno")[: self.top]]
+            paths.append(base.with_suffix(".memory.txt"))
+            paths[-1].write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return paths
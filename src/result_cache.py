@@ -0,0 +1,174 @@
+"""
+Cache disque des résultats de détection.
+Clé: (hash du contenu du fichier, empreinte du modèle, empreinte de la config caméra).
+Évite de relancer l'inférence sur des fichiers identiques octet pour octet
+(reprises, redémarrages avec input_action: none, ré-uploads caméra).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.config_loader import CameraConfig
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+CACHE_LOOKUPS = REGISTRY.counter("detect_result_cache_lookups_total", "Consultations du cache (result=hit|miss)")
+CACHE_HIT_RATIO = REGISTRY.gauge("detect_result_cache_hit_ratio", "Taux de succès du cache de résultats")
+CACHE_BYTES = REGISTRY.gauge("detect_result_cache_bytes", "Taille disque du cache de résultats")
+
+_CHUNK = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """Hash (blake2b 128 bits) du contenu d'un fichier."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def model_fingerprint(model_path: str) -> str:
+    """Empreinte du modèle: contenu du fichier s'il existe localement, sinon son nom."""
+    if os.path.isfile(model_path):
+        return file_digest(model_path)
+    return hashlib.blake2b(model_path.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def camera_fingerprint(camera_config: CameraConfig, confidence_threshold: float) -> str:
+    """Empreinte des paramètres qui influencent le résultat de détection."""
+    payload = json.dumps(
+        {
+            "detect": sorted(camera_config.detect),
+            "zones": [[z.name, z.polygon] for z in camera_config.zones],
+            "threshold": confidence_threshold,
+        },
+        sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Cache LRU sur disque, borné en octets, un fichier JSON par entrée."""
+
+    def __init__(self, directory: Path, model_hash: str, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            directory: Répertoire du cache (créé si besoin)
+            model_hash: Empreinte du modèle courant (voir model_fingerprint)
+            max_bytes: Taille disque maximale avant éviction des entrées les moins récentes
+        """
+        self.directory = Path(directory)
+        self.model_hash = model_hash
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Reconstruit l'index LRU depuis le disque (ordre = mtime)."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name[:-5], st.st_size))
+        for _mtime, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+        CACHE_BYTES.set(self._total)
+        logger.info("result_cache_loaded", directory=str(self.directory), entries=len(self._index), bytes=self._total)
+
+    def key_for(self, image_path: str, camera_hash: str) -> str:
+        return hashlib.blake2b(
+            f"{file_digest(image_path)}:{self.model_hash}:{camera_hash}".encode("utf-8"), digest_size=20
+        ).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict], Dict]]:
+        """Retourne (detections, counters) ou None si absent."""
+        with self._lock:
+            known = key in self._index
+        data = None
+        if known:
+            try:
+                data = json.loads(self._path(key).read_text(encoding="utf-8"))
+                os.utime(self._path(key))
+            except (OSError, ValueError):
+                data = None
+
+        with self._lock:
+            if data is None:
+                if known:
+                    self._forget(key)
+                self._misses += 1
+            else:
+                self._index.move_to_end(key)
+                self._hits += 1
+            self._update_ratio()
+
+        CACHE_LOOKUPS.inc(result="hit" if data is not None else "miss")
+        if data is None:
+            return None
+        detections = [dict(d, bbox=tuple(d["bbox"])) for d in data["detections"]]
+        return detections, data["counters"]
+
+    def put(self, key: str, detections: List[Dict], counters: Dict) -> None:
+        """Enregistre un résultat et évince les entrées les plus anciennes si besoin."""
+        payload = json.dumps({"detections": detections, "counters": counters}, ensure_ascii=False)
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("result_cache_write_failed", path=str(path), error=str(e))
+            return
+
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            self._forget(key, unlink=False)
+            self._index[key] = size
+            self._total += size
+            while self._total > self.max_bytes and len(self._index) > 1:
+                oldest = next(iter(self._index))
+                self._forget(oldest)
+            CACHE_BYTES.set(self._total)
+
+    def _forget(self, key: str, unlink: bool = True) -> None:
+        size = self._index.pop(key, None)
+        if size is None:
+            return
+        self._total -= size
+        if unlink:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _update_ratio(self) -> None:
+        lookups = self._hits + self._misses
+        CACHE_HIT_RATIO.set(self._hits / lookups if lookups else 0.0)
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return self._hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
@@ -0,0 +1,307 @@
+"""
+Rétention des fichiers de sortie (shared_out).
+
+Chaque politique couvre une catégorie (`true`, `false`, `original`...),
+éventuellement limitée à une caméra, avec un âge maximal et/ou un budget
+en octets. Les fichiers sont indexés en mémoire (taille, mtime) : un seul
+parcours de l'arborescence au démarrage, puis les nouveaux fichiers sont
+déclarés par le pipeline via `record()`. Les sous-dossiers internes
+préfixés par `_` (cache, spool...) ne sont jamais touchés.
+"""
+
+import heapq
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+from src.utils import forget_dirs
+
+logger = get_logger(__name__)
+
+RETENTION_BYTES = REGISTRY.gauge("detect_retention_bytes", "Octets indexés par politique de rétention")
+RETENTION_FILES = REGISTRY.gauge("detect_retention_files", "Fichiers indexés par politique de rétention")
+EVICTED_FILES = REGISTRY.counter("detect_retention_evicted_files_total", "Fichiers supprimés (policy, reason=age|budget)")
+EVICTED_BYTES = REGISTRY.counter("detect_retention_evicted_bytes_total", "Octets libérés (policy, reason=age|budget)")
+
+# Dossiers de date créés par shard_dir (AAAA-MM-JJ, puis HH avec shard_by=hour)
+_DAY_SHARD = re.compile(r"\d{4}-\d{2}-\d{2}")
+_HOUR_SHARD = re.compile(r"\d{2}")
+
+
+@dataclass
+class Policy:
+    """Politique de rétention d'une catégorie (et éventuellement d'une caméra)."""
+
+    category: str
+    camera: Optional[str] = None
+    max_age: Optional[float] = None      # secondes
+    max_bytes: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.category}_{self.camera}" if self.camera else self.category
+
+
+@dataclass
+class _Bucket:
+    policy: Policy
+    files: Dict[str, Tuple[int, float]] = field(default_factory=dict)   # path -> (taille, mtime)
+    heap: List[Tuple[float, str]] = field(default_factory=list)        # (mtime, path), entrées périmées tolérées
+    total: int = 0
+    evicted_files: int = 0
+    evicted_bytes: int = 0
+
+
+class RetentionManager:
+    """Index incrémental des fichiers de sortie et éviction par âge / budget."""
+
+    def __init__(
+        self,
+        root: Path,
+        policies: Iterable[Policy],
+        interval: float = 300.0,
+        rescan_interval: float = 24 * 3600.0,
+        on_sweep: Optional[Callable[[Dict[str, Dict[str, int]]], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            root: Répertoire de sortie (shared_out)
+            policies: Politiques; celles propres à une caméra priment sur celles de leur catégorie
+            interval: Période (s) entre deux passes d'éviction
+            rescan_interval: Période (s) de reconstruction complète de l'index (fichiers
+                ajoutés ou supprimés hors du pipeline)
+            on_sweep: Appelé après chaque passe avec les statistiques par politique
+            clock: Horloge murale (injectable pour les tests)
+        """
+        self.root = Path(root)
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.on_sweep = on_sweep
+        self.clock = clock
+        self._buckets = {p.name: _Bucket(p) for p in policies}
+        self._lock = threading.Lock()
+        self._recorded_during_rebuild: Optional[List[Tuple[str, int, float]]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- index ------------------------------------------------------------
+
+    def _bucket_for(self, path: str) -> Optional[_Bucket]:
+        try:
+            parts = Path(path).relative_to(self.root).parts
+        except ValueError:
+            return None
+        if len(parts) < 2 or parts[0].startswith("_"):
+            return None
+        category, camera = parts[0], parts[1] if len(parts) > 2 else None
+        generic = None
+        for bucket in self._buckets.values():
+            if bucket.policy.category != category:
+                continue
+            if bucket.policy.camera is None:
+                generic = bucket
+            elif bucket.policy.camera == camera:
+                return bucket
+        return generic
+
+    def _add(self, bucket: _Bucket, path: str, size: int, mtime: float) -> None:
+        previous = bucket.files.get(path)
+        if previous is not None:
+            bucket.total -= previous[0]
+        bucket.files[path] = (size, mtime)
+        bucket.total += size
+        heapq.heappush(bucket.heap, (mtime, path))
+
+    def record(self, path, size: Optional[int] = None, mtime: Optional[float] = None) -> None:
+        """Déclare un fichier écrit par le pipeline (sans parcours de l'arborescence)."""
+        path = os.fspath(path)
+        if size is None or mtime is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            size, mtime = st.st_size, st.st_mtime
+        with self._lock:
+            bucket = self._bucket_for(path)
+            if bucket is None:
+                return
+            self._add(bucket, path, size, mtime)
+            if self._recorded_during_rebuild is not None:
+                self._recorded_during_rebuild.append((path, size, mtime))
+
+    def rebuild(self) -> None:
+        """Reconstruit l'index par un parcours complet (démarrage et réconciliation)."""
+        with self._lock:
+            self._recorded_during_rebuild = []
+        fresh = {name: _Bucket(b.policy, evicted_files=b.evicted_files, evicted_bytes=b.evicted_bytes)
+                 for name, b in self._buckets.items()}
+        by_policy = {id(b.policy): fresh[name] for name, b in self._buckets.items()}
+        stack = [self.root]
+        scanned = 0
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if directory != self.root or not entry.name.startswith("_"):
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            bucket = self._bucket_for(entry.path)
+                            if bucket is not None:
+                                st = entry.stat(follow_symlinks=False)
+                                self._add(by_policy[id(bucket.policy)], entry.path, st.st_size, st.st_mtime)
+                                scanned += 1
+            except OSError:
+                continue
+        with self._lock:
+            # Fichiers déclarés pendant le parcours: conservés
+            for path, size, mtime in self._recorded_during_rebuild:
+                bucket = self._bucket_for(path)
+                target = by_policy[id(bucket.policy)]
+                if path not in target.files:
+                    self._add(target, path, size, mtime)
+            self._recorded_during_rebuild = None
+            self._buckets = fresh
+        logger.info("retention_index_built", files=scanned)
+
+    # --- éviction ---------------------------------------------------------
+
+    def _evict(self, bucket: _Bucket) -> Optional[Tuple[str, int]]:
+        while bucket.heap:
+            mtime, path = heapq.heappop(bucket.heap)
+            entry = bucket.files.get(path)
+            if entry is None or entry[1] != mtime:
+                continue  # entrée périmée (fichier ré-enregistré ou déjà supprimé)
+            del bucket.files[path]
+            bucket.total -= entry[0]
+            return path, entry[0]
+        return None
+
+    def _oldest(self, bucket: _Bucket) -> Optional[float]:
+        while bucket.heap:
+            mtime, path = bucket.heap[0]
+            entry = bucket.files.get(path)
+            if entry is not None and entry[1] == mtime:
+                return mtime
+            heapq.heappop(bucket.heap)
+        return None
+
+    def sweep(self) -> Dict[str, Dict[str, int]]:
+        """
+        Applique toutes les politiques.
+
+        Returns:
+            {policy: {"files", "bytes", "evicted_files", "evicted_bytes"}}
+        """
+        now = self.clock()
+        removed: List[Tuple[str, str, str, int]] = []
+        with self._lock:
+            for name, bucket in self._buckets.items():
+                policy = bucket.policy
+                if policy.max_age is not None:
+                    while (oldest := self._oldest(bucket)) is not None and now - oldest > policy.max_age:
+                        path, size = self._evict(bucket)
+                        removed.append((name, "age", path, size))
+                if policy.max_bytes is not None:
+                    while bucket.total > policy.max_bytes:
+                        evicted = self._evict(bucket)
+                        if evicted is None:
+                            break
+                        removed.append((name, "budget", *evicted))
+
+        # Suppressions hors verrou: record() n'est pas bloqué par un disque lent
+        for name, reason, path, size in removed:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("retention_unlink_failed", path=path, error=str(e))
+                continue
+            self._prune_empty_dirs(Path(path).parent)
+            EVICTED_FILES.inc(policy=name, reason=reason)
+            EVICTED_BYTES.inc(size, policy=name, reason=reason)
+            with self._lock:
+                bucket = self._buckets.get(name)
+                if bucket is not None:
+                    bucket.evicted_files += 1
+                    bucket.evicted_bytes += size
+        if removed:
+            logger.info("retention_sweep", evicted=len(removed))
+
+        stats = self.stats()
+        for name, s in stats.items():
+            RETENTION_BYTES.set(s["bytes"], policy=name)
+            RETENTION_FILES.set(s["files"], policy=name)
+        if self.on_sweep is not None:
+            self.on_sweep(stats)
+        return stats
+
+    def _prune_empty_dirs(self, directory: Path) -> None:
+        """
+        Supprime les dossiers de date devenus vides. Les dossiers de caméra et
+        de catégorie, ainsi que ceux du jour en cours, sont conservés: les
+        écrivains les gardent en cache (ensure_dir) et y écrivent sans les recréer.
+        """
+        today = time.strftime("%Y-%m-%d", time.localtime(self.clock()))
+        while self._is_shard(directory):
+            day = directory.name if _DAY_SHARD.fullmatch(directory.name) else directory.parent.name
+            if day == today:
+                return
+            try:
+                directory.rmdir()
+            except OSError:
+                return  # non vide (ou déjà supprimé par un autre balayage)
+            forget_dirs(directory)
+            directory = directory.parent
+
+    def _is_shard(self, directory: Path) -> bool:
+        if directory == self.root or self.root not in directory.parents:
+            return False
+        if _DAY_SHARD.fullmatch(directory.name):
+            return True
+        return bool(_HOUR_SHARD.fullmatch(directory.name)) and bool(_DAY_SHARD.fullmatch(directory.parent.name))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {
+                    "files": len(b.files),
+                    "bytes": b.total,
+                    "evicted_files": b.evicted_files,
+                    "evicted_bytes": b.evicted_bytes,
+                }
+                for name, b in self._buckets.items()
+            }
+
+    # --- thread de fond ---------------------------------------------------
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        next_rescan = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_rescan:
+                    self.rebuild()
+                    next_rescan = time.monotonic() + self.rescan_interval
+                self.sweep()
+            except Exception as e:
+                logger.error("retention_sweep_failed", error=str(e))
+            self._stop.wait(self.interval)
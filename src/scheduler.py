@@ -0,0 +1,158 @@
+"""
+Ordonnanceur équitable par caméra et pool de workers.
+Chaque caméra a sa propre file; les caméras de priorité plus élevée sont
+servies en premier, les caméras de même priorité en round-robin.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+QUEUE_WAIT = REGISTRY.histogram(
+    "detect_queue_wait_seconds", "Temps d'attente en file avant prise en charge par un worker"
+)
+QUEUE_DEPTH = REGISTRY.gauge("detect_queue_depth", "Nombre d'éléments en attente par caméra")
+
+
+class CameraScheduler:
+    """File de travail à ordonnancement strict par priorité puis round-robin par caméra."""
+
+    def __init__(self, priorities: Optional[Dict[str, int]] = None, default_priority: int = 0):
+        """
+        Args:
+            priorities: Priorité par nom de caméra (plus grand = plus prioritaire)
+            default_priority: Priorité des caméras absentes de `priorities`
+        """
+        self._priorities: Dict[str, int] = dict(priorities or {})
+        self._default_priority = default_priority
+        self._queues: Dict[str, Deque[Tuple[float, Any]]] = {}
+        # priorité -> caméras ayant du travail, dans l'ordre de service
+        self._rotation: Dict[int, Deque[str]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def priority_of(self, camera: str) -> int:
+        return self._priorities.get(camera, self._default_priority)
+
+    def set_priorities(self, priorities: Dict[str, int], default_priority: int = 0) -> None:
+        """Remplace les priorités (rechargement de config); les caméras en attente sont reclassées."""
+        with self._cond:
+            self._priorities = dict(priorities)
+            self._default_priority = default_priority
+            waiting = [camera for prio in sorted(self._rotation, reverse=True) for camera in self._rotation[prio]]
+            self._rotation = {}
+            for camera in waiting:
+                self._rotation.setdefault(self.priority_of(camera), deque()).append(camera)
+
+    def submit(self, camera: str, item: Any) -> None:
+        """Ajoute un élément dans la file de la caméra."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler fermé")
+            queue = self._queues.setdefault(camera, deque())
+            if not queue:
+                self._rotation.setdefault(self.priority_of(camera), deque()).append(camera)
+            queue.append((time.monotonic(), item))
+            QUEUE_DEPTH.set(len(queue), camera=camera)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+        """
+        Récupère le prochain élément (camera, item).
+
+        Returns:
+            None si le timeout expire ou si le scheduler est fermé et vide
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                picked = self._pop_next()
+                if picked is not None:
+                    return picked
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def _pop_next(self) -> Optional[Tuple[str, Any]]:
+        for prio in sorted(self._rotation, reverse=True):
+            rotation = self._rotation[prio]
+            if not rotation:
+                continue
+            camera = rotation.popleft()
+            queue = self._queues[camera]
+            enqueued_at, item = queue.popleft()
+            if queue:
+                rotation.append(camera)
+            QUEUE_DEPTH.set(len(queue), camera=camera)
+            QUEUE_WAIT.observe(time.monotonic() - enqueued_at, camera=camera)
+            return camera, item
+        return None
+
+    def depth(self, camera: Optional[str] = None) -> int:
+        """Nombre d'éléments en attente (pour une caméra ou au total)."""
+        with self._cond:
+            if camera is not None:
+                return len(self._queues.get(camera, ()))
+            return sum(len(q) for q in self._queues.values())
+
+    def close(self) -> None:
+        """Refuse les nouveaux éléments et réveille les workers en attente."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class WorkerPool:
+    """Pool de threads consommant un CameraScheduler."""
+
+    def __init__(
+        self,
+        scheduler: CameraScheduler,
+        handler: Callable[[str, Any], None],
+        workers: int = 1,
+    ):
+        """
+        Args:
+            scheduler: Source des éléments à traiter
+            handler: Fonction appelée avec (camera, item) pour chaque élément
+            workers: Nombre de threads
+        """
+        self.scheduler = scheduler
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"detect-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info("worker_pool_started", workers=self.workers)
+
+    def _run(self) -> None:
+        while True:
+            picked = self.scheduler.get()
+            if picked is None:
+                return
+            camera, item = picked
+            try:
+                self.handler(camera, item)
+            except Exception as e:
+                logger.error("worker_handler_failed", camera=camera, error=str(e), exc_info=True)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ferme le scheduler et attend la fin des éléments en cours."""
+        self.scheduler.close()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads.clear()
+        logger.info("worker_pool_stopped")
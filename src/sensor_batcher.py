@@ -0,0 +1,126 @@
+"""
+Regroupement des publications de capteurs MQTT d'une image.
+
+Modes:
+  - per_metric : un message par métrique (comportement historique)
+  - state      : un seul message JSON par caméra sur le topic state
+                 (entités HA via value_template "{{ value_json.<metric> }}")
+  - changed    : uniquement les métriques dont la valeur a changé,
+                 au plus un envoi par caméra toutes les `min_interval` secondes
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from src.logger import get_logger
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+SENSOR_VALUES = REGISTRY.counter("detect_sensor_values_total", "Valeurs de capteurs soumises")
+SENSOR_MESSAGES = REGISTRY.counter("detect_sensor_messages_total", "Messages MQTT de capteurs envoyés")
+
+SENSOR_MODES = ("per_metric", "state", "changed")
+
+_MISSING = object()
+
+
+class SensorBatcher:
+    """Publie les capteurs d'une image selon le mode configuré."""
+
+    def __init__(
+        self,
+        publisher,
+        mode: str = "per_metric",
+        min_interval: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            publisher: MQTTPublisher (publish_sensor / publish_state)
+            mode: per_metric | state | changed
+            min_interval: Intervalle minimal entre deux envois d'une caméra (mode changed)
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        if mode not in SENSOR_MODES:
+            raise ValueError(f"Mode capteurs inconnu: {mode}")
+        self.publisher = publisher
+        self.mode = mode
+        self.min_interval = min_interval
+        self.clock = clock
+        self._last_values: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, camera: str, values: Dict[str, Any]) -> None:
+        """Soumet toutes les métriques d'une image pour une caméra."""
+        SENSOR_VALUES.inc(len(values), camera=camera)
+        if self.mode == "per_metric":
+            for metric, value in values.items():
+                self.publisher.publish_sensor(camera, metric, value)
+            SENSOR_MESSAGES.inc(len(values), camera=camera)
+            return
+
+        if self.mode == "state":
+            self.publisher.publish_state(camera, values)
+            SENSOR_MESSAGES.inc(camera=camera)
+            return
+
+        self._submit_changed(camera, values)
+
+    def _submit_changed(self, camera: str, values: Dict[str, Any]) -> None:
+        with self._lock:
+            last = self._last_values.setdefault(camera, {})
+            pending = self._pending.setdefault(camera, {})
+            for metric, value in values.items():
+                if last.get(metric, _MISSING) != value:
+                    pending[metric] = value
+                else:
+                    pending.pop(metric, None)
+            if not pending:
+                return
+
+            wait = self._last_flush.get(camera, float("-inf")) + self.min_interval - self.clock()
+            if wait > 0:
+                if camera not in self._timers:
+                    timer = threading.Timer(wait, self.flush, args=(camera,))
+                    timer.daemon = True
+                    self._timers[camera] = timer
+                    timer.start()
+                return
+            batch = self._take(camera)
+
+        self._send(camera, batch)
+
+    def _take(self, camera: str) -> Dict[str, Any]:
+        timer = self._timers.pop(camera, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(camera, {})
+        if batch:
+            self._last_values.setdefault(camera, {}).update(batch)
+            self._last_flush[camera] = self.clock()
+        return batch
+
+    def _send(self, camera: str, batch: Dict[str, Any]) -> None:
+        for metric, value in batch.items():
+            self.publisher.publish_sensor(camera, metric, value)
+        SENSOR_MESSAGES.inc(len(batch), camera=camera)
+
+    def flush(self, camera: str) -> None:
+        """Envoie immédiatement les changements en attente d'une caméra."""
+        with self._lock:
+            batch = self._take(camera)
+        if batch:
+            self._send(camera, batch)
+
+    def flush_all(self) -> None:
+        """Envoie tous les changements en attente (arrêt de l'application)."""
+        with self._lock:
+            cameras = list(self._pending)
+        for camera in cameras:
+            self.flush(camera)
+
@@ -0,0 +1,151 @@
+"""
+Durées par étape du traitement d'une image.
+
+Un `StageTimer` est ouvert par image (ou rafale) dans le worker et devient
+le timer courant du thread: les modules appelés (détecteur, annotateur...)
+ajoutent leurs étapes avec `stage()` / `add_stage()` sans qu'on leur passe
+le timer. Sans timer courant, ces appels se limitent à une lecture du
+thread-local.
+
+À la fermeture du timer, chaque étape alimente l'histogramme
+`detect_stage_seconds{stage}` et les percentiles glissants `STAGE_STATS`.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Sequence
+
+from src.metrics import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram("detect_stage_seconds", "Durée des étapes du traitement d'une image (stage)")
+
+_local = threading.local()
+
+# Étapes mesurées avant la prise en charge par un worker (attente d'écriture du fichier)
+_MAX_PENDING = 4096
+_pending: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+_pending_lock = threading.Lock()
+
+
+class RollingPercentiles:
+    """Percentiles des N dernières durées de chaque étape."""
+
+    def __init__(self, window: int = 1024):
+        """
+        Args:
+            window: Nombre de mesures conservées par étape
+        """
+        self.window = window
+        self.observations = 0
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, spans: Dict[str, float]) -> None:
+        """Ajoute les durées (secondes) d'une image ou rafale traitée."""
+        with self._lock:
+            for stage, seconds in spans.items():
+                samples = self._samples.get(stage)
+                if samples is None:
+                    samples = self._samples[stage] = deque(maxlen=self.window)
+                samples.append(seconds)
+            self.observations += 1
+
+    def percentiles(self, quantiles: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[str, Dict[str, float]]:
+        """{étape: {"p50": ms, "p90": ms, "p99": ms, "count": n}} sur la fenêtre courante."""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        result = {}
+        for stage, values in snapshot.items():
+            if not values:
+                continue
+            entry = {f"p{round(q * 100)}": round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+                     for q in quantiles}
+            entry["count"] = len(values)
+            result[stage] = entry
+        return result
+
+
+STAGE_STATS = RollingPercentiles()
+
+
+class StageTimer:
+    """Durées cumulées par étape pour une image ou une rafale."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter, stats: RollingPercentiles = STAGE_STATS):
+        self.clock = clock
+        self.stats = stats
+        self.spans: Dict[str, float] = {}
+        self._start = clock()
+        self._previous: Optional["StageTimer"] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.add(name, self.clock() - start)
+
+    def adopt(self, key: str) -> None:
+        """Reprend les étapes notées pour `key` avant la prise en charge (voir note_pending)."""
+        with _pending_lock:
+            spans = _pending.pop(key, None)
+        for name, seconds in (spans or {}).items():
+            self.add(name, seconds)
+
+    def as_ms(self) -> Dict[str, float]:
+        """Étapes en millisecondes, plus la durée totale depuis l'ouverture."""
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.spans.items()}
+        timings["total"] = round((self.clock() - self._start) * 1000, 1)
+        return timings
+
+    def __enter__(self) -> "StageTimer":
+        self._previous = getattr(_local, "timer", None)
+        _local.timer = self
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _local.timer = self._previous
+        spans = dict(self.spans, total=self.clock() - self._start)
+        for name, seconds in spans.items():
+            STAGE_SECONDS.observe(seconds, stage=name)
+        self.stats.record(spans)
+
+
+def current() -> Optional[StageTimer]:
+    """Timer courant du thread, None hors traitement d'image."""
+    return getattr(_local, "timer", None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mesure un bloc dans le timer courant (sans effet s'il n'y en a pas)."""
+    timer = getattr(_local, "timer", None)
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def add_stage(name: str, seconds: float) -> None:
+    """Ajoute une durée mesurée ailleurs (ex. `speed` d'ultralytics) au timer courant."""
+    timer = getattr(_local, "timer", None)
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+def note_pending(key: str, name: str, seconds: float) -> None:
+    """Note une étape mesurée hors worker (ex. attente d'écriture), reprise par `adopt`."""
+    with _pending_lock:
+        spans = _pending.get(key)
+        if spans is None:
+            spans = _pending[key] = {}
+            if len(_pending) > _MAX_PENDING:
+                _pending.popitem(last=False)
+        spans[name] = spans.get(name, 0.0) + seconds
@@ -0,0 +1,192 @@
+"""
+Suivi multi-objets léger (IoU glouton) entre snapshots consécutifs d'une caméra.
+Attribue des identifiants persistants et classe chaque objet en
+nouveau / immobile / en mouvement, et signale les objets partis.
+"""
+
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from src.logger import get_logger, is_enabled_for
+from src.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+TRACK_EVENTS = REGISTRY.counter("detect_track_events_total", "Événements de suivi par type")
+
+BBox = Tuple[float, float, float, float]
+
+STATE_NEW = "new"
+STATE_STATIONARY = "stationary"
+STATE_MOVING = "moving"
+
+
+def iou(a: BBox, b: BBox) -> float:
+    """Intersection over Union de deux bbox (x1, y1, x2, y2)."""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    iw, ih = max(0.0, ix2 - ix1), max(0.0, iy2 - iy1)
+    inter = iw * ih
+    if inter <= 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / (area_a + area_b - inter)
+
+
+@dataclass
+class Track:
+    """Objet suivi."""
+    track_id: int
+    class_name: str
+    bbox: BBox
+    anchor: BBox                 # position de référence pour l'immobilité
+    hits: int = 1
+    missed: int = 0
+    state: str = STATE_NEW
+
+
+@dataclass
+class TrackEvents:
+    """Résultat d'une mise à jour du tracker."""
+    new: List[Dict] = field(default_factory=list)
+    stationary: List[Dict] = field(default_factory=list)
+    moving: List[Dict] = field(default_factory=list)
+    departed: List[Track] = field(default_factory=list)
+
+    @property
+    def active(self) -> int:
+        return len(self.new) + len(self.stationary) + len(self.moving)
+
+
+class CameraTracker:
+    """Tracker IoU d'une caméra, mémoire bornée à `max_tracks` pistes."""
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        stationary_iou: float = 0.7,
+        max_missed: int = 3,
+        max_tracks: int = 64,
+    ):
+        self.iou_threshold = iou_threshold
+        self.stationary_iou = stationary_iou
+        self.max_missed = max_missed
+        self.max_tracks = max_tracks
+        self.tracks: Dict[int, Track] = {}
+        self._ids = itertools.count(1)
+
+    def update(self, detections: List[Dict]) -> TrackEvents:
+        """
+        Associe les détections valides aux pistes existantes.
+
+        Les détections reçoivent les clés 'track_id' et 'track_state'.
+        Les fausses détections (is_false) sont ignorées.
+        """
+        events = TrackEvents()
+        valid = [d for d in detections if not d.get("is_false")]
+
+        # Appariement glouton par IoU décroissant, à classe identique
+        pairs = []
+        for di, det in enumerate(valid):
+            for tid, track in self.tracks.items():
+                if track.class_name != det["class"]:
+                    continue
+                score = iou(track.bbox, det["bbox"])
+                if score >= self.iou_threshold:
+                    pairs.append((score, di, tid))
+        pairs.sort(reverse=True)
+
+        matched_dets, matched_tracks = set(), set()
+        for _score, di, tid in pairs:
+            if di in matched_dets or tid in matched_tracks:
+                continue
+            matched_dets.add(di)
+            matched_tracks.add(tid)
+            track = self.tracks[tid]
+            det = valid[di]
+            track.bbox = det["bbox"]
+            track.hits += 1
+            track.missed = 0
+            if iou(track.anchor, det["bbox"]) >= self.stationary_iou:
+                track.state = STATE_STATIONARY
+            else:
+                track.state = STATE_MOVING
+                track.anchor = det["bbox"]
+            self._tag(det, track, events)
+
+        for di, det in enumerate(valid):
+            if di in matched_dets:
+                continue
+            track = Track(next(self._ids), det["class"], det["bbox"], det["bbox"])
+            self.tracks[track.track_id] = track
+            matched_tracks.add(track.track_id)
+            self._tag(det, track, events)
+
+        for tid in list(self.tracks):
+            if tid in matched_tracks:
+                continue
+            track = self.tracks[tid]
+            track.missed += 1
+            if track.missed > self.max_missed:
+                events.departed.append(self.tracks.pop(tid))
+
+        # Borne mémoire: on oublie d'abord les pistes les plus longtemps absentes
+        if len(self.tracks) > self.max_tracks:
+            overflow = sorted(self.tracks.values(), key=lambda t: (-t.missed, t.track_id))
+            for track in overflow[: len(self.tracks) - self.max_tracks]:
+                events.departed.append(self.tracks.pop(track.track_id))
+
+        return events
+
+    @staticmethod
+    def _tag(det: Dict, track: Track, events: TrackEvents) -> None:
+        det["track_id"] = track.track_id
+        det["track_state"] = track.state
+        getattr(events, track.state).append(det)
+
+
+class ObjectTracker:
+    """Ensemble de trackers indépendants, un par caméra."""
+
+    def __init__(self, **tracker_kwargs):
+        self.tracker_kwargs = tracker_kwargs
+        self._trackers: Dict[str, CameraTracker] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def update(self, camera: str, detections: List[Dict]) -> TrackEvents:
+        """Met à jour le tracker de la caméra avec les détections d'un snapshot."""
+        with self._lock:
+            tracker = self._trackers.get(camera)
+            if tracker is None:
+                tracker = CameraTracker(**self.tracker_kwargs)
+                self._trackers[camera] = tracker
+                self._locks[camera] = threading.Lock()
+            cam_lock = self._locks[camera]
+
+        with cam_lock:
+            events = tracker.update(detections)
+
+        for state in (STATE_NEW, STATE_STATIONARY, STATE_MOVING):
+            n = len(getattr(events, state))
+            if n:
+                TRACK_EVENTS.inc(n, camera=camera, event=state)
+        if events.departed:
+            TRACK_EVENTS.inc(len(events.departed), camera=camera, event="departed")
+            if is_enabled_for(logging.DEBUG):
+                logger.debug(
+                    "tracks_departed",
+                    camera=camera,
+                    track_ids=[t.track_id for t in events.departed],
+                )
+        return events
+
+    def reset(self, camera: str) -> None:
+        """Oublie toutes les pistes d'une caméra."""
+        with self._lock:
+            self._trackers.pop(camera, None)
+            self._locks.pop(camera, None)
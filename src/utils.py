@@ -2,30 +2,277 @@
 Fonctions utilitaires pour la gestion des fichiers et autres helpers.
 """
 
+import errno
 import os
+import re
 import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional, Sequence, Tuple, TypeVar
 from src.logger import get_logger
+from src.metrics import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # Windows: pas de reflink
+    fcntl = None
 
 logger = get_logger(__name__)
 
+ARCHIVE_OPERATIONS = REGISTRY.counter(
+    "detect_archive_operations_total", "Archivage des sources par stratégie (strategy, result)"
+)
+
+# Ordre d'essai: du moins coûteux (aucune donnée copiée) à la copie complète
+ARCHIVE_STRATEGIES = ("hardlink", "reflink", "rename", "copy")
+
+# ioctl Linux FICLONE (_IOW(0x94, 9, int)): clone copy-on-write (btrfs, XFS, ZFS récents)
+_FICLONE = 0x40049409
+
 
 # ------------------------------------------------------------------------
 # Helpers internes
 # ------------------------------------------------------------------------
 
+# Horodatage dans le nom de fichier: 2025-11-10_10-30-15, 20251110103015, 2025-11-10T10:30:15...
+_FILENAME_TIMESTAMP = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})[_T -]?(\d{2})[-:h]?(\d{2})[-:m]?(\d{2})")
+
+# Répertoires déjà créés: évite un mkdir(parents=True) par image
+_known_dirs: set = set()
+_known_dirs_lock = threading.Lock()
+_KNOWN_DIRS_MAX = 4096
+
+T = TypeVar("T")
+
+
+def ensure_dir(directory) -> None:
+    """Crée le répertoire (et ses parents) une seule fois par processus."""
+    key = os.fspath(directory)
+    if key in _known_dirs:
+        return
+    os.makedirs(key, exist_ok=True)
+    with _known_dirs_lock:
+        if len(_known_dirs) >= _KNOWN_DIRS_MAX:
+            _known_dirs.clear()
+        _known_dirs.add(key)
+
+
+def forget_dirs(prefix=None) -> None:
+    """Oublie les répertoires connus (tous, ou sous `prefix`) après leur suppression."""
+    with _known_dirs_lock:
+        if prefix is None:
+            _known_dirs.clear()
+            return
+        root = os.fspath(prefix)
+        _known_dirs.difference_update({d for d in _known_dirs if d == root or d.startswith(root + os.sep)})
+
+
+def write_in_dir(directory, write: Callable[[], T]) -> T:
+    """
+    Exécute `write`, qui écrit dans `directory` (déjà passé par ensure_dir).
+    Si le répertoire a disparu depuis (nettoyage manuel, remontage NAS...),
+    il est oublié du cache, recréé, et l'écriture est retentée une fois.
+    """
+    try:
+        return write()
+    except FileNotFoundError:
+        if os.path.isdir(directory):
+            raise  # autre cause (source absente...): rien à recréer
+        logger.warning("output_dir_recreated", directory=os.fspath(directory))
+        forget_dirs(directory)
+        ensure_dir(directory)
+        return write()
+
+
+def capture_time(source_path) -> datetime:
+    """Date de prise de vue: horodatage du nom de fichier, sinon mtime, sinon maintenant."""
+    match = _FILENAME_TIMESTAMP.search(os.path.basename(os.fspath(source_path)))
+    if match:
+        try:
+            return datetime(*(int(g) for g in match.groups()))
+        except ValueError:
+            pass  # ex. 2025-13-45: pas une date
+    try:
+        return datetime.fromtimestamp(os.stat(source_path).st_mtime)
+    except OSError:
+        return datetime.now()
+
+
+def shard_dir(directory, source_path, shard_by: Optional[str]) -> Path:
+    """Ajoute les sous-dossiers de date (day: AAAA-MM-JJ, hour: AAAA-MM-JJ/HH)."""
+    directory = Path(directory)
+    if not shard_by:
+        return directory
+    taken = capture_time(source_path)
+    directory = directory / taken.strftime("%Y-%m-%d")
+    if shard_by == "hour":
+        directory = directory / taken.strftime("%H")
+    return directory
+
+
+class _PathAllocator:
+    """
+    Attribution de noms de fichiers uniques en O(1).
+
+    Le nom est réservé par création atomique (O_CREAT|O_EXCL), ce qui reste
+    sûr entre plusieurs processus. En cas de collision, le suffixe _N suivant
+    vient d'un compteur en mémoire par (répertoire, nom, extension), amorcé
+    par un unique scandir du répertoire au lieu de tester _1, _2, ... un par un.
+    """
+
+    def __init__(self, max_directories: int = 256):
+        self.max_directories = max_directories
+        self._lock = threading.Lock()
+        self._counters: "OrderedDict[str, Dict[Tuple[str, str], int]]" = OrderedDict()
+
+    def _directory_counters(self, directory: str) -> Dict[Tuple[str, str], int]:
+        counters = self._counters.get(directory)
+        if counters is not None:
+            self._counters.move_to_end(directory)
+            return counters
+        counters = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    root, ext = os.path.splitext(entry.name)
+                    base, sep, n = root.rpartition("_")
+                    if sep and n.isdigit():
+                        key = (base, ext)
+                        counters[key] = max(counters.get(key, 0), int(n))
+        except FileNotFoundError:
+            pass
+        self._counters[directory] = counters
+        if len(self._counters) > self.max_directories:
+            self._counters.popitem(last=False)
+        return counters
+
+    @staticmethod
+    def _claim(path: Path) -> bool:
+        try:
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+            return True
+        except FileExistsError:
+            return False
+
+    def allocate(self, dest: Path) -> Path:
+        """Réserve `dest`, ou `<stem>_<N><ext>` si le nom est déjà pris (fichier vide créé)."""
+        if self._claim(dest):
+            return dest
+        stem, suf = dest.stem, dest.suffix
+        while True:
+            with self._lock:
+                counters = self._directory_counters(str(dest.parent))
+                n = counters.get((stem, suf), 0) + 1
+                counters[(stem, suf)] = n
+            cand = dest.with_name(f"{stem}_{n}{suf}")
+            # Pris par un autre processus entre-temps: le compteur avance
+            if self._claim(cand):
+                return cand
+
+
+_allocator = _PathAllocator()
+
+
 def _unique_path(dest: Path) -> Path:
-    """Retourne un chemin non-collisant en suffixant _N si besoin."""
-    if not dest.exists():
-        return dest
-    stem, suf = dest.stem, dest.suffix
-    i = 1
-    while True:
-        cand = dest.with_name(f"{stem}_{i}{suf}")
-        if not cand.exists():
-            return cand
-        i += 1
+    """
+    Réserve un chemin non-collisant en suffixant _N si besoin.
+    Le fichier retourné existe (vide) et doit être remplacé par l'appelant.
+    """
+    return _allocator.allocate(dest)
+
+
+def _reflink(source: str, dest: Path, claimed: bool = False) -> None:
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink non supporté")
+    flags = os.O_WRONLY | (os.O_TRUNC if claimed else os.O_CREAT | os.O_EXCL)
+    with open(source, "rb") as src:
+        fd = os.open(dest, flags, 0o644)
+        try:
+            fcntl.ioctl(fd, _FICLONE, src.fileno())
+        except OSError:
+            os.close(fd)
+            if not claimed:
+                os.unlink(dest)
+            raise
+        os.close(fd)
+    shutil.copystat(source, dest)
+
+
+def _hardlink(source: str, dest: Path, claimed: bool = False) -> None:
+    if not claimed:
+        os.link(source, dest)
+        return
+    # Nom réservé: lien sur un nom temporaire puis remplacement atomique
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.lnk")
+    os.link(source, tmp)
+    try:
+        os.replace(tmp, dest)
+    except OSError:
+        os.unlink(tmp)
+        raise
+
+
+def archive_file(
+    source_path: str,
+    dest_path: Path,
+    *,
+    keep_source: bool,
+    strategies: Sequence[str] = ARCHIVE_STRATEGIES,
+    claimed: bool = False,
+    on_placed: Optional[Callable[[Path], None]] = None,
+) -> str:
+    """
+    Place `source_path` en `dest_path` avec la stratégie la moins coûteuse
+    disponible: lien dur, clone copy-on-write, renommage, puis copie.
+
+    Args:
+        keep_source: True pour une copie (la source reste en place), False pour un déplacement
+        strategies: Stratégies autorisées, dans l'ordre d'essai
+        claimed: `dest_path` est un fichier réservé par _unique_path, à remplacer
+        on_placed: Appelé dès que la destination est complète, avant la suppression de la source
+
+    Returns:
+        Nom de la stratégie utilisée
+
+    Raises:
+        OSError: si aucune stratégie n'a abouti (la réservation éventuelle est supprimée)
+    """
+    last_error: Optional[OSError] = None
+    for strategy in strategies:
+        try:
+            if strategy == "hardlink":
+                _hardlink(source_path, dest_path, claimed)
+            elif strategy == "reflink":
+                _reflink(source_path, dest_path, claimed)
+            elif strategy == "rename":
+                if keep_source:
+                    continue
+                os.replace(source_path, dest_path)
+            elif strategy == "copy":
+                shutil.copy2(source_path, dest_path)
+            else:
+                raise ValueError(f"Stratégie d'archivage inconnue: {strategy}")
+        except OSError as e:
+            # EXDEV (autre montage), EPERM/EOPNOTSUPP (FS sans liens/clones)...
+            ARCHIVE_OPERATIONS.inc(strategy=strategy, result="failed")
+            last_error = e
+            continue
+
+        if on_placed is not None:
+            on_placed(dest_path)
+        if not keep_source and strategy != "rename":
+            os.unlink(source_path)
+        ARCHIVE_OPERATIONS.inc(strategy=strategy, result="ok")
+        return strategy
+
+    if claimed:
+        try:
+            os.unlink(dest_path)
+        except OSError:
+            pass
+    raise last_error or OSError(errno.EINVAL, "aucune stratégie d'archivage applicable")
 
 
 # ------------------------------------------------------------------------
@@ -36,11 +283,14 @@ def save_original_image(
     source_path: str,
     output_dir: str,
     camera_name: str,
-    organize_by_camera: bool = False
+    organize_by_camera: bool = False,
+    *,
+    strategies: Sequence[str] = ARCHIVE_STRATEGIES,
+    shard_by: Optional[str] = None,
 ) -> bool:
     """
-    Copie l'image originale dans le dossier original/.
-    Ne modifie pas le fichier source.
+    Copie l'image originale dans le dossier original/ (lien dur ou clone si
+    possible, voir archive_file). Ne modifie pas le fichier source.
     """
     try:
         if organize_by_camera:
@@ -48,14 +298,17 @@ def save_original_image(
         else:
             original_dir = os.path.join(output_dir, "original")
 
-        os.makedirs(original_dir, exist_ok=True)
+        original_dir = shard_dir(original_dir, source_path, shard_by)
+        ensure_dir(original_dir)
 
         filename = os.path.basename(source_path)
-        dest_path = Path(original_dir) / filename
-        dest_path = _unique_path(dest_path)
 
-        shutil.copy2(source_path, dest_path)
-        logger.info("original_saved", source=source_path, dest=str(dest_path))
+        def place() -> Tuple[Path, str]:
+            dest_path = _unique_path(Path(original_dir) / filename)
+            return dest_path, archive_file(source_path, dest_path, keep_source=True, strategies=strategies, claimed=True)
+
+        dest_path, strategy = write_in_dir(original_dir, place)
+        logger.info("original_saved", source=source_path, dest=str(dest_path), strategy=strategy)
         return True
 
     except Exception as e:
@@ -73,11 +326,17 @@ def get_output_path(
     camera_name: str,
     has_valid_detections: bool,
     organize_by_result: bool = True,
-    organize_by_camera: bool = True
+    organize_by_camera: bool = True,
+    *,
+    shard_by: Optional[str] = None,
+    source_path: Optional[str] = None,
 ) -> str:
     """
     Construit le chemin de sortie pour les images de sortie (annotées),
     selon la structure configurée.
+
+    Avec shard_by (day|hour), la date est lue dans le nom de `source_path`
+    (ou `filename`), à défaut dans sa date de modification.
     """
     path_parts = [output_dir]
 
@@ -87,8 +346,8 @@ def get_output_path(
     if organize_by_camera:
         path_parts.append(camera_name)
 
-    full_dir = os.path.join(*path_parts)
-    os.makedirs(full_dir, exist_ok=True)
+    full_dir = shard_dir(os.path.join(*path_parts), source_path or filename, shard_by)
+    ensure_dir(full_dir)
 
     return os.path.join(full_dir, filename)
 
@@ -105,6 +364,11 @@ def handle_processed_image(
     save_original: bool = True,
     original_by_camera: bool = False,
     camera: Optional[str] = None,
+    strategies: Sequence[str] = ARCHIVE_STRATEGIES,
+    shard_by: Optional[str] = None,
+    on_archived: Optional[Callable[[Path], None]] = None,
+    state: Optional[Dict] = None,
+    raise_errors: bool = False,
 ) -> bool:
     """
     Gère le fichier source après traitement.
@@ -118,11 +382,27 @@ def handle_processed_image(
 
     Remarque: ce comportement respecte la config existante sans ajouter de nouvelles clés.
     Pour placer la source dans original/, mettre save_original=true.
+
+    Le déplacement essaie `strategies` dans l'ordre (voir archive_file): une
+    copie complète n'a lieu que si source et destination ne partagent ni
+    système de fichiers ni support du clonage. `on_archived` reçoit le
+    chemin final (index de rétention).
+
+    Pour les nouvelles tentatives (pool d'I/O): `state`, un dict repassé tel
+    quel à chaque appel, retient la destination déjà écrite, de sorte qu'une
+    reprise après échec partiel (source non supprimée) termine le
+    déplacement au lieu d'archiver une seconde copie. Avec `raise_errors`,
+    les OSError sont propagées (pour être classées transitoires ou non)
+    au lieu d'être converties en False.
     """
     if action not in ("move", "erase", "none"):
         logger.error("invalid_action", action=action, valid_actions=["move", "erase", "none"])
         return False
 
+    placed = state.get("dest") if state is not None else None
+    if action == "move" and placed is not None and os.path.exists(placed):
+        return _resume_move(source_path, placed, on_archived, state, raise_errors)
+
     if not os.path.exists(source_path):
         logger.error("source_file_not_found", path=source_path)
         return False
@@ -140,6 +420,8 @@ def handle_processed_image(
             return True
         except Exception as e:
             logger.error("image_erase_failed", path=source_path, error=str(e))
+            if raise_errors and isinstance(e, OSError):
+                raise
             return False
 
     # 'move' → déplacement
@@ -158,33 +440,72 @@ def handle_processed_image(
                 # Déplacer dans la racine de shared_out (comportement historique)
                 dest_dir = Path(output_dir)
 
-            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest_dir = shard_dir(dest_dir, source_path, shard_by)
+            ensure_dir(dest_dir)
 
             filename = os.path.basename(source_path)
-            dest_path = _unique_path(dest_dir / filename)
+            on_placed = None if state is None else lambda dest: state.__setitem__("dest", dest)
+
+            def place() -> Tuple[Path, str]:
+                dest_path = _unique_path(dest_dir / filename)
+                return dest_path, archive_file(
+                    source_path, dest_path, keep_source=False, strategies=strategies, claimed=True,
+                    on_placed=on_placed,
+                )
 
-            shutil.move(source_path, dest_path)
+            dest_path, strategy = write_in_dir(dest_dir, place)
+            if on_archived is not None:
+                on_archived(dest_path)
+                if state is not None:
+                    state["archived"] = True
             if save_original:
                 logger.info(
                     "input_moved_to_original",
                     source=source_path,
                     dest=str(dest_path),
+                    strategy=strategy,
                 )
             else:
                 logger.info(
                     "input_moved_to_output_root",
                     source=source_path,
                     dest=str(dest_path),
+                    strategy=strategy,
                 )
             return True
 
         except Exception as e:
             logger.error("image_move_failed", path=source_path, error=str(e))
+            if raise_errors and isinstance(e, OSError):
+                raise
             return False
 
     return False
 
 
+def _resume_move(
+    source_path: str,
+    dest_path: Path,
+    on_archived: Optional[Callable[[Path], None]],
+    state: Dict,
+    raise_errors: bool,
+) -> bool:
+    """Reprise d'un déplacement dont la destination est déjà écrite: reste à retirer la source."""
+    try:
+        if os.path.exists(source_path):
+            os.unlink(source_path)
+        if on_archived is not None and not state.get("archived"):
+            on_archived(dest_path)
+            state["archived"] = True
+        logger.info("input_move_resumed", source=source_path, dest=str(dest_path))
+        return True
+    except Exception as e:
+        logger.error("image_move_failed", path=source_path, error=str(e))
+        if raise_errors and isinstance(e, OSError):
+            raise
+        return False
+
+
 # ------------------------------------------------------------------------
 # Divers
 # ------------------------------------------------------------------------
@@ -2,10 +2,11 @@
 Gestionnaire de zones de détection avec polygones Shapely.
 """
 
+import logging
 from typing import List, Tuple, Dict
 from shapely.geometry import Point, Polygon
 from src.config_loader import ZoneConfig
-from src.logger import get_logger
+from src.logger import get_logger, is_enabled_for
 
 logger = get_logger(__name__)
 
@@ -28,15 +29,17 @@ class ZoneManager:
         self.polygons: Dict[str, Polygon] = {}
         
         # Créer les polygones Shapely à partir des coordonnées normalisées
+        debug = is_enabled_for(logging.DEBUG)
         for zone in zones:
             polygon_coords = self._normalize_to_pixels(zone.polygon)
             self.polygons[zone.name] = Polygon(polygon_coords)
-            logger.debug(
-                "zone_created",
-                zone_name=zone.name,
-                points=len(polygon_coords),
-                bounds=self.polygons[zone.name].bounds
-            )
+            if debug:
+                logger.debug(
+                    "zone_created",
+                    zone_name=zone.name,
+                    points=len(polygon_coords),
+                    bounds=self.polygons[zone.name].bounds
+                )
     
     def _normalize_to_pixels(self, coords: List[float]) -> List[Tuple[float, float]]:
         """
@@ -0,0 +1,258 @@
+"""
+Broker MQTT factice en mémoire pour les tests d'intégration et de charge.
+
+`FakeBroker.patch()` remplace `paho.mqtt.client.Client` par `FakeMQTTClient`,
+qui implémente la surface du client paho utilisée par MQTTPublisher:
+connexion asynchrone avec délai de reconnexion, boucle réseau en thread,
+`publish()` retournant (rc, mid) puis `on_publish` à l'acquittement.
+
+Le broker enregistre chaque message avec son horodatage et permet
+d'injecter une latence d'acquittement, des coupures et une indisponibilité.
+"""
+
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Dict, List, NamedTuple, Optional
+from unittest.mock import patch
+
+MQTT_ERR_SUCCESS = 0
+MQTT_ERR_NO_CONN = 4
+MQTT_ERR_QUEUE_SIZE = 15
+
+
+class PublishRecord(NamedTuple):
+    topic: str
+    payload: bytes
+    qos: int
+    retain: bool
+    timestamp: float
+
+
+class FakeBroker:
+    """Broker en mémoire partagé par les clients factices."""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Délai (s) entre publish() et l'acquittement (on_publish)
+        """
+        self.latency = latency
+        self.available = True
+        self.messages: List[PublishRecord] = []
+        self.retained: Dict[str, bytes] = {}
+        self.clients: List["FakeMQTTClient"] = []
+        self._lock = threading.Lock()
+        self._received = threading.Condition(self._lock)
+
+    # --- intégration ----------------------------------------------------
+
+    def patch(self):
+        """Context manager: les clients paho créés pendant le bloc utilisent ce broker."""
+        return patch("paho.mqtt.client.Client", self._create_client)
+
+    def _create_client(self, *args, **kwargs) -> "FakeMQTTClient":
+        client = FakeMQTTClient(self)
+        with self._lock:
+            self.clients.append(client)
+        return client
+
+    # --- réception ------------------------------------------------------
+
+    def _receive(self, topic: str, payload, qos: int, retain: bool) -> None:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        record = PublishRecord(topic, bytes(payload), qos, retain, time.monotonic())
+        with self._received:
+            self.messages.append(record)
+            if retain:
+                if payload:
+                    self.retained[topic] = record.payload
+                else:
+                    self.retained.pop(topic, None)
+            self._received.notify_all()
+
+    def topics(self) -> List[str]:
+        with self._lock:
+            return [m.topic for m in self.messages]
+
+    def wait_for(self, count: int, timeout: float = 5.0) -> bool:
+        """Attend qu'au moins `count` messages aient été reçus."""
+        deadline = time.monotonic() + timeout
+        with self._received:
+            while len(self.messages) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._received.wait(remaining)
+            return True
+
+    # --- injection de pannes ----------------------------------------------
+
+    def drop_connections(self, rc: int = 7) -> None:
+        """Coupe brutalement les clients connectés (ils tenteront de se reconnecter)."""
+        for client in list(self.clients):
+            client._drop(rc)
+
+    def stop(self) -> None:
+        """Broker indisponible: coupe les clients et refuse les connexions."""
+        self.available = False
+        self.drop_connections()
+
+    def start(self) -> None:
+        self.available = True
+
+    def inject(self, topic: str, payload: bytes) -> None:
+        """Publie un message vers les clients abonnés (ex. birth message HA)."""
+        for client in list(self.clients):
+            client._deliver(topic, payload)
+
+
+class FakeMQTTClient:
+    """Sous-ensemble du client paho adossé à un FakeBroker."""
+
+    def __init__(self, broker: FakeBroker):
+        self.broker = broker
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_publish = None
+        self.on_message = None
+        self.on_connect_fail = None
+        self.connected = False
+        self.subscriptions: set = set()
+        self._reconnect_delay = 1.0
+        self._max_inflight = 20
+        self._max_queued = 0
+        self._mid = 0
+        self._outgoing: deque = deque()
+        self._unacked = 0
+        self._lock = threading.Lock()
+        self._pending = threading.Condition(self._lock)
+        self._wanted = False
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- configuration ----------------------------------------------------
+
+    def username_pw_set(self, username, password=None):
+        self.username = username
+
+    def max_inflight_messages_set(self, inflight: int):
+        self._max_inflight = inflight
+
+    def max_queued_messages_set(self, queue_size: int):
+        self._max_queued = queue_size
+
+    def reconnect_delay_set(self, min_delay=1, max_delay=120):
+        self._reconnect_delay = min_delay
+
+    # --- connexion --------------------------------------------------------
+
+    def connect(self, host, port=1883, keepalive=60):
+        if not self.broker.available:
+            raise ConnectionRefusedError(host)
+        self._wanted = True
+        self._establish()
+        return MQTT_ERR_SUCCESS
+
+    def connect_async(self, host, port=1883, keepalive=60):
+        self._wanted = True
+
+    def loop_start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="fake-mqtt-loop", daemon=True)
+        self._thread.start()
+
+    def loop_stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def disconnect(self):
+        self._wanted = False
+        was_connected, self.connected = self.connected, False
+        if was_connected and self.on_disconnect:
+            self.on_disconnect(self, None, 0)
+        return MQTT_ERR_SUCCESS
+
+    def subscribe(self, topic, qos=0):
+        self.subscriptions.add(topic)
+        return (MQTT_ERR_SUCCESS, self._next_mid())
+
+    def _establish(self) -> None:
+        self.connected = True
+        if self.on_connect:
+            self.on_connect(self, None, {}, 0)
+
+    def _drop(self, rc: int) -> None:
+        if not self.connected:
+            return
+        self.connected = False
+        self._retry_at = time.monotonic() + self._reconnect_delay
+        if self.on_disconnect:
+            self.on_disconnect(self, None, rc)
+        self._wake.set()
+
+    def _deliver(self, topic: str, payload: bytes) -> None:
+        if self.connected and topic in self.subscriptions and self.on_message:
+            self.on_message(self, None, SimpleNamespace(topic=topic, payload=payload))
+
+    # --- publication ------------------------------------------------------
+
+    def _next_mid(self) -> int:
+        with self._lock:
+            self._mid += 1
+            return self._mid
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        if not self.connected:
+            return SimpleNamespace(rc=MQTT_ERR_NO_CONN, mid=self._next_mid())
+        with self._pending:
+            if self._max_queued and self._unacked >= self._max_inflight + self._max_queued:
+                return SimpleNamespace(rc=MQTT_ERR_QUEUE_SIZE, mid=0)
+            self._unacked += 1
+            self._mid += 1
+            mid = self._mid
+            due = time.monotonic() + self.broker.latency
+            self._outgoing.append((due, mid, topic, payload if payload is not None else b"", qos, retain))
+            self._pending.notify()
+        return SimpleNamespace(rc=MQTT_ERR_SUCCESS, mid=mid)
+
+    # --- boucle réseau ----------------------------------------------------
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            if not self.connected:
+                wait = self._retry_at - time.monotonic()
+                if not self._wanted or wait > 0:
+                    self._wake.wait(min(max(wait, 0.0), 0.05) or 0.05)
+                    self._wake.clear()
+                    continue
+                if self.broker.available:
+                    self._establish()
+                else:
+                    self._retry_at = time.monotonic() + self._reconnect_delay
+                    if self.on_connect_fail:
+                        self.on_connect_fail(self, None)
+                    continue
+            with self._pending:
+                if not self._outgoing:
+                    self._pending.wait(0.05)
+                    continue
+                due, mid, topic, payload, qos, retain = self._outgoing[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if not self.connected:
+                # Coupure avant l'acquittement: le message reste en tête et sera renvoyé (QoS 1)
+                continue
+            with self._pending:
+                self._outgoing.popleft()
+                self._unacked -= 1
+            self.broker._receive(topic, payload, qos, retain)
+            if self.on_publish:
+                self.on_publish(self, None, mid)
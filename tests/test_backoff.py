@@ -0,0 +1,37 @@
+"""
+Tests pour le backoff exponentiel.
+"""
+
+import pytest
+
+from src.backoff import ExponentialBackoff
+
+
+def test_delays_double_until_cap():
+    """Sans gigue (rand=1), le délai double jusqu'au plafond."""
+    backoff = ExponentialBackoff(base=1, cap=10, rand=lambda: 1.0)
+
+    assert [backoff.next() for _ in range(6)] == [1, 2, 4, 8, 10, 10]
+
+
+def test_jitter_stays_in_upper_half():
+    """La gigue tire le délai dans [d/2, d]."""
+    backoff = ExponentialBackoff(base=4, cap=100, rand=lambda: 0.0)
+
+    assert backoff.next() == 2
+    assert backoff.next() == 4
+
+
+def test_reset_restarts_sequence():
+    backoff = ExponentialBackoff(base=1, cap=60, rand=lambda: 1.0)
+    for _ in range(5):
+        backoff.next()
+    backoff.reset()
+
+    assert backoff.attempts == 0
+    assert backoff.next() == 1
+
+
+def test_invalid_bounds_rejected():
+    with pytest.raises(ValueError):
+        ExponentialBackoff(base=10, cap=1)
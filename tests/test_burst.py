@@ -0,0 +1,130 @@
+"""
+Tests pour le regroupement des rafales d'images.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from src.burst import BurstCoalescer, select_best_frame
+
+
+def _det(cls, conf, is_false=False):
+    return {"class": cls, "confidence": conf, "bbox": (0, 0, 1, 1), "is_false": is_false, "zones": []}
+
+
+def test_select_best_frame_most_valid_detections():
+    """L'image avec le plus de détections valides est retenue."""
+    results = [
+        ([_det("person", 0.9)], {}),
+        ([_det("person", 0.6), _det("car", 0.6)], {}),
+        ([_det("person", 0.3, is_false=True)] * 3, {}),
+    ]
+    assert select_best_frame(results) == 1
+
+
+def test_select_best_frame_tie_on_confidence():
+    """À nombre égal, la somme des confiances départage."""
+    results = [
+        ([_det("person", 0.6)], {}),
+        ([_det("person", 0.95)], {}),
+    ]
+    assert select_best_frame(results) == 1
+
+
+def test_select_best_frame_no_detection():
+    """Sans détection, la première image est retenue."""
+    assert select_best_frame([([], {}), ([], {})]) == 0
+
+
+class _Collector:
+    def __init__(self):
+        self.calls = []
+        self.event = threading.Event()
+
+    def __call__(self, camera, images):
+        self.calls.append((camera, list(images)))
+        self.event.set()
+
+
+def test_no_window_emits_immediately():
+    """Fenêtre à 0: chaque image est émise seule, sans délai."""
+    sink = _Collector()
+    coalescer = BurstCoalescer(lambda cam: 0, sink)
+
+    coalescer.add("ptz", Path("ptz_1.jpg"))
+    coalescer.add("ptz", Path("ptz_2.jpg"))
+
+    assert sink.calls == [("ptz", [Path("ptz_1.jpg")]), ("ptz", [Path("ptz_2.jpg")])]
+
+
+def test_window_groups_images_per_camera():
+    """Les images d'une caméra reçues dans la fenêtre forment une seule rafale."""
+    sink = _Collector()
+    coalescer = BurstCoalescer(lambda cam: 50, sink)
+
+    coalescer.add("reolink", Path("reolink_1.jpg"))
+    coalescer.add("reolink", Path("reolink_2.jpg"))
+    coalescer.add("reolink", Path("reolink_3.jpg"))
+
+    assert sink.event.wait(2.0)
+    time.sleep(0.05)
+    assert sink.calls == [
+        ("reolink", [Path("reolink_1.jpg"), Path("reolink_2.jpg"), Path("reolink_3.jpg")])
+    ]
+
+
+def test_max_size_emits_early():
+    """Une rafale pleine est émise sans attendre la fin de la fenêtre."""
+    sink = _Collector()
+    coalescer = BurstCoalescer(lambda cam: 10_000, sink, max_size=2)
+
+    coalescer.add("ptz", Path("a.jpg"))
+    coalescer.add("ptz", Path("b.jpg"))
+
+    assert sink.calls == [("ptz", [Path("a.jpg"), Path("b.jpg")])]
+
+
+def test_flush_all_emits_pending():
+    """flush_all() vide toutes les rafales en attente."""
+    sink = _Collector()
+    coalescer = BurstCoalescer(lambda cam: 10_000, sink)
+
+    coalescer.add("ptz", Path("a.jpg"))
+    coalescer.add("reolink", Path("b.jpg"))
+    coalescer.flush_all()
+
+    assert sorted(sink.calls) == [("ptz", [Path("a.jpg")]), ("reolink", [Path("b.jpg")])]
+
+
+def test_backlog_grouped_by_capture_time(tmp_path):
+    """Images existantes: rafales selon la date de prise de vue, pas l'ordre de lecture."""
+    sink = _Collector()
+    coalescer = BurstCoalescer(lambda cam: 2000, sink, max_size=2)
+    names = [
+        "ptz_2025-11-10_08-00-01.jpg",
+        "ptz_2025-11-10_08-00-00.jpg",
+        "ptz_2025-11-10_09-30-00.jpg",
+        "ptz_2025-11-10_08-00-02.jpg",
+    ]
+
+    coalescer.add_backlog("ptz", [Path(name) for name in names])
+
+    assert sink.calls == [
+        ("ptz", [Path("ptz_2025-11-10_08-00-00.jpg"), Path("ptz_2025-11-10_08-00-01.jpg")]),
+        ("ptz", [Path("ptz_2025-11-10_08-00-02.jpg")]),
+        ("ptz", [Path("ptz_2025-11-10_09-30-00.jpg")]),
+    ]
+
+
+def test_close_stops_emitting():
+    """Après close(), ni les timers ni add() n'appellent plus flush (scheduler fermé)."""
+    calls = []
+    coalescer = BurstCoalescer(lambda cam: 20, lambda camera, images: calls.append(images))
+
+    coalescer.add("ptz", Path("a.jpg"))
+    coalescer.close()
+    coalescer.add("ptz", Path("b.jpg"))
+    time.sleep(0.1)
+
+    assert calls == [[Path("a.jpg")]]
@@ -0,0 +1,75 @@
+"""
+Tests pour les plans compilés par caméra.
+"""
+
+import pytest
+
+from src.camera_plan import as_plan
+from src.config_loader import CameraConfig, Config, ZoneConfig
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(
+        app={"name": "test_app", "version": "1.0.0"},
+        directories={"input": "in", "output": str(tmp_path)},
+        logging={"level": "info", "format": "json"},
+        mqtt={"broker": "localhost"},
+        homeassistant={"autodiscovery": False},
+        detection={"model": "yolo11n.pt"},
+        processing={"output_structure": {"shard_by": "day"}},
+        cameras=[
+            CameraConfig(
+                name="reolink",
+                detect=["person", "car"],
+                zones=[
+                    ZoneConfig(name="porte", polygon=[0, 0, 1, 0, 0.5, 1], text_msg=True),
+                    ZoneConfig(name="rue", polygon=[0, 0, 1, 0, 1, 1]),
+                ],
+            ),
+            CameraConfig(name="generique", detect=["person"]),
+        ],
+    )
+
+
+def test_plan_indexed_with_generique_fallback(config):
+    """Un nom inconnu retombe sur 'generique'; get_camera_config partage l'index."""
+    assert config.get_plan("reolink").name == "reolink"
+    assert config.get_plan("inconnue").name == "generique"
+    assert config.get_camera_config("reolink") is config.get_plan("reolink").config
+
+
+def test_plan_compiles_filters_and_rules(config):
+    plan = config.get_plan("reolink")
+
+    assert plan.detect == frozenset({"person", "car"})
+    assert plan.notify_zones == frozenset({"porte"})
+    assert [z.name for z in plan.zones] == ["porte", "rue"]
+    assert plan.fingerprint is not None
+
+
+def test_zone_manager_cached_per_resolution(config):
+    plan = config.get_plan("reolink")
+
+    first = plan.zone_manager(640, 480)
+
+    assert plan.zone_manager(640, 480) is first
+    assert plan.zone_manager(1920, 1080) is not first
+    assert config.get_plan("generique").zone_manager(640, 480) is None
+
+
+def test_output_path_uses_precomputed_dirs(config, tmp_path):
+    plan = config.get_plan("reolink")
+
+    path = plan.output_path("reolink_2025-11-10_10-30-15.jpg", True)
+
+    assert path == tmp_path / "true" / "reolink" / "2025-11-10" / "reolink_2025-11-10_10-30-15.jpg"
+    assert path.parent.is_dir()
+
+
+def test_as_plan_accepts_raw_camera_config():
+    """Une CameraConfig seule (tests, scripts) est compilée à la volée, sans sortie."""
+    plan = as_plan(CameraConfig(name="ptz", detect=["car"]))
+
+    assert plan.detect == frozenset({"car"})
+    assert plan.fingerprint is None
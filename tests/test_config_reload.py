@@ -0,0 +1,140 @@
+"""
+Tests pour le rechargement à chaud de la configuration.
+"""
+
+import os
+
+import pytest
+import yaml
+
+from src.config_reload import ConfigWatcher, diff_configs
+from src.config_loader import load_config
+
+BASE = {
+    "app": {"name": "test_app", "version": "1.0.0"},
+    "directories": {"input": "in", "output": "out"},
+    "logging": {"level": "info", "format": "json"},
+    "mqtt": {"broker": "localhost", "topics": {"sensor": "a/{camera}/{metric}"}},
+    "homeassistant": {"autodiscovery": False},
+    "detection": {"model": "yolo11n.pt"},
+    "cameras": [
+        {"name": "reolink", "detect": ["person"], "zones": [{"name": "porte", "polygon": [0, 0, 1, 0, 0.5, 1]}]},
+        {"name": "ptz", "detect": ["car"]},
+    ],
+}
+
+
+def _write(path, data):
+    path.write_text(yaml.safe_dump(data), encoding="utf-8")
+    # mtime distinct même sur un système de fichiers à faible résolution
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _variant(**changes):
+    data = yaml.safe_load(yaml.safe_dump(BASE))
+    for dotted, value in changes.items():
+        target = data
+        *parents, leaf = dotted.split("__")
+        for key in parents:
+            target = target[key]
+        target[leaf] = value
+    return data
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write(path, BASE)
+    return path
+
+
+def test_diff_detects_modified_camera_only(config_file):
+    old = load_config(str(config_file))
+    data = _variant()
+    data["cameras"][0]["zones"][0]["polygon"] = [0, 0, 0.5, 0, 0.5, 0.5]
+    _write(config_file, data)
+
+    changes = diff_configs(old, load_config(str(config_file)))
+
+    assert changes.cameras == {"reolink"}
+    assert not changes.keys
+    assert not changes.model
+
+
+def test_diff_flags_model_and_restart_keys(config_file):
+    old = load_config(str(config_file))
+    _write(config_file, _variant(detection__model="yolo11s.pt", mqtt__broker="10.0.0.9"))
+
+    changes = diff_configs(old, load_config(str(config_file)))
+
+    assert changes.model
+    assert changes.restart_required == ["mqtt.broker"]
+
+
+def test_diff_flags_discovery_on_topic_change(config_file):
+    """Un changement de topics impose de republier la discovery de toutes les caméras."""
+    old = load_config(str(config_file))
+    _write(config_file, _variant(mqtt__topics={"sensor": "b/{camera}/{metric}"}))
+
+    changes = diff_configs(old, load_config(str(config_file)))
+
+    assert changes.discovery
+    assert not changes.cameras
+    assert not diff_configs(old, old).discovery
+
+
+def test_watcher_applies_valid_change(config_file):
+    applied = []
+    watcher = ConfigWatcher(config_file, load_config(str(config_file)), lambda *args: applied.append(args))
+    assert watcher.check() is None  # fichier inchangé
+
+    _write(config_file, _variant(mqtt__topics={"sensor": "b/{camera}/{metric}"}))
+    changes = watcher.check()
+
+    assert changes.keys == {"mqtt.topics"}
+    old, new, _ = applied[0]
+    assert new.mqtt.topics["sensor"] == "b/{camera}/{metric}"
+    assert watcher.current is new
+
+
+def test_watcher_keeps_config_when_invalid(config_file):
+    applied = []
+    current = load_config(str(config_file))
+    watcher = ConfigWatcher(config_file, current, lambda *args: applied.append(args))
+
+    _write(config_file, _variant(processing={"input_action": "explode"}))
+
+    assert watcher.check() is None
+    assert applied == []
+    assert watcher.current is current
+
+
+def test_watcher_keeps_config_when_apply_fails(config_file):
+    """Ex. nouveau modèle introuvable: l'ancienne config reste active."""
+    current = load_config(str(config_file))
+
+    def fail(old, new, changes):
+        raise FileNotFoundError(new.detection.model)
+
+    watcher = ConfigWatcher(config_file, current, fail)
+    _write(config_file, _variant(detection__model="absent.pt"))
+
+    assert watcher.check() is None
+    assert watcher.current is current
+
+
+def test_restart_keys_pinned_to_running_value(config_file):
+    """Les clés lues au démarrage gardent leur valeur jusqu'au redémarrage."""
+    applied = []
+    watcher = ConfigWatcher(config_file, load_config(str(config_file)), lambda *args: applied.append(args))
+
+    data = _variant(directories={"input": "in", "output": "ailleurs"})
+    data["cameras"][1]["detect"] = ["car", "truck"]
+    _write(config_file, data)
+    changes = watcher.check()
+
+    assert changes.cameras == {"ptz"}
+    assert not changes.keys
+    assert str(watcher.current.directories.output) == "out"
+    assert watcher.current.get_camera_config("ptz").detect == ["car", "truck"]
@@ -0,0 +1,128 @@
+"""
+Tests pour le pool d'opérations fichiers.
+"""
+
+import errno
+import os
+import threading
+import time
+
+import pytest
+
+from src.file_ops import FILE_OPS, FileOpsPool
+from src.utils import handle_processed_image
+
+
+@pytest.fixture
+def pool():
+    pool = FileOpsPool(workers=4, max_attempts=3, retry_base=0.01, retry_cap=0.01, sleep=lambda s: None)
+    yield pool
+    pool.stop(timeout=5)
+
+
+def test_same_key_runs_in_submission_order(pool):
+    """Les opérations d'un même fichier s'exécutent dans l'ordre, jamais en parallèle."""
+    order = []
+    running = threading.Lock()
+
+    def op(i):
+        assert running.acquire(blocking=False)
+        time.sleep(0.002)
+        order.append(i)
+        running.release()
+
+    for i in range(20):
+        pool.submit("a.jpg", "test_order", op, i)
+
+    assert pool.drain(timeout=5)
+    assert order == list(range(20))
+    assert pool.pending == 0
+
+
+def test_distinct_keys_run_concurrently(pool):
+    """Deux fichiers différents ne s'attendent pas."""
+    barrier = threading.Barrier(2, timeout=2)
+
+    for key in ("a.jpg", "b.jpg"):
+        pool.submit(key, "test_concurrent", barrier.wait)
+
+    assert pool.drain(timeout=5)
+    assert FILE_OPS.value(op="test_concurrent", result="ok") == 2
+
+
+def test_retry_then_success(pool):
+    """Une OSError transitoire est retentée jusqu'au succès."""
+    outcomes = iter([OSError(errno.EIO, "partage indisponible"), TimeoutError("délai réseau"), True])
+
+    def flaky():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    pool.submit("a.jpg", "test_retry", flaky)
+
+    assert pool.drain(timeout=5)
+    assert FILE_OPS.value(op="test_retry", result="retried") == 2
+    assert FILE_OPS.value(op="test_retry", result="ok") == 1
+
+
+def test_exhausted_retries_counted_as_failed(pool):
+    """Après max_attempts, l'échec est compté et les opérations suivantes continuent."""
+    done = []
+
+    def unavailable():
+        raise OSError(errno.EIO, "partage indisponible")
+
+    pool.submit("a.jpg", "test_failed", unavailable)
+    pool.submit("a.jpg", "test_after_failure", done.append, 1)
+
+    assert pool.drain(timeout=5)
+    assert FILE_OPS.value(op="test_failed", result="failed") == 1
+    assert FILE_OPS.value(op="test_failed", result="retried") == 2
+    assert done == [1]
+
+
+@pytest.mark.parametrize("outcome", [False, FileNotFoundError("absent"), ValueError("action invalide")])
+def test_permanent_failure_not_retried(pool, outcome):
+    """Retour False ou erreur définitive: pas de nouvelle tentative."""
+    calls = []
+
+    def op():
+        calls.append(1)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    pool.submit("a.jpg", "test_permanent", op)
+
+    assert pool.drain(timeout=5)
+    assert calls == [1]
+    assert FILE_OPS.value(op="test_permanent", result="retried") == 0
+
+
+def test_retried_move_does_not_archive_twice(pool, tmp_path, monkeypatch):
+    """Destination écrite puis échec de suppression de la source: la reprise termine sans copie."""
+    source = tmp_path / "in" / "cam_2025-11-10_10-30-15.jpg"
+    source.parent.mkdir()
+    source.write_bytes(b"jpeg")
+    real_unlink = os.unlink
+    failures = iter([OSError(errno.EBUSY, "fichier verrouillé")])
+
+    def flaky_unlink(path, *args, **kwargs):
+        if str(path) == str(source):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+        return real_unlink(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "unlink", flaky_unlink)
+    pool.submit(
+        str(source), "test_move_resume", handle_processed_image, str(source), "move", str(tmp_path / "out"),
+        state={}, raise_errors=True,
+    )
+
+    assert pool.drain(timeout=5)
+    assert FILE_OPS.value(op="test_move_resume", result="retried") == 1
+    assert not source.exists()
+    assert [p.name for p in (tmp_path / "out" / "original").iterdir()] == [source.name]
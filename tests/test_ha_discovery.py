@@ -0,0 +1,72 @@
+"""
+Tests pour la génération des payloads d'autodiscovery Home Assistant.
+"""
+
+from src.config_loader import CameraConfig, ZoneConfig
+from src.ha_discovery import build_discovery_configs, payload_hash
+
+
+def _camera(**kwargs):
+    return CameraConfig(
+        name="reolink",
+        detect=["person", "car"],
+        zones=[
+            ZoneConfig(name="route", polygon=[0, 0, 1, 0, 1, 1]),
+            ZoneConfig(name="cour", polygon=[0, 0, 1, 0, 1, 1], entity_ha=False),
+        ],
+        **kwargs,
+    )
+
+
+def test_camera_and_zone_entities():
+    """Une entité par capteur caméra et par zone exposée."""
+    configs = build_discovery_configs(_camera())
+
+    topics = sorted(configs)
+    assert topics == [
+        "homeassistant/sensor/detect_yolo_cpu_v2/reolink_detections/config",
+        "homeassistant/sensor/detect_yolo_cpu_v2/reolink_false_detections/config",
+        "homeassistant/sensor/detect_yolo_cpu_v2/reolink_zone_zone_route_total/config",
+    ]
+    det = configs[topics[0]]
+    assert det["state_topic"] == "detect_yolo_cpu_v2/sensor/reolink/detections"
+    assert det["value_template"] == "{{ value_json.value }}"
+    assert det["unique_id"] == "detect_yolo_cpu_v2_reolink_detections"
+    assert det["device"]["identifiers"] == ["detect_yolo_cpu_v2_reolink"]
+
+
+def test_state_mode_uses_value_json_metric():
+    """En mode state, toutes les entités lisent le topic state de la caméra."""
+    configs = build_discovery_configs(_camera(), sensor_mode="state")
+
+    zone = configs["homeassistant/sensor/detect_yolo_cpu_v2/reolink_zone_zone_route_total/config"]
+    assert zone["state_topic"] == "detect_yolo_cpu_v2/state/reolink"
+    assert "value_json.zone_zone_route_total" in zone["value_template"]
+    assert "value_json.zone_zone_route_by_class" in zone["json_attributes_template"]
+
+
+def test_tracking_adds_entities():
+    """Le tracking expose les capteurs d'objets suivis et nouveaux."""
+    configs = build_discovery_configs(_camera(tracking=True))
+
+    assert any(t.endswith("reolink_new_objects/config") for t in configs)
+    assert any(t.endswith("reolink_tracked_objects/config") for t in configs)
+
+
+def test_entity_ha_disabled():
+    """Caméra sans entity_ha: aucune entité."""
+    assert build_discovery_configs(_camera(entity_ha=False)) == {}
+
+
+def test_payload_hash_is_stable():
+    """L'empreinte ne dépend pas de l'ordre des clés."""
+    assert payload_hash({"a": 1, "b": 2}) == payload_hash({"b": 2, "a": 1})
+    assert payload_hash({"a": 1}) != payload_hash({"a": 2})
+
+
+def test_image_publication_adds_camera_entity():
+    """La publication binaire de l'image expose une entité camera."""
+    configs = build_discovery_configs(_camera(mqtt_image={"enabled": True}))
+
+    camera = configs["homeassistant/camera/detect_yolo_cpu_v2/reolink_image/config"]
+    assert camera["topic"] == "detect_yolo_cpu_v2/image/reolink/jpeg"
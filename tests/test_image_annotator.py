@@ -227,4 +227,27 @@ def test_annotate_without_zones(test_image_path, tmp_path):
         detections
     )
     
-    assert success is True
\ No newline at end of file
+    assert success is True
+
+def test_write_composite_returns_buffers(test_image_path, tmp_path):
+    """Les buffers encodés correspondent au fichier écrit, miniature incluse."""
+    annotator = ImageAnnotator(CameraConfig(name="cam", detect=["person"]))
+    output_path = tmp_path / "composite.jpg"
+
+    buffers = annotator.write_composite(test_image_path, str(output_path), [], thumbnail_width=200)
+
+    assert buffers["jpeg"].tobytes() == output_path.read_bytes()
+    thumb = cv2.imdecode(buffers["thumbnail"], cv2.IMREAD_COLOR)
+    assert thumb.shape[:2] == (200, 200)
+
+
+def test_write_composite_reports_stages(test_image_path, tmp_path):
+    """Sous un StageTimer, décodage, dessin, encodage et écriture sont mesurés."""
+    from src.timing import RollingPercentiles, StageTimer
+
+    annotator = ImageAnnotator(CameraConfig(name="cam", detect=["person"]))
+
+    with StageTimer(stats=RollingPercentiles()) as timer:
+        annotator.write_composite(test_image_path, str(tmp_path / "composite.jpg"), [])
+
+    assert {"decode", "annotate", "encode", "write"} <= set(timer.spans)
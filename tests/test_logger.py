@@ -0,0 +1,63 @@
+"""
+Tests pour l'écriture asynchrone et l'échantillonnage des logs.
+"""
+
+import io
+import logging
+
+import pytest
+import structlog
+
+from src.logger import LOG_RECORDS_DROPPED, AsyncLogWriter, DebugSampler
+
+
+@pytest.fixture
+def std_logger():
+    log = logging.getLogger("test_async_writer")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    yield log
+    log.handlers.clear()
+
+
+def test_writer_flushes_queue_on_stop(std_logger):
+    """Les lignes empilées sont toutes écrites par le thread dédié avant l'arrêt."""
+    stream = io.StringIO()
+    writer = AsyncLogWriter(stream, queue_size=100)
+    std_logger.addHandler(writer.handler)
+    writer.start()
+
+    for i in range(20):
+        std_logger.info("ligne %d", i)
+    writer.stop()
+
+    assert stream.getvalue().splitlines() == [f"ligne {i}" for i in range(20)]
+
+
+def test_full_queue_drops_instead_of_blocking(std_logger):
+    writer = AsyncLogWriter(io.StringIO(), queue_size=1)
+    std_logger.addHandler(writer.handler)
+    before = LOG_RECORDS_DROPPED.value(reason="queue_full")
+
+    for _ in range(3):
+        std_logger.info("ligne")  # thread non démarré: la file reste pleine
+
+    assert writer.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED.value(reason="queue_full") - before == 2
+
+
+def test_sampler_keeps_one_hot_debug_event_in_n():
+    """Seuls les événements debug listés sont échantillonnés; le premier est gardé."""
+    sampler = DebugSampler(3, events={"image_loaded"})
+    kept = 0
+    for _ in range(6):
+        try:
+            event = sampler(None, "debug", {"event": "image_loaded"})
+        except structlog.DropEvent:
+            continue
+        kept += 1
+        assert event["sampled"] == 3
+
+    assert kept == 2
+    assert sampler(None, "info", {"event": "image_loaded"}) == {"event": "image_loaded"}
+    assert sampler(None, "debug", {"event": "autre"}) == {"event": "autre"}
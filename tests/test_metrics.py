@@ -0,0 +1,52 @@
+"""
+Tests pour le registre de métriques.
+"""
+
+import pytest
+
+from src.metrics import MetricsRegistry
+
+
+def test_counter_with_labels():
+    """Les compteurs sont indépendants par jeu d'étiquettes."""
+    reg = MetricsRegistry()
+    c = reg.counter("images_total")
+    c.inc(camera="a")
+    c.inc(2, camera="a")
+    c.inc(camera="b")
+
+    assert c.value(camera="a") == 3
+    assert c.value(camera="b") == 1
+    assert c.value(camera="c") == 0
+
+
+def test_gauge_set_and_dec():
+    """Une jauge peut être fixée puis décrémentée."""
+    reg = MetricsRegistry()
+    g = reg.gauge("depth")
+    g.set(5)
+    g.dec()
+
+    assert g.value() == 4
+
+
+def test_histogram_buckets_are_cumulative():
+    """Chaque observation incrémente tous les buckets dont la borne est >= valeur."""
+    reg = MetricsRegistry()
+    h = reg.histogram("latency", buckets=(0.1, 1.0))
+    h.observe(0.05)
+    h.observe(0.5)
+    h.observe(3.0)
+
+    snap = h.snapshot()
+    assert snap["count"] == 3
+    assert snap["sum"] == pytest.approx(3.55)
+    assert snap["buckets"] == {0.1: 1, 1.0: 2}
+
+
+def test_registry_get_or_create_is_idempotent():
+    """Un même nom retourne la même métrique; un type différent est refusé."""
+    reg = MetricsRegistry()
+    assert reg.counter("x") is reg.counter("x")
+    with pytest.raises(ValueError):
+        reg.gauge("x")
@@ -0,0 +1,88 @@
+"""
+Tests pour l'exposition Prometheus des métriques.
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.metrics import MetricsRegistry
+from src.metrics_server import MetricsServer, render, rss_bytes
+
+
+def test_render_text_format():
+    """Compteurs, jauges et histogrammes au format texte 0.0.4."""
+    reg = MetricsRegistry()
+    reg.counter("images_total", "Images traitées").inc(3, camera="reo\"link")
+    reg.gauge("depth", "Profondeur").set(2)
+    h = reg.histogram("latency_seconds", "Latence", buckets=(0.1, 1.0))
+    h.observe(0.05, stage="decode")
+    h.observe(0.5, stage="decode")
+
+    text = render(reg)
+
+    assert "# TYPE images_total counter" in text
+    assert 'images_total{camera="reo\\"link"} 3' in text
+    assert "depth 2" in text
+    assert 'latency_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+    assert 'latency_seconds_sum{stage="decode"} 0.55' in text
+    assert 'latency_seconds_count{stage="decode"} 2' in text
+
+
+@pytest.fixture
+def server():
+    reg = MetricsRegistry()
+    reg.counter("images_total").inc(camera="cam")
+    calls = []
+    server = MetricsServer(
+        "127.0.0.1", 0, registry=reg,
+        collectors=[lambda: calls.append(1)],
+        health=lambda: {"mqtt": {"connected": False}},
+    )
+    server.start()
+    yield server, calls
+    server.stop()
+
+
+def test_http_metrics_and_health(server):
+    server, calls = server
+    base = f"http://127.0.0.1:{server.port}"
+
+    with urllib.request.urlopen(f"{base}/metrics", timeout=5) as resp:
+        assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'images_total{camera="cam"} 1' in resp.read().decode()
+    assert calls == [1]  # collecteurs appelés à chaque scrape
+
+    with urllib.request.urlopen(f"{base}/health", timeout=5) as resp:
+        assert json.loads(resp.read()) == {"mqtt": {"connected": False}}
+
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(f"{base}/autre", timeout=5)
+    assert err.value.code == 404
+
+
+def test_rss_bytes_positive():
+    rss = rss_bytes()
+    assert rss is None or rss > 0
+
+
+def test_post_action_with_query_parameters():
+    """Actions POST: paramètres en query string, 409 si ok=False, 400 si invalides."""
+    def action(query):
+        return {"ok": int(query["images"]) < 10, "images": query["images"]}
+
+    server = MetricsServer("127.0.0.1", 0, registry=MetricsRegistry(), collectors=[], actions={"/profile": action})
+    server.start()
+    base = f"http://127.0.0.1:{server.port}/profile"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"{base}?images=5", method="POST"), timeout=5) as resp:
+            assert json.loads(resp.read()) == {"ok": True, "images": "5"}
+        for query, code in (("?images=50", 409), ("?images=x", 400), ("", 400)):
+            with pytest.raises(urllib.error.HTTPError) as err:
+                urllib.request.urlopen(urllib.request.Request(base + query, method="POST"), timeout=5)
+            assert err.value.code == code
+    finally:
+        server.stop()
@@ -0,0 +1,80 @@
+"""
+Tests pour le suivi des acquittements MQTT.
+"""
+
+import threading
+
+from src.mqtt_inflight import PUBLISH_RESULTS, InflightTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ack_returns_latency():
+    """La latence est mesurée entre l'envoi et l'acquittement."""
+    clock = FakeClock()
+    tracker = InflightTracker(clock=clock)
+    tracker.track(1, "t/a")
+    clock.now = 0.25
+
+    assert tracker.pending == 1
+    assert tracker.ack(1) == 0.25
+    assert tracker.pending == 0
+
+
+def test_ack_before_track_is_matched():
+    """Un acquittement arrivé avant l'enregistrement du mid ne reste pas en vol."""
+    tracker = InflightTracker()
+    assert tracker.ack(7) is None
+    tracker.track(7, "t/a")
+
+    assert tracker.pending == 0
+
+
+def test_unacked_messages_expire():
+    """Les messages non acquittés au-delà du délai sont abandonnés."""
+    clock = FakeClock()
+    tracker = InflightTracker(ack_timeout=10, clock=clock)
+    tracker.track(1, "t/a")
+    before = PUBLISH_RESULTS.value(result="timeout")
+
+    clock.now = 11.0
+    tracker.track(2, "t/b")
+
+    assert tracker.pending == 1
+    assert PUBLISH_RESULTS.value(result="timeout") == before + 1
+
+
+def test_wait_for_capacity_released_by_ack():
+    """Le pipeline attend tant que le seuil est atteint, puis repart à l'acquittement."""
+    tracker = InflightTracker(high_water=2)
+    tracker.track(1, "t/a")
+    tracker.track(2, "t/b")
+    assert tracker.congested
+
+    threading.Timer(0.05, tracker.ack, args=(1,)).start()
+    assert tracker.wait_for_capacity(timeout=2.0) is True
+    assert not tracker.congested
+
+
+def test_wait_for_capacity_times_out():
+    """Sans acquittement, l'attente expire."""
+    tracker = InflightTracker(high_water=1)
+    tracker.track(1, "t/a")
+
+    assert tracker.wait_for_capacity(timeout=0.05) is False
+
+
+def test_no_backpressure_without_high_water():
+    """high_water=0: jamais de blocage."""
+    tracker = InflightTracker()
+    for mid in range(100):
+        tracker.track(mid, "t")
+
+    assert not tracker.congested
+    assert tracker.wait_for_capacity(timeout=0) is True
@@ -0,0 +1,184 @@
+"""
+Tests d'intégration et de charge de MQTTPublisher sur le broker factice.
+"""
+
+import json
+import time
+
+import pytest
+
+from src.config_loader import CameraConfig, Config
+from src.message_builder import MessageBuilder
+from src.mqtt_inflight import PUBLISH_RESULTS
+from src.mqtt_publisher import MQTTPublisher
+from src.sensor_batcher import SensorBatcher
+from tests.fake_mqtt import FakeBroker
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(
+        app={"name": "test_app", "version": "1.0.0"},
+        directories={"input": "in", "output": str(tmp_path)},
+        logging={"level": "info", "format": "json"},
+        mqtt={
+            "broker": "fake",
+            "qos": 1,
+            "topics": {"sensor": "test/sensor/{camera}/{metric}", "notify": "test/notify/{camera}/{zone}"},
+            "spool": {"enabled": True},
+            "reconnect_min_delay": 0.01,
+            "reconnect_max_delay": 0.05,
+        },
+        homeassistant={"autodiscovery": False},
+        detection={"model": "yolo11n.pt"},
+        cameras=[CameraConfig(name="cam", detect=["person", "car"], text_msg=True)],
+    )
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@pytest.fixture
+def connected(config):
+    """(broker, publisher) connectés; déconnexion en fin de test."""
+    broker = FakeBroker()
+    with broker.patch():
+        publisher = MQTTPublisher(config)
+    publisher.connect()
+    assert _wait(lambda: publisher.connected)
+    yield broker, publisher
+    publisher.disconnect()
+
+
+def test_publish_acknowledged(connected):
+    """Le message arrive au broker et l'acquittement vide la fenêtre."""
+    broker, publisher = connected
+
+    assert publisher.publish_sensor("cam", "detections", 3) is True
+    assert broker.wait_for(1)
+    assert _wait(lambda: publisher.inflight.pending == 0)
+
+    message = broker.messages[0]
+    assert message.topic == "test/sensor/cam/detections"
+    assert json.loads(message.payload)["value"] == 3
+
+
+def test_outage_spools_then_replays_in_order(connected):
+    """Broker arrêté: messages spoolés, puis rejoués dans l'ordre à la reconnexion."""
+    broker, publisher = connected
+    broker.stop()
+    assert _wait(lambda: not publisher.connected)
+
+    for i in range(10):
+        publisher.publish_notification("cam", None, f"message {i}")
+    assert len(publisher.spool) == 10
+    assert publisher.health()["state"] == "reconnecting"
+
+    broker.start()
+    assert broker.wait_for(10)
+    assert _wait(lambda: publisher.connected and len(publisher.spool) == 0)
+
+    messages = [json.loads(m.payload)["message"] for m in broker.messages]
+    assert messages == [f"message {i}" for i in range(10)]
+
+
+def test_replay_beyond_paho_window_waits_for_acks(config):
+    """Spool plus grand que la fenêtre paho: rejeu complet sans échec ni réécriture en boucle."""
+    config.mqtt.max_inflight = 5
+    config.mqtt.max_queued = 10
+    broker = FakeBroker(latency=0.05)
+    with broker.patch():
+        publisher = MQTTPublisher(config)
+    broker.stop()
+    publisher.connect()
+    for i in range(300):
+        publisher.publish_notification("cam", None, f"message {i}")
+    assert len(publisher.spool) == 300
+
+    failed_before = PUBLISH_RESULTS.value(result="failed")
+    passes = []
+    replay = publisher.spool.replay
+    publisher.spool.replay = lambda send: passes.append(1) or replay(send)
+    broker.start()
+
+    assert broker.wait_for(300, timeout=30)
+    assert _wait(lambda: len(publisher.spool) == 0)
+    messages = [json.loads(m.payload)["message"] for m in broker.messages]
+    assert messages == [f"message {i}" for i in range(300)]
+    assert PUBLISH_RESULTS.value(result="failed") == failed_before
+    assert len(passes) == 1
+    publisher.disconnect()
+
+
+def test_publish_during_reconnect_stays_behind_spool(config):
+    """Publication pendant la reconnexion (avant le lancement du rejeu): livrée après le spool."""
+    config.homeassistant.autodiscovery = True
+    broker = FakeBroker()
+    with broker.patch():
+        publisher = MQTTPublisher(config)
+    broker.stop()
+    publisher.connect()
+    for i in range(5):
+        publisher.publish_notification("cam", None, f"message {i}")
+
+    # L'abonnement au birth HA a lieu entre la connexion et le rejeu
+    client = broker.clients[0]
+    subscribe = client.subscribe
+    client.subscribe = lambda topic, qos=0: publisher.publish_notification("cam", None, "live") and None or subscribe(topic, qos)
+    broker.start()
+
+    assert _wait(lambda: publisher.connected and len(publisher.spool) == 0)
+    assert broker.wait_for(6)
+    messages = [json.loads(m.payload)["message"] for m in broker.messages if m.topic.startswith("test/notify/")]
+    assert messages == [f"message {i}" for i in range(5)] + ["live"]
+    publisher.disconnect()
+
+
+def test_drop_during_latency_keeps_messages(config):
+    """Coupure avant acquittement: les messages QoS 1 en vol sont renvoyés."""
+    broker = FakeBroker(latency=0.05)
+    with broker.patch():
+        publisher = MQTTPublisher(config)
+    publisher.connect()
+    assert _wait(lambda: publisher.connected)
+
+    for i in range(5):
+        publisher.publish_sensor("cam", f"m{i}", i)
+    broker.drop_connections()
+
+    assert broker.wait_for(5)
+    assert sorted(broker.topics()) == [f"test/sensor/cam/m{i}" for i in range(5)]
+    publisher.disconnect()
+
+
+def test_pipeline_publish_delivers_in_order(config):
+    """Charge: notifications + état groupé par image, tout est livré dans l'ordre."""
+    images = 300
+    broker = FakeBroker(latency=0.0002)
+    with broker.patch():
+        publisher = MQTTPublisher(config)
+    publisher.connect()
+    assert _wait(lambda: publisher.connected)
+
+    camera = config.cameras[0]
+    builder = MessageBuilder()
+    batcher = SensorBatcher(publisher, mode="state")
+
+    for i in range(images):
+        counters = {"total": 2, "false": 0, "by_class": {"person": 1, "car": 1}}
+        message = builder.build_camera_message(camera, counters)
+        publisher.publish_notification("cam", None, message["message"])
+        batcher.publish("cam", {"detections": i, "false_detections": 0})
+    # Borne large: le débit se mesure avec benchmarks/bench_mqtt_publish.py --end-to-end
+    assert broker.wait_for(2 * images, timeout=30)
+
+    states = [json.loads(m.payload)["detections"] for m in broker.messages if m.topic.endswith("/state/cam")]
+    assert states == list(range(images))
+    assert _wait(lambda: publisher.inflight.pending == 0)
+    publisher.disconnect()
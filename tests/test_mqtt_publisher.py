@@ -87,7 +87,8 @@ def test_mqtt_connect_success(test_config):
         
         result = publisher.connect()
         
-        mock_instance.connect.assert_called_once()
+        mock_instance.connect_async.assert_called_once_with("localhost", 1883, keepalive=60)
+        mock_instance.connect.assert_not_called()
         mock_instance.loop_start.assert_called_once()
 
 
@@ -292,4 +293,278 @@ def test_disconnect(test_config):
         publisher.disconnect()
         
         mock_instance.loop_stop.assert_called_once()
-        mock_instance.disconnect.assert_called_once()
\ No newline at end of file
+        mock_instance.disconnect.assert_called_once()
+
+def test_publish_spooled_while_disconnected(test_config, tmp_path):
+    """Broker indisponible: les messages vont dans le spool puis sont rejoués dans l'ordre."""
+    test_config.mqtt.spool.enabled = True
+    test_config.mqtt.spool.directory = tmp_path / "spool"
+
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        mock_instance.publish.return_value = Mock(rc=0)
+
+        publisher = MQTTPublisher(test_config)
+        assert publisher.connected is False
+
+        assert publisher.publish_sensor("test_cam", "detections", 1) is False
+        assert publisher.publish_notification("test_cam", None, "Une personne détectée") is False
+        mock_instance.publish.assert_not_called()
+        assert len(publisher.spool) == 2
+
+        publisher.connected = True
+        publisher._replaying = True
+        publisher._replay_spool()
+
+        topics = [c.args[0] for c in mock_instance.publish.call_args_list]
+        assert topics == ["test/sensor/test_cam/detections", "test/notify/test_cam"]
+        assert len(publisher.spool) == 0
+        assert publisher._replaying is False
+
+
+def test_connect_broker_down_does_not_raise(test_config):
+    """Un broker injoignable ne bloque pas: la connexion est asynchrone."""
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        mock_instance.connect.side_effect = ConnectionRefusedError()
+
+        publisher = MQTTPublisher(test_config)
+        publisher.connect()
+
+        mock_instance.connect_async.assert_called_once()
+        mock_instance.loop_start.assert_called_once()
+        assert publisher.health()["state"] == "connecting"
+
+
+def test_reconnect_backoff_and_health(test_config):
+    """Échecs successifs: délai de reconnexion croissant; succès: remise à zéro."""
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+
+        publisher = MQTTPublisher(test_config)
+        publisher.connect()
+        publisher._on_connect(mock_instance, None, {}, 0)
+        assert publisher.health()["state"] == "connected"
+
+        publisher._on_disconnect(mock_instance, None, 7)
+        assert publisher.health()["state"] == "reconnecting"
+        assert publisher.health()["last_error"] == "result_code=7"
+
+        delays = []
+        for _ in range(4):
+            publisher._on_connect_fail(mock_instance, None)
+            delays.append(mock_instance.reconnect_delay_set.call_args.kwargs["min_delay"])
+        assert delays[-1] > delays[0]
+        assert all(d <= 120 for d in delays)
+
+        publisher._on_connect(mock_instance, None, {}, 0)
+        health = publisher.health()
+        assert health["connected"] is True
+        assert health["reconnect_attempts"] == 0
+        assert health["last_error"] is None
+
+
+def test_send_autodiscovery_republishes_only_changed(test_config, camera_config):
+    """Après modification d'une zone, seules les entités concernées sont republiées."""
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        mock_instance.publish.return_value = Mock(rc=0)
+
+        publisher = MQTTPublisher(test_config)
+        publisher.connected = True
+        publisher.send_autodiscovery(camera_config)
+        mock_instance.publish.reset_mock()
+
+        camera_config.zones[0].name = "zone_renamed"
+        publisher.send_autodiscovery(camera_config)
+
+        calls = mock_instance.publish.call_args_list
+        published = {c.args[0]: c.args[1] for c in calls}
+        assert all(c.kwargs["retain"] is True for c in calls)
+        # nouvelle entité de zone publiée, ancienne effacée, capteurs caméra inchangés
+        assert len(calls) == 2
+        assert any(topic.endswith("test_cam_zone_zone_zone1_total/config") and payload == ""
+                   for topic, payload in published.items())
+
+
+def _acking_publisher(mock_instance, config):
+    """Publisher connecté dont chaque publication reçoit un mid, acquitté à la demande."""
+    mids = iter(range(1, 1000))
+    mock_instance.publish.side_effect = lambda *a, **kw: Mock(rc=0, mid=next(mids))
+    publisher = MQTTPublisher(config)
+    publisher.connected = True
+    return publisher
+
+
+def test_send_autodiscovery_cache_survives_restart(test_config, camera_config, tmp_path):
+    """Les empreintes persistées (après acquittement) évitent de republier après un redémarrage."""
+    test_config.homeassistant.discovery_cache = tmp_path / "ha_discovery.json"
+
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        publisher = _acking_publisher(mock_instance, test_config)
+        publisher.send_autodiscovery(camera_config)
+        assert mock_instance.publish.call_count >= 2
+        for mid in range(1, mock_instance.publish.call_count + 1):
+            publisher._on_publish(mock_instance, None, mid)
+
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        publisher = MQTTPublisher(test_config)
+        publisher.connected = True
+        publisher.send_autodiscovery(camera_config)
+        mock_instance.publish.assert_not_called()
+
+
+def test_send_autodiscovery_persisted_only_when_acked(test_config, camera_config, tmp_path):
+    """Hors connexion rien n'est publié; sans acquittement rien n'est persisté."""
+    test_config.homeassistant.discovery_cache = tmp_path / "ha_discovery.json"
+
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        publisher = _acking_publisher(mock_instance, test_config)
+        publisher.connected = False
+        publisher.send_autodiscovery(camera_config)
+        mock_instance.publish.assert_not_called()
+
+        # Connexion: les configs différées partent, mais ne sont jamais acquittées
+        publisher._on_connect(mock_instance, None, {}, 0)
+        sent = mock_instance.publish.call_count
+        assert sent >= 2
+        publisher._on_publish(mock_instance, None, 1)
+
+    assert list(json.loads(test_config.homeassistant.discovery_cache.read_text())["test_cam"]) == [
+        mock_instance.publish.call_args_list[0].args[0]
+    ]
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        publisher = _acking_publisher(mock_instance, test_config)
+        publisher.send_autodiscovery(camera_config)
+        assert mock_instance.publish.call_count == sent - 1
+
+
+def test_send_autodiscovery_follows_topic_change(test_config, camera_config):
+    """Après un changement de topic capteur, la discovery est republiée avec le nouveau topic."""
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        publisher = _acking_publisher(mock_instance, test_config)
+        publisher.send_autodiscovery(camera_config)
+        first = mock_instance.publish.call_count
+        for mid in range(1, first + 1):
+            publisher._on_publish(mock_instance, None, mid)
+        mock_instance.publish.reset_mock()
+
+        test_config.mqtt.topics["sensor"] = "other/{camera}/{metric}"
+        publisher.refresh_settings(test_config)
+        publisher.send_autodiscovery(camera_config)
+
+        payloads = [json.loads(c.args[1]) for c in mock_instance.publish.call_args_list]
+        assert len(payloads) == first
+        assert {p["state_topic"] for p in payloads} >= {"other/test_cam/detections"}
+        assert not any(p["state_topic"].startswith("test/sensor/") for p in payloads)
+
+
+def test_remove_autodiscovery_clears_retained_configs(test_config, camera_config, tmp_path):
+    """Caméra retirée: configs effacées (payload vide retenu), empreintes oubliées à l'acquittement."""
+    test_config.homeassistant.discovery_cache = tmp_path / "ha_discovery.json"
+
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        publisher = _acking_publisher(mock_instance, test_config)
+        publisher.send_autodiscovery(camera_config)
+        topics = [c.args[0] for c in mock_instance.publish.call_args_list]
+        for mid in range(1, len(topics) + 1):
+            publisher._on_publish(mock_instance, None, mid)
+        mock_instance.publish.reset_mock()
+
+        publisher.remove_autodiscovery("test_cam")
+
+        calls = mock_instance.publish.call_args_list
+        assert sorted(c.args[0] for c in calls) == sorted(topics)
+        assert all(c.args[1] == "" and c.kwargs["retain"] is True for c in calls)
+        for mid in range(len(topics) + 1, 2 * len(topics) + 1):
+            publisher._on_publish(mock_instance, None, mid)
+
+        assert "test_cam" not in json.loads(test_config.homeassistant.discovery_cache.read_text())
+        assert "test_cam" not in publisher._discovery_cameras
+        mock_instance.publish.reset_mock()
+        publisher._on_message(mock_instance, None, Mock(topic="homeassistant/status", payload=b"online"))
+        mock_instance.publish.assert_not_called()
+
+
+def test_ha_birth_forces_republish(test_config, camera_config):
+    """Le message 'online' de HA force la republication des configs."""
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        mock_instance.publish.return_value = Mock(rc=0)
+
+        publisher = MQTTPublisher(test_config)
+        publisher.connected = True
+        publisher.send_autodiscovery(camera_config)
+        first = mock_instance.publish.call_count
+        assert first >= 2
+        mock_instance.publish.reset_mock()
+
+        publisher._on_message(mock_instance, None, Mock(topic="homeassistant/status", payload=b"online"))
+
+        assert mock_instance.publish.call_count == first
+
+
+def test_publish_image_bytes(test_config, tmp_path):
+    """Image binaire publiée retenue; jamais spoolée si le broker est absent."""
+    import numpy as np
+    test_config.mqtt.spool.enabled = True
+    test_config.mqtt.spool.directory = tmp_path / "spool"
+
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        mock_instance.publish.return_value = Mock(rc=0)
+        buffer = np.frombuffer(b"\xff\xd8jpeg", dtype=np.uint8)
+
+        publisher = MQTTPublisher(test_config)
+        assert publisher.publish_image_bytes("test_cam", buffer) is False
+        assert len(publisher.spool) == 0
+
+        publisher.connected = True
+        assert publisher.publish_image_bytes("test_cam", buffer, variant="thumbnail") is True
+        topic, payload = mock_instance.publish.call_args[0][:2]
+        assert topic == "detect_yolo_cpu_v2/image/test_cam/thumbnail"
+        assert payload == b"\xff\xd8jpeg"
+        assert mock_instance.publish.call_args.kwargs["retain"] is True
+
+
+def test_topics_cached_and_refreshed(test_config):
+    """Topics rendus une fois, recalculés après refresh_settings."""
+    with patch('paho.mqtt.client.Client'):
+        publisher = MQTTPublisher(test_config)
+
+        assert publisher._sensor_topic("test_cam", "detections") == "test/sensor/test_cam/detections"
+        assert ("sensor", "test_cam", "detections") in publisher._topics
+
+        # Templates inchangés: le cache est conservé
+        publisher.refresh_settings(test_config)
+        assert ("sensor", "test_cam", "detections") in publisher._topics
+
+        test_config.mqtt.topics["sensor"] = "other/{camera}/{metric}"
+        test_config.mqtt.qos = 2
+        publisher.refresh_settings(test_config)
+
+        assert publisher._sensor_topic("test_cam", "detections") == "other/test_cam/detections"
+        assert publisher._qos == 2
+
+
+def test_publish_tracks_acknowledgement(test_config):
+    """Chaque publication est suivie jusqu'au callback on_publish."""
+    with patch('paho.mqtt.client.Client') as mock_client:
+        mock_instance = mock_client.return_value
+        mock_instance.publish.return_value = Mock(rc=0, mid=42)
+
+        publisher = MQTTPublisher(test_config)
+        publisher.connected = True
+        publisher.publish_sensor("test_cam", "detections", 1)
+        assert publisher.inflight.pending == 1
+
+        publisher._on_publish(mock_instance, None, 42)
+        assert publisher.inflight.pending == 0
+        mock_instance.max_inflight_messages_set.assert_called_once_with(20)
+        mock_instance.max_queued_messages_set.assert_called_once_with(1000)
@@ -0,0 +1,117 @@
+"""
+Tests pour le spool disque des messages MQTT.
+"""
+
+import pytest
+
+from src.mqtt_spool import MessageSpool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class Sink:
+    def __init__(self, fail_after=None):
+        self.sent = []
+        self.fail_after = fail_after
+
+    def __call__(self, topic, payload, qos, retain):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            return False
+        self.sent.append((topic, payload, qos, retain))
+        return True
+
+
+def test_append_and_replay_in_order(tmp_path, clock):
+    """Les messages sont rejoués dans l'ordre d'arrivée puis supprimés."""
+    spool = MessageSpool(tmp_path, clock=clock)
+    for i in range(3):
+        spool.append(f"t/{i}", f"p{i}", qos=1)
+
+    sink = Sink()
+    assert spool.replay(sink) == 3
+
+    assert [m[0] for m in sink.sent] == ["t/0", "t/1", "t/2"]
+    assert len(spool) == 0
+    assert spool.size_bytes == 0
+
+
+def test_spool_survives_restart(tmp_path, clock):
+    """Un spool rechargé depuis le disque retrouve ses messages."""
+    spool = MessageSpool(tmp_path, clock=clock)
+    spool.append("t/a", "x")
+    spool.close()
+
+    reloaded = MessageSpool(tmp_path, clock=clock)
+    assert len(reloaded) == 1
+    reloaded.append("t/b", "y")
+
+    sink = Sink()
+    reloaded.replay(sink)
+    assert [m[0] for m in sink.sent] == ["t/a", "t/b"]
+
+
+def test_replay_stops_on_failure_and_keeps_rest(tmp_path, clock):
+    """Une nouvelle coupure pendant le rejeu conserve les messages restants."""
+    spool = MessageSpool(tmp_path, clock=clock)
+    for i in range(4):
+        spool.append(f"t/{i}", "p")
+
+    assert spool.replay(Sink(fail_after=2)) == 2
+    assert len(spool) == 2
+
+    sink = Sink()
+    spool.replay(sink)
+    assert [m[0] for m in sink.sent] == ["t/2", "t/3"]
+
+
+def test_expired_messages_not_replayed(tmp_path, clock):
+    """Les messages plus vieux que max_age sont abandonnés."""
+    spool = MessageSpool(tmp_path, max_age=60, clock=clock)
+    spool.append("t/old", "p")
+    clock.now += 120
+    spool.append("t/new", "p")
+
+    sink = Sink()
+    spool.replay(sink)
+    assert [m[0] for m in sink.sent] == ["t/new"]
+
+
+def test_compaction_keeps_last_value_per_key(tmp_path, clock):
+    """La compaction ne garde que le dernier message d'une même clé."""
+    spool = MessageSpool(tmp_path, segment_bytes=64, clock=clock)
+    spool.append("sensor/det", "1", key="sensor/det")
+    spool.append("notify/cam", "Une personne")
+    spool.append("sensor/det", "2", key="sensor/det")
+
+    spool.compact()
+    assert len(spool) == 2
+
+    sink = Sink()
+    spool.replay(sink)
+    assert [(m[0], m[1]) for m in sink.sent] == [("notify/cam", "Une personne"), ("sensor/det", "2")]
+
+
+def test_segments_rotate_and_budget_drops_oldest(tmp_path, clock):
+    """Au-delà de max_bytes, les plus vieux segments sont supprimés."""
+    spool = MessageSpool(tmp_path, segment_bytes=100, max_bytes=400, clock=clock)
+    for i in range(20):
+        spool.append(f"t/{i}", "x" * 40)
+
+    assert len(list(tmp_path.glob("spool-*.log"))) > 1
+    assert spool.size_bytes <= 400 + 200
+
+    sink = Sink()
+    spool.replay(sink)
+    assert sink.sent[-1][0] == "t/19"
+    assert sink.sent[0][0] != "t/0"
@@ -0,0 +1,91 @@
+"""
+Tests pour l'anti-rebond des notifications.
+"""
+
+import pytest
+
+from src.notification_suppressor import NotificationSuppressor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_cooldown_zero_never_suppresses(clock):
+    """Sans cooldown, chaque notification passe."""
+    sup = NotificationSuppressor(lambda cam: 0, clock=clock)
+
+    assert sup.should_notify("reolink", "route", {"car": 1})
+    assert sup.should_notify("reolink", "route", {"car": 1})
+    assert len(sup) == 0
+
+
+def test_same_objects_suppressed_during_cooldown(clock):
+    """Une voiture garée ne renotifie pas avant la fin du cooldown."""
+    sup = NotificationSuppressor(lambda cam: 60, clock=clock)
+
+    assert sup.should_notify("reolink", "route", {"car": 1})
+    clock.now += 30
+    assert not sup.should_notify("reolink", "route", {"car": 1})
+    clock.now += 31
+    assert sup.should_notify("reolink", "route", {"car": 1})
+
+
+def test_count_change_triggers_notification(clock):
+    """Un changement du nombre d'objets renotifie immédiatement."""
+    sup = NotificationSuppressor(lambda cam: 60, clock=clock)
+
+    assert sup.should_notify("reolink", "route", {"car": 1})
+    assert sup.should_notify("reolink", "route", {"car": 2})
+    assert not sup.should_notify("reolink", "route", {"car": 2})
+
+
+def test_count_change_ignored_when_disabled(clock):
+    """notify_on_count_change=False: seul le cooldown compte."""
+    sup = NotificationSuppressor(lambda cam: 60, notify_on_count_change=False, clock=clock)
+
+    assert sup.should_notify("reolink", "route", {"car": 1})
+    assert not sup.should_notify("reolink", "route", {"car": 2})
+
+
+def test_keys_are_independent(clock):
+    """Caméra, zone et ensemble de classes forment des clés distinctes."""
+    sup = NotificationSuppressor(lambda cam: 60, clock=clock)
+
+    assert sup.should_notify("reolink", "route", {"car": 1})
+    assert sup.should_notify("reolink", "cour", {"car": 1})
+    assert sup.should_notify("reolink", "route", {"person": 1})
+    assert sup.should_notify("ptz", None, {"car": 1})
+    assert len(sup) == 4
+
+
+def test_per_camera_cooldown(clock):
+    """Le cooldown est résolu par caméra."""
+    sup = NotificationSuppressor(lambda cam: 60 if cam == "reolink" else 0, clock=clock)
+
+    assert sup.should_notify("ptz", None, {"car": 1})
+    assert sup.should_notify("ptz", None, {"car": 1})
+    assert sup.should_notify("reolink", None, {"car": 1})
+    assert not sup.should_notify("reolink", None, {"car": 1})
+
+
+def test_ttl_evicts_stale_state(clock):
+    """Les états non revus depuis le TTL sont évincés."""
+    sup = NotificationSuppressor(lambda cam: 10_000, state_ttl=100, clock=clock)
+
+    sup.should_notify("reolink", "route", {"car": 1})
+    clock.now += 200
+    sup.should_notify("ptz", None, {"dog": 1})
+
+    assert len(sup) == 1
+    # L'état évincé est oublié: la notification repart
+    assert sup.should_notify("reolink", "route", {"car": 1})
@@ -0,0 +1,71 @@
+"""
+Tests pour la détection des quasi-doublons par hash perceptuel.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.perceptual_hash import NearDuplicateFilter, dhash, hamming
+
+
+def _scene(path, seed=0, overlay=None):
+    """Scène synthétique (dégradé + formes) avec horodatage optionnel."""
+    rng = np.random.default_rng(seed)
+    img = np.tile(np.linspace(0, 255, 640, dtype=np.uint8), (480, 1))
+    img = cv2.merge([img, img, img])
+    for _ in range(6):
+        x, y = rng.integers(0, 560), rng.integers(0, 400)
+        cv2.rectangle(img, (int(x), int(y)), (int(x) + 80, int(y) + 80), tuple(int(c) for c in rng.integers(0, 255, 3)), -1)
+    if overlay:
+        cv2.putText(img, overlay, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    cv2.imwrite(str(path), img)
+    return str(path)
+
+
+def test_hamming():
+    """Distance de Hamming entre entiers."""
+    assert hamming(0b1010, 0b1010) == 0
+    assert hamming(0b1010, 0b0101) == 4
+
+
+def test_dhash_timestamp_overlay_is_near_duplicate(tmp_path):
+    """Un horodatage différent ne change le hash que de quelques bits."""
+    a = dhash(_scene(tmp_path / "a.jpg", overlay="2025-11-10 10:30:15"))
+    b = dhash(_scene(tmp_path / "b.jpg", overlay="2025-11-10 10:30:16"))
+    c = dhash(_scene(tmp_path / "c.jpg", seed=42))
+
+    assert hamming(a, b) <= 4
+    assert hamming(a, c) > 4
+
+
+def test_dhash_unreadable_image(tmp_path):
+    """Une image illisible retourne None."""
+    bad = tmp_path / "bad.jpg"
+    bad.write_bytes(b"not a jpeg")
+
+    assert dhash(str(bad)) is None
+
+
+def test_filter_reuses_within_threshold():
+    """Le résultat est réutilisé si la distance est sous le seuil."""
+    flt = NearDuplicateFilter()
+    detections = [{"class": "car", "bbox": (0, 0, 1, 1), "zones": []}]
+    flt.remember("reolink", 0b1111, detections, {"total": 1})
+
+    reused = flt.lookup("reolink", 0b1110, threshold=1)
+
+    assert reused == (detections, {"total": 1})
+    assert reused[0] is not detections  # copie indépendante
+    assert flt.lookup("reolink", 0b0000, threshold=1) is None
+    assert flt.lookup("ptz", 0b1111, threshold=1) is None
+
+
+def test_filter_ring_is_bounded():
+    """Seuls les N derniers hashes sont conservés par caméra."""
+    flt = NearDuplicateFilter(history=2)
+    for h in (1 << 10, 1 << 20, 1 << 30):
+        flt.remember("ptz", h, [], {})
+
+    assert flt.lookup("ptz", 1 << 10, threshold=0) is None
+    assert flt.lookup("ptz", 1 << 30, threshold=0) is not None
@@ -0,0 +1,51 @@
+"""
+Tests pour le profilage à la demande.
+"""
+
+import pstats
+
+from src.profiling import Profiler
+
+
+def work():
+    return sum(i * i for i in range(1000))
+
+
+def test_capture_is_noop_until_armed(tmp_path):
+    profiler = Profiler(tmp_path, images=1)
+
+    with profiler.capture():
+        work()
+
+    assert not profiler.active
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_session_writes_reports_after_n_images(tmp_path):
+    """Rafales comptées pour leur nombre d'images; rapport écrit à la cible."""
+    profiler = Profiler(tmp_path, images=3, clock=lambda: 0.0)
+    assert profiler.arm()["ok"]
+    assert not profiler.arm()["ok"]  # une session à la fois
+
+    with profiler.capture(2):
+        work()
+    assert profiler.status() == {"active": True, "images": 2, "target": 3, "tracemalloc": False}
+    with profiler.capture():
+        work()
+
+    assert not profiler.active
+    stats_file = next(tmp_path.glob("*_3img.pstats"))
+    assert any(func[2] == "work" for func in pstats.Stats(str(stats_file)).stats)
+    assert "cumulative" in next(tmp_path.glob("*_3img.txt")).read_text()
+
+
+def test_tracemalloc_snapshot_from_query(tmp_path):
+    profiler = Profiler(tmp_path)
+
+    assert profiler.arm_from_query({"images": "1", "tracemalloc": "1"})["tracemalloc"]
+    with profiler.capture():
+        data = [bytearray(1024) for _ in range(100)]
+
+    assert data
+    assert len(list(tmp_path.glob("*_1img.tracemalloc"))) == 1
+    assert next(tmp_path.glob("*_1img.memory.txt")).read_text()
@@ -0,0 +1,114 @@
+"""
+Tests pour le cache disque des résultats de détection.
+"""
+
+import pytest
+
+from src.config_loader import CameraConfig, ZoneConfig
+from src.result_cache import ResultCache, camera_fingerprint, file_digest, model_fingerprint
+
+
+DETECTIONS = [
+    {"class": "car", "confidence": 0.9, "bbox": (1.0, 2.0, 3.0, 4.0), "is_false": False, "zones": ["route"]}
+]
+COUNTERS = {"total": 1, "false": 0, "by_class": {"car": 1}, "by_zone": {}}
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "reolink_1.jpg"
+    path.write_bytes(b"\xff\xd8fake-jpeg-content")
+    return path
+
+
+@pytest.fixture
+def camera():
+    return CameraConfig(name="reolink", detect=["car"])
+
+
+def test_file_digest_depends_on_content(tmp_path):
+    """Deux fichiers identiques ont le même hash, pas deux fichiers différents."""
+    a, b, c = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    c.write_bytes(b"other")
+
+    assert file_digest(str(a)) == file_digest(str(b))
+    assert file_digest(str(a)) != file_digest(str(c))
+
+
+def test_model_fingerprint_uses_file_content(tmp_path):
+    """Le modèle est identifié par son contenu s'il est local, sinon par son nom."""
+    model = tmp_path / "m.pt"
+    model.write_bytes(b"weights")
+
+    assert model_fingerprint(str(model)) == file_digest(str(model))
+    assert model_fingerprint("yolo11n.pt") != model_fingerprint("yolo11s.pt")
+
+
+def test_camera_fingerprint_changes_with_config(camera):
+    """Classes, zones et seuil font partie de l'empreinte caméra."""
+    base = camera_fingerprint(camera, 0.5)
+
+    assert camera_fingerprint(camera, 0.6) != base
+    assert camera_fingerprint(CameraConfig(name="reolink", detect=["car", "person"]), 0.5) != base
+    zoned = CameraConfig(
+        name="reolink", detect=["car"], zones=[ZoneConfig(name="z", polygon=[0, 0, 1, 0, 1, 1])]
+    )
+    assert camera_fingerprint(zoned, 0.5) != base
+
+
+def test_put_then_get_roundtrip(tmp_path, image, camera):
+    """Un résultat enregistré est relu à l'identique (bbox en tuple)."""
+    cache = ResultCache(tmp_path / "cache", model_hash="m1")
+    key = cache.key_for(str(image), camera_fingerprint(camera, 0.5))
+
+    assert cache.get(key) is None
+    cache.put(key, DETECTIONS, COUNTERS)
+
+    detections, counters = cache.get(key)
+    assert detections == DETECTIONS
+    assert isinstance(detections[0]["bbox"], tuple)
+    assert counters == COUNTERS
+    assert cache.hit_rate == pytest.approx(0.5)
+
+
+def test_model_change_misses(tmp_path, image, camera):
+    """Un autre modèle ne réutilise pas les résultats."""
+    cam_hash = camera_fingerprint(camera, 0.5)
+    c1 = ResultCache(tmp_path / "cache", model_hash="m1")
+    c1.put(c1.key_for(str(image), cam_hash), DETECTIONS, COUNTERS)
+
+    c2 = ResultCache(tmp_path / "cache", model_hash="m2")
+    assert c2.get(c2.key_for(str(image), cam_hash)) is None
+
+
+def test_index_reloaded_from_disk(tmp_path, image, camera):
+    """Le cache survit à un redémarrage."""
+    cam_hash = camera_fingerprint(camera, 0.5)
+    c1 = ResultCache(tmp_path / "cache", model_hash="m1")
+    key = c1.key_for(str(image), cam_hash)
+    c1.put(key, DETECTIONS, COUNTERS)
+
+    c2 = ResultCache(tmp_path / "cache", model_hash="m1")
+    assert len(c2) == 1
+    assert c2.get(key) is not None
+
+
+def test_lru_eviction_by_size(tmp_path):
+    """Au-delà de max_bytes, l'entrée la moins récemment utilisée est évincée."""
+    probe = ResultCache(tmp_path / "probe", model_hash="m1")
+    probe.put("k", DETECTIONS, COUNTERS)
+    entry_size = (tmp_path / "probe" / "k.json").stat().st_size
+
+    cache = ResultCache(tmp_path / "cache", model_hash="m1", max_bytes=3 * entry_size)
+    for key in ("k1", "k2", "k3"):
+        cache.put(key, DETECTIONS, COUNTERS)
+    assert cache.get("k1") is not None  # k1 redevient le plus récent
+
+    cache.put("k4", DETECTIONS, COUNTERS)
+
+    assert len(cache) == 3
+    assert not (tmp_path / "cache" / "k2.json").exists()
+    assert cache.get("k1") is not None
+    assert cache.get("k4") is not None
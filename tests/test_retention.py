@@ -0,0 +1,113 @@
+"""
+Tests pour la rétention de shared_out.
+"""
+
+import os
+import time
+
+import pytest
+
+from src.retention import EVICTED_FILES, Policy, RetentionManager
+
+NOW = 1_700_000_000.0
+
+
+def _write(root, rel, size=10, age=0.0):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age, NOW - age))
+    return path
+
+
+@pytest.fixture
+def clock():
+    return lambda: NOW
+
+
+def test_age_policy_evicts_old_files(tmp_path, clock):
+    """Les fichiers plus vieux que max_age sont supprimés, les récents conservés."""
+    old = _write(tmp_path, "false/cam/old.jpg", age=3 * 86400)
+    recent = _write(tmp_path, "false/cam/recent.jpg", age=60)
+    manager = RetentionManager(tmp_path, [Policy("false", max_age=86400)], clock=clock)
+    manager.rebuild()
+
+    stats = manager.sweep()
+
+    assert not old.exists()
+    assert recent.exists()
+    assert stats["false"] == {"files": 1, "bytes": 10, "evicted_files": 1, "evicted_bytes": 10}
+
+
+def test_budget_evicts_oldest_first(tmp_path, clock):
+    """Au-delà du budget, les plus anciens partent en premier."""
+    files = [_write(tmp_path, f"true/cam/{i}.jpg", size=100, age=100 - i) for i in range(5)]
+    manager = RetentionManager(tmp_path, [Policy("true", max_bytes=250)], clock=clock)
+    manager.rebuild()
+
+    manager.sweep()
+
+    assert [f.exists() for f in files] == [False, False, False, True, True]
+
+
+def test_camera_policy_overrides_category(tmp_path, clock):
+    """Une politique caméra prime sur celle de sa catégorie."""
+    ptz = _write(tmp_path, "true/ptz/a.jpg", age=2 * 86400)
+    reolink = _write(tmp_path, "true/reolink/a.jpg", age=2 * 86400)
+    policies = [Policy("true", max_age=86400), Policy("true", camera="ptz", max_age=7 * 86400)]
+    manager = RetentionManager(tmp_path, policies, clock=clock)
+    manager.rebuild()
+
+    manager.sweep()
+
+    assert ptz.exists()
+    assert not reolink.exists()
+
+
+def test_recorded_files_indexed_without_rescan(tmp_path, clock):
+    """record() suffit à indexer un nouveau fichier; les dossiers internes sont ignorés."""
+    manager = RetentionManager(tmp_path, [Policy("original", max_bytes=15)], clock=clock)
+    manager.rebuild()
+    before = EVICTED_FILES.value(policy="original", reason="budget")
+
+    first = _write(tmp_path, "original/2025-11-10/a.jpg", age=20)
+    second = _write(tmp_path, "original/2025-11-11/b.jpg", age=10)
+    spool = _write(tmp_path, "_spool/spool-0000000000.log", size=1000, age=10**6)
+    for path in (first, second, spool):
+        manager.record(path)
+
+    manager.sweep()
+
+    assert not first.exists()
+    assert not first.parent.exists()  # dossier de date vidé puis supprimé
+    assert second.exists() and spool.exists()
+    assert EVICTED_FILES.value(policy="original", reason="budget") == before + 1
+
+
+def test_sweep_reports_stats(tmp_path, clock):
+    """Les statistiques de chaque passe sont transmises (capteurs MQTT)."""
+    reports = []
+    _write(tmp_path, "false/cam/a.jpg", age=10)
+    manager = RetentionManager(tmp_path, [Policy("false", max_age=86400)], on_sweep=reports.append, clock=clock)
+    manager.rebuild()
+
+    manager.sweep()
+
+    assert reports == [{"false": {"files": 1, "bytes": 10, "evicted_files": 0, "evicted_bytes": 0}}]
+
+
+def test_prune_keeps_camera_and_current_day_dirs(tmp_path, clock):
+    """Seuls les dossiers de date passés sont supprimés: ensure_dir garde les autres en cache."""
+    today = time.strftime("%Y-%m-%d", time.localtime(NOW))
+    flat = _write(tmp_path, "true/cam/a.jpg", age=3 * 86400)
+    old_hour = _write(tmp_path, "true/ptz/2020-01-01/08/b.jpg", age=3 * 86400)
+    current = _write(tmp_path, f"true/ptz/{today}/c.jpg", age=3 * 86400)
+    manager = RetentionManager(tmp_path, [Policy("true", max_age=86400)], clock=clock)
+    manager.rebuild()
+
+    manager.sweep()
+
+    assert not flat.exists() and not old_hour.exists() and not current.exists()
+    assert flat.parent.is_dir()  # dossier de caméra conservé même vide
+    assert not (tmp_path / "true/ptz/2020-01-01").exists()
+    assert current.parent.is_dir()
@@ -0,0 +1,125 @@
+"""
+Tests pour l'ordonnanceur par caméra et le pool de workers.
+"""
+
+import threading
+
+from src.metrics import REGISTRY
+from src.scheduler import CameraScheduler, WorkerPool
+
+
+def _drain(scheduler):
+    out = []
+    while True:
+        picked = scheduler.get(timeout=0)
+        if picked is None:
+            return out
+        out.append(picked)
+
+
+def test_round_robin_same_priority():
+    """Une caméra bavarde n'affame pas les autres caméras de même priorité."""
+    sched = CameraScheduler()
+    for i in range(4):
+        sched.submit("ptz", f"ptz{i}")
+    sched.submit("reolink", "reo0")
+
+    order = [item for _, item in _drain(sched)]
+
+    assert order[:2] == ["ptz0", "reo0"]
+    assert order[2:] == ["ptz1", "ptz2", "ptz3"]
+
+
+def test_higher_priority_served_first():
+    """Une caméra prioritaire obtient toujours le prochain worker libre."""
+    sched = CameraScheduler({"reolink": 10, "ptz": 0})
+    sched.submit("ptz", "p0")
+    sched.submit("ptz", "p1")
+    sched.submit("reolink", "r0")
+    sched.submit("reolink", "r1")
+
+    order = [item for _, item in _drain(sched)]
+
+    assert order == ["r0", "r1", "p0", "p1"]
+
+
+def test_unknown_camera_uses_default_priority():
+    """Les caméras non configurées prennent la priorité par défaut."""
+    sched = CameraScheduler({"reolink": 1}, default_priority=5)
+    sched.submit("reolink", "r")
+    sched.submit("inconnue", "x")
+
+    assert sched.priority_of("inconnue") == 5
+    assert [item for _, item in _drain(sched)] == ["x", "r"]
+
+
+def test_set_priorities_reorders_waiting_cameras():
+    """Un rechargement de config reclasse les caméras déjà en attente."""
+    sched = CameraScheduler({"reolink": 10, "ptz": 0})
+    sched.submit("reolink", "r0")
+    sched.submit("ptz", "p0")
+
+    sched.set_priorities({"reolink": 0, "ptz": 10})
+
+    assert [item for _, item in _drain(sched)] == ["p0", "r0"]
+
+
+def test_depth_and_queue_latency_measured():
+    """La profondeur et l'attente en file sont mesurées par caméra."""
+    sched = CameraScheduler()
+    before = REGISTRY.get("detect_queue_wait_seconds").snapshot(camera="lat_cam")["count"]
+    sched.submit("lat_cam", "a")
+    sched.submit("lat_cam", "b")
+
+    assert sched.depth("lat_cam") == 2
+    assert sched.depth() == 2
+
+    _drain(sched)
+
+    assert sched.depth() == 0
+    after = REGISTRY.get("detect_queue_wait_seconds").snapshot(camera="lat_cam")["count"]
+    assert after - before == 2
+
+
+def test_get_timeout_returns_none():
+    """get() retourne None si rien n'arrive avant le timeout."""
+    sched = CameraScheduler()
+    assert sched.get(timeout=0.01) is None
+
+
+def test_worker_pool_processes_and_drains_on_stop():
+    """Le pool traite tous les éléments soumis avant l'arrêt."""
+    sched = CameraScheduler()
+    seen = []
+    lock = threading.Lock()
+
+    def handler(camera, item):
+        with lock:
+            seen.append((camera, item))
+
+    pool = WorkerPool(sched, handler, workers=2)
+    pool.start()
+    for i in range(10):
+        sched.submit("cam", i)
+    pool.stop()
+
+    assert sorted(item for _, item in seen) == list(range(10))
+
+
+def test_worker_pool_survives_handler_error():
+    """Une exception dans le handler ne tue pas le worker."""
+    sched = CameraScheduler()
+    seen = []
+
+    def handler(camera, item):
+        if item == "boom":
+            raise RuntimeError("boom")
+        seen.append(item)
+
+    pool = WorkerPool(sched, handler, workers=1)
+    pool.start()
+    sched.submit("cam", "boom")
+    sched.submit("cam", "ok")
+    pool.stop()
+
+    assert seen == ["ok"]
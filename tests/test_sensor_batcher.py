@@ -0,0 +1,87 @@
+"""
+Tests pour le regroupement des publications de capteurs.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.sensor_batcher import SensorBatcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def publisher():
+    return MagicMock()
+
+
+VALUES = {"detections": 2, "false_detections": 0, "zone_zone_route_total": 1}
+
+
+def test_per_metric_mode_publishes_each_value(publisher):
+    """Mode historique: un publish_sensor par métrique."""
+    SensorBatcher(publisher, mode="per_metric").publish("reolink", VALUES)
+
+    assert publisher.publish_sensor.call_count == 3
+    publisher.publish_state.assert_not_called()
+
+
+def test_state_mode_single_message(publisher):
+    """Mode state: un seul message avec toutes les métriques."""
+    SensorBatcher(publisher, mode="state").publish("reolink", VALUES)
+
+    publisher.publish_state.assert_called_once_with("reolink", VALUES)
+    publisher.publish_sensor.assert_not_called()
+
+
+def test_changed_mode_only_sends_changes(publisher):
+    """Mode changed: seules les valeurs modifiées sont renvoyées."""
+    batcher = SensorBatcher(publisher, mode="changed")
+    batcher.publish("reolink", VALUES)
+    publisher.reset_mock()
+
+    batcher.publish("reolink", dict(VALUES, detections=3))
+
+    publisher.publish_sensor.assert_called_once_with("reolink", "detections", 3)
+
+
+def test_changed_mode_rate_limited(publisher):
+    """Mode changed: les changements rapprochés sont retenus puis envoyés au flush."""
+    clock = FakeClock()
+    batcher = SensorBatcher(publisher, mode="changed", min_interval=3600, clock=clock)
+    batcher.publish("reolink", {"detections": 1})
+    publisher.reset_mock()
+
+    batcher.publish("reolink", {"detections": 2})
+    batcher.publish("reolink", {"detections": 4})
+    publisher.publish_sensor.assert_not_called()
+
+    batcher.flush_all()
+    publisher.publish_sensor.assert_called_once_with("reolink", "detections", 4)
+
+
+def test_changed_mode_value_reverted_is_dropped(publisher):
+    """Un changement annulé avant l'envoi n'est pas publié."""
+    clock = FakeClock()
+    batcher = SensorBatcher(publisher, mode="changed", min_interval=3600, clock=clock)
+    batcher.publish("reolink", {"detections": 1})
+    publisher.reset_mock()
+
+    batcher.publish("reolink", {"detections": 2})
+    batcher.publish("reolink", {"detections": 1})
+    batcher.flush_all()
+
+    publisher.publish_sensor.assert_not_called()
+
+
+def test_unknown_mode_rejected(publisher):
+    """Un mode inconnu lève une erreur."""
+    with pytest.raises(ValueError):
+        SensorBatcher(publisher, mode="bulk")
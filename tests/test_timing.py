@@ -0,0 +1,62 @@
+"""
+Tests pour la mesure des étapes de traitement.
+"""
+
+from src.timing import RollingPercentiles, StageTimer, add_stage, current, note_pending, stage
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stages_accumulate_in_current_timer():
+    """Les étapes de même nom s'additionnent; le timer n'est courant que dans le bloc."""
+    clock = FakeClock()
+    stats = RollingPercentiles()
+
+    with StageTimer(clock=clock, stats=stats) as timer:
+        assert current() is timer
+        for _ in range(2):
+            with stage("decode"):
+                clock.now += 0.010
+        add_stage("inference", 0.050)
+        clock.now += 0.005
+        timings = timer.as_ms()
+
+    assert current() is None
+    assert timings == {"decode": 20.0, "inference": 50.0, "total": 25.0}
+    assert stats.observations == 1
+
+
+def test_stage_without_timer_is_noop():
+    with stage("decode"):
+        add_stage("inference", 1.0)
+    assert current() is None
+
+
+def test_adopt_pending_stage():
+    """Une attente mesurée par le watcher est reprise par le timer du worker."""
+    note_pending("/in/cam_1.jpg", "ready_wait", 0.2)
+
+    with StageTimer(stats=RollingPercentiles()) as timer:
+        timer.adopt("/in/cam_1.jpg")
+        timer.adopt("/in/inconnu.jpg")
+
+    assert timer.spans == {"ready_wait": 0.2}
+
+
+def test_rolling_percentiles_window():
+    """Seules les N dernières mesures comptent."""
+    stats = RollingPercentiles(window=100)
+    for ms in range(1, 201):
+        stats.record({"inference": ms / 1000})
+
+    result = stats.percentiles()["inference"]
+
+    assert result["count"] == 100
+    assert result["p50"] == 151.0
+    assert result["p99"] == 200.0
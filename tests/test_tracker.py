@@ -0,0 +1,109 @@
+"""
+Tests pour le suivi d'objets entre snapshots.
+"""
+
+import pytest
+
+from src.tracker import CameraTracker, ObjectTracker, iou
+
+
+def _det(cls, bbox, is_false=False):
+    return {"class": cls, "confidence": 0.9, "bbox": bbox, "is_false": is_false, "zones": []}
+
+
+def test_iou_basic():
+    """IoU de boîtes identiques, disjointes et partiellement superposées."""
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == pytest.approx(1.0)
+    assert iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    assert iou((0, 0, 10, 10), (5, 0, 15, 10)) == pytest.approx(50 / 150)
+
+
+def test_first_sighting_is_new():
+    """Un objet jamais vu est 'new' et reçoit un identifiant."""
+    tracker = CameraTracker()
+    det = _det("car", (0, 0, 100, 100))
+
+    events = tracker.update([det])
+
+    assert events.new == [det]
+    assert det["track_state"] == "new"
+    assert det["track_id"] == 1
+
+
+def test_parked_car_becomes_stationary_with_same_id():
+    """Une voiture garée garde son identifiant et devient 'stationary'."""
+    tracker = CameraTracker()
+    tracker.update([_det("car", (0, 0, 100, 100))])
+
+    det = _det("car", (2, 1, 101, 100))
+    events = tracker.update([det])
+
+    assert events.new == []
+    assert events.stationary == [det]
+    assert det["track_id"] == 1
+
+
+def test_moving_object_keeps_id():
+    """Un objet qui se déplace modérément reste la même piste, état 'moving'."""
+    tracker = CameraTracker(iou_threshold=0.3, stationary_iou=0.9)
+    tracker.update([_det("person", (0, 0, 100, 100))])
+
+    det = _det("person", (30, 0, 130, 100))
+    events = tracker.update([det])
+
+    assert events.moving == [det]
+    assert det["track_id"] == 1
+
+
+def test_class_mismatch_creates_new_track():
+    """Une autre classe au même endroit est une nouvelle piste."""
+    tracker = CameraTracker()
+    tracker.update([_det("car", (0, 0, 100, 100))])
+
+    events = tracker.update([_det("truck", (0, 0, 100, 100))])
+
+    assert len(events.new) == 1
+    assert events.new[0]["track_id"] == 2
+
+
+def test_departed_after_max_missed():
+    """Une piste absente plus de max_missed snapshots est signalée partie."""
+    tracker = CameraTracker(max_missed=1)
+    tracker.update([_det("dog", (0, 0, 10, 10))])
+
+    assert tracker.update([]).departed == []
+    departed = tracker.update([]).departed
+
+    assert [t.track_id for t in departed] == [1]
+    assert tracker.tracks == {}
+
+
+def test_false_detections_ignored():
+    """Les fausses détections ne créent pas de pistes."""
+    tracker = CameraTracker()
+    events = tracker.update([_det("car", (0, 0, 10, 10), is_false=True)])
+
+    assert events.active == 0
+    assert tracker.tracks == {}
+
+
+def test_memory_bounded_per_camera():
+    """Le nombre de pistes est borné par max_tracks."""
+    tracker = CameraTracker(max_tracks=3)
+    dets = [_det("bird", (i * 100, 0, i * 100 + 10, 10)) for i in range(5)]
+
+    events = tracker.update(dets)
+
+    assert len(tracker.tracks) == 3
+    assert len(events.departed) == 2
+
+
+def test_object_tracker_isolates_cameras():
+    """Chaque caméra a ses propres pistes."""
+    tracker = ObjectTracker()
+    tracker.update("reolink", [_det("car", (0, 0, 100, 100))])
+
+    events = tracker.update("ptz", [_det("car", (0, 0, 100, 100))])
+
+    assert len(events.new) == 1
+    assert len(tracker.update("reolink", [_det("car", (0, 0, 100, 100))]).stationary) == 1
@@ -6,6 +6,10 @@ import pytest
 import os
 from pathlib import Path
 from src.utils import (
+    ARCHIVE_OPERATIONS,
+    _PathAllocator,
+    capture_time,
+    archive_file,
     handle_processed_image, 
     ensure_directory_exists, 
     list_images,
@@ -295,4 +299,130 @@ def test_list_images_custom_extensions(tmp_path):
     images = list_images(str(tmp_path), extensions=('.pdf',))
     
     assert len(images) == 1
-    assert images[0].endswith('.pdf')
\ No newline at end of file
+    assert images[0].endswith('.pdf')
+
+def test_archive_copy_uses_hardlink(test_image, tmp_path):
+    """Même système de fichiers: l'original est un lien dur, aucune donnée copiée."""
+    dest = tmp_path / "archive.jpg"
+
+    strategy = archive_file(test_image, dest, keep_source=True)
+
+    assert strategy == "hardlink"
+    assert os.path.samefile(test_image, dest)
+    assert os.path.exists(test_image)
+
+
+def test_archive_move_falls_back_to_rename(test_image, tmp_path, monkeypatch):
+    """Liens et clones refusés: le déplacement se fait par renommage."""
+    def no_link(*args):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", no_link)
+    monkeypatch.setattr("src.utils._reflink", no_link)
+    failed_before = ARCHIVE_OPERATIONS.value(strategy="hardlink", result="failed")
+    dest = tmp_path / "moved.jpg"
+
+    strategy = archive_file(test_image, dest, keep_source=False)
+
+    assert strategy == "rename"
+    assert not os.path.exists(test_image)
+    assert dest.read_text() == "fake image content"
+    assert ARCHIVE_OPERATIONS.value(strategy="hardlink", result="failed") == failed_before + 1
+
+
+def test_archive_copy_keeps_source(test_image, tmp_path):
+    """Copie complète: contenu identique, fichier distinct, source conservée."""
+    dest = tmp_path / "copy.jpg"
+
+    strategy = archive_file(test_image, dest, keep_source=True, strategies=["copy"])
+
+    assert strategy == "copy"
+    assert dest.read_text() == "fake image content"
+    assert os.path.exists(test_image)
+    assert not os.path.samefile(test_image, dest)
+
+
+def test_archive_move_copy_removes_source(test_image, tmp_path):
+    """Déplacement par copie (autre montage): la source est supprimée après écriture."""
+    dest = tmp_path / "copied.jpg"
+
+    assert archive_file(test_image, dest, keep_source=False, strategies=["copy"]) == "copy"
+    assert not os.path.exists(test_image)
+    assert dest.read_text() == "fake image content"
+
+
+def test_allocator_suffixes_from_scandir_seed(tmp_path):
+    """Le suffixe suivant vient du plus grand _N déjà présent, sans sonder _1, _2..."""
+    for name in ("snap.jpg", "snap_1.jpg", "snap_5.jpg", "other_9.png"):
+        (tmp_path / name).write_text("x")
+    allocator = _PathAllocator()
+
+    assert allocator.allocate(tmp_path / "snap.jpg").name == "snap_6.jpg"
+    assert allocator.allocate(tmp_path / "snap.jpg").name == "snap_7.jpg"
+    assert allocator.allocate(tmp_path / "new.jpg").name == "new.jpg"
+    assert (tmp_path / "new.jpg").exists()
+
+
+def test_allocators_in_separate_processes_never_collide(tmp_path):
+    """Deux allocateurs indépendants (processus distincts) ne rendent jamais le même chemin."""
+    first, second = _PathAllocator(), _PathAllocator()
+    (tmp_path / "snap.jpg").write_text("x")
+
+    paths = set()
+    for _ in range(5):
+        paths.add(first.allocate(tmp_path / "snap.jpg"))
+        paths.add(second.allocate(tmp_path / "snap.jpg"))
+
+    assert len(paths) == 10
+
+
+def test_failed_archive_releases_reserved_name(tmp_path):
+    """Échec d'archivage: le nom réservé est libéré."""
+    success = save_original_image(str(tmp_path / "missing.jpg"), str(tmp_path), "cam")
+
+    assert success is False
+    assert list((tmp_path / "original").iterdir()) == []
+
+
+def test_get_output_path_sharded_by_hour(tmp_path):
+    """shard_by=hour: sous-dossiers date/heure tirés du nom de fichier."""
+    path = get_output_path(
+        str(tmp_path), "reolink_2025-11-10_10-30-15.jpg", "reolink", True, shard_by="hour"
+    )
+
+    assert path == os.path.join(str(tmp_path), "true", "reolink", "2025-11-10", "10", "reolink_2025-11-10_10-30-15.jpg")
+    assert os.path.isdir(os.path.dirname(path))
+
+
+def test_capture_time_falls_back_to_mtime(tmp_path):
+    """Sans horodatage dans le nom, la date de modification est utilisée."""
+    image = tmp_path / "snapshot.jpg"
+    image.write_text("x")
+    os.utime(image, (1_700_000_000, 1_700_000_000))
+
+    from datetime import datetime
+    assert capture_time(str(image)) == datetime.fromtimestamp(1_700_000_000)
+
+
+def test_handle_processed_image_move_sharded_by_day(tmp_path, output_dir):
+    """L'original déplacé est rangé dans le dossier du jour de prise de vue."""
+    source = tmp_path / "ptz_20251110142205.jpg"
+    source.write_text("x")
+
+    assert handle_processed_image(str(source), "move", output_dir, shard_by="day") is True
+    assert os.path.exists(os.path.join(output_dir, "original", "2025-11-10", "ptz_20251110142205.jpg"))
+
+
+def test_move_recreates_cached_dir_removed_externally(tmp_path, output_dir):
+    """Dossier en cache supprimé hors rétention (nettoyage manuel): recréé au lieu d'échouer."""
+    import shutil
+    first = tmp_path / "ptz_20251110142205.jpg"
+    second = tmp_path / "ptz_20251110142206.jpg"
+    first.write_text("x")
+    second.write_text("y")
+    assert handle_processed_image(str(first), "move", output_dir, shard_by="day") is True
+
+    shutil.rmtree(os.path.join(output_dir, "original"))
+
+    assert handle_processed_image(str(second), "move", output_dir, shard_by="day") is True
+    assert os.path.exists(os.path.join(output_dir, "original", "2025-11-10", second.name))